@@ -1,19 +1,23 @@
 from django.conf import settings
 
 import os
+import time
+import multiprocessing
 from validator.xpi import XPIManager
 from validator.chromemanifest import ChromeManifest
-from StringIO import StringIO
 import tarfile
 
+from django.db import connections
 from django.template.defaultfilters import slugify
 
 from transifex.projects.models import Project
-from transifex.resources.models import Resource
+from transifex.resources.models import Resource, RLStats
+from transifex.resources.handlers import invalidate_stats_cache
 from transifex.languages.models import Language
 from transifex.resources.formats.dtd import DTDHandler
 from transifex.resources.formats.mozillaproperties import MozillaPropertiesHandler
 from transifex.resources.formats.registry import registry
+from transifex.txcommon.log import logger
 
 from django.utils.safestring import mark_safe
 from django.template.defaultfilters import escape
@@ -28,6 +32,74 @@ def _get_handler(filename):
         return None
 
 
+def init_worker():
+    """
+    Makes worker processes open their own database connections, instead of
+    sharing the ones of the parent process
+    """
+    for conn in connections.all():
+        conn.connection = None
+
+
+def _parse_file(args):
+    """
+    Parses a locale file, in a worker process of the pool
+
+    Takes a (filename, data, resource, language, is_source) tuple and
+    returns the parsed stringset, suggestions and template, the error if
+    the file could not be parsed and the seconds it took.
+    """
+    filename, data, resource, language, is_source = args
+    start = time.time()
+    Handler = _get_handler(filename)
+    try:
+        handler = Handler(filename=filename, resource=resource,
+            language=language, content=data)
+        handler.parse_file(is_source=is_source)
+    except Exception as e:
+        return None, None, None, unicode(e), time.time() - start
+    return (handler.stringset, handler.suggestions, handler.template, None,
+        time.time() - start)
+
+
+def import_bundle_file(project, path, name, remove=False, job=None):
+    """
+    Imports the strings of an uploaded XPI or tar bundle into the project
+
+    ``name`` is the name the file was uploaded with, which tells its type.
+    The file is deleted afterwards if ``remove`` is set. The progress and
+    the outcome of the import are saved in ``job``, a BundleImportJob, if
+    it is given. Returns the messages of the import.
+    """
+    bundle = None
+    try:
+        if ".tar" in name:
+            f = open(path, 'rb')
+            try:
+                bundle = TarBundle(f, project)
+            finally:
+                f.close()
+        elif ".xpi" in name:
+            bundle = XpiBundle(path, project, name=name)
+        else:
+            raise Exception("Unknown file type")
+        bundle.job = job
+        bundle.save()
+    except:
+        logger.exception("ERROR importing translations from file")
+        messages = (bundle and bundle.messages or []) + \
+            ["ERROR importing translations from file"]
+        if job is not None:
+            job.finish(messages, failed=True)
+        return messages
+    finally:
+        if remove:
+            os.remove(path)
+    if job is not None:
+        job.finish(bundle.messages)
+    return bundle.messages
+
+
 class Bundle(object):
     """
     Represents a file with localizations in it, grouped by languages
@@ -40,6 +112,7 @@ class Bundle(object):
         self.resources = {}
         self.source_lang = None
         self.messages = []
+        self.job = None
 
     def log(self, message, style=""):
         "Logs some message"
@@ -49,6 +122,11 @@ class Bundle(object):
             message = mark_safe(message)
         self.messages.append(message)
 
+    def _report(self, phase, **counters):
+        "Saves the progress of the import in its job, if there is one"
+        if self.job is not None:
+            self.job.set_phase(phase, self.messages, **counters)
+
     def bind_project(self, project):
         "Assigns a project to the bundle"
         self.project = project
@@ -72,34 +150,90 @@ class Bundle(object):
                 resource.save()
             self.resources[filename] = resource
 
-    def _do_save(self, lang, files, is_source=False):
+    def _parse_all(self, languages):
         """
-        Does the actual saving of file list for lang
+        Parses the files of the given locales, in a pool of
+        BUNDLE_IMPORT_PROCESSES processes.
+
+        The handlers look up the source strings of the resources, so the
+        source locale must be saved before the others are parsed.
+
+        Returns a dict with the results of _parse_file by filename for each
+        language.
+        """
+        tasks = []
+        for lang in languages:
+            for (filename, data) in self.locales[lang].items():
+                # whether that file is present in source ones
+                if data and filename in self.resources:
+                    tasks.append((filename, data, self.resources[filename],
+                        lang, lang == self.source_lang))
+        processes = settings.BUNDLE_IMPORT_PROCESSES
+        if processes < 2 or len(tasks) < 2:
+            results = map(_parse_file, tasks)
+        else:
+            pool = multiprocessing.Pool(processes, init_worker)
+            try:
+                results = pool.map(_parse_file, tasks)
+            finally:
+                pool.terminate()
+                pool.join()
+        parsed = {}
+        for (task, result) in zip(tasks, results):
+            parsed.setdefault(task[3], {})[task[0]] = result
+        return parsed
+
+    def _do_save(self, lang, parsed, saved, is_source=False):
+        """
+        Does the actual saving of the parsed files of lang
+
+        The statistics are not updated; the languages saved for each file
+        are added to ``saved`` for _update_stats instead.
         """
         self.log("%s" % lang, "font-style:italic")
-        for (filename, data) in files.items():
-            if not data:
-                continue
-            # whether that file is present in source ones
-            if filename not in self.resources:
+        start = time.time()
+        parsing = 0
+        for (filename, result) in sorted(parsed.items()):
+            stringset, suggestions, template, error, seconds = result
+            parsing += seconds
+            if error is not None:
+                # empty/broken file, ignore it
+                if 'not able to extract any string' in error:
+                    self.log(error, style="color:silver")
+                else:
+                    self.log(error, style="color:red")
                 continue
             Handler = _get_handler(filename)
-            handler = Handler(filename=filename, resource=self.resources[filename], language=lang, content=data)
+            handler = Handler(resource=self.resources[filename], language=lang)
+            handler.stringset = stringset
+            handler.suggestions = suggestions
+            handler.template = template
             try:
-                handler.parse_file(is_source=is_source)
+                updated, added = handler.save2db(is_source=is_source,
+                    update_stats=False)
             except Exception as e:
-                # empty/broken file, ignore it
-                if 'not able to extract any string' in e.message:
-                    self.log(e.message, style="color:silver")
-                    continue
-            try:
-                updated, added = handler.save2db(is_source=is_source)
-            except Exception as e:
-                # empty/broken file, ignore it
                 self.log(e.message, style="color:red")
                 continue
+            saved.setdefault(filename, set()).add(lang)
             self.log("%s: %s updated, %s added" %
                 (filename, updated, added), style="padding-left:12px" )
+        self.log("%s: parsed in %.2fs, saved in %.2fs" %
+            (lang, parsing, time.time() - start), style="color:gray")
+
+    def _update_stats(self, saved):
+        """
+        Recounts the statistics of each resource saved, in all languages at
+        once
+        """
+        for (filename, languages) in saved.items():
+            resource = self.resources[filename]
+            existing = set(RLStats.objects.filter(resource=resource
+                ).values_list('language', flat=True))
+            for lang in languages:
+                if lang.id not in existing:
+                    # counted by the recount below
+                    RLStats(resource=resource, language=lang).save(update=False)
+            invalidate_stats_cache(resource, resource.source_language)
 
     def save(self):
         """
@@ -111,14 +245,31 @@ class Bundle(object):
         if not self.resources:
             self.prepare_resources()
 
+        saved = {}
         # let's save English
-        self._do_save(self.source_lang, self.locales[self.source_lang],
-                        is_source=True)
+        self._report('source')
+        parsed = self._parse_all([self.source_lang])
+        self._do_save(self.source_lang, parsed.get(self.source_lang, {}),
+                        saved, is_source=True)
+
         # and the rest
-        for (lang, files) in self.locales.items():
-            # we have already saved English
-            if lang != self.source_lang:
-                self._do_save(lang, files)
+        self._report('parsing')
+        start = time.time()
+        parsed = self._parse_all(
+            [lang for lang in self.locales if lang != self.source_lang])
+        self.log("Parsed %s locales in %.2fs" %
+            (len(parsed), time.time() - start), style="color:gray")
+        self._report('saving', locales_total=len(parsed) + 1,
+            locales_saved=1)
+        for (i, (lang, files)) in enumerate(parsed.items()):
+            self._do_save(lang, files, saved)
+            self._report('saving', locales_saved=i + 2)
+
+        self._report('statistics')
+        start = time.time()
+        self._update_stats(saved)
+        self.log("Updated statistics of %s resources in %.2fs" %
+            (len(saved), time.time() - start), style="color:gray")
 
 
     def _get_lang(self, code):
@@ -168,8 +319,6 @@ class XpiBundle(Bundle):
         """
         Bundle.__init__(self, project, release)
         self.xpi = XPIManager(filename, name=name)
-         # here we will store managers for jarfiles
-        self.jarfiles = {}
         chrome = ChromeManifest(self.xpi.read("chrome.manifest"), "manifest")
         locales = list(chrome.get_triples("locale"))
 
@@ -203,22 +352,16 @@ class XpiBundle(Bundle):
                 # missing file mentioned
                 if jarname not in self.xpi:
                     continue
-                # may be we have already read this one
-                if jarname in self.jarfiles:
-                    package = self.jarfiles[jarname]
-                else:
-                    jar = StringIO(self.xpi.read(jarname))
-                    package = XPIManager(jar, mode="r", name=jarname)
+                # read once, even if several locales are in it
+                package = self.xpi.open_jar(jarname)
             else:
                 package = self.xpi
 
             # and now we read files from there
-            location = location.strip('/')
             result = {}
-            for f in package.package_contents():
-                f = f.strip("/")
-                if f.startswith(location+"/") and ('.' in f):
-                    result[f.split("/")[-1]] = package.read(f)
+            for f in package.files_under(location):
+                if '.' in f.strip("/"):
+                    result[f.strip("/").split("/")[-1]] = package.read(f)
 
             # file with same name in different jars can get overwritten
             if lang not in self.locales:
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Prebuilt archives with the translations of projects in all languages.
+
+The files of every (resource, language) pair are compiled into
+LANGPACK_DIR/<project>/<variant>/<language>/<resource> and kept between
+builds. A pair is recompiled only if its statistics (or its resource) were
+updated after its file was written, and the archive is rebuilt from the
+files only if any of them changed.
+"""
+import os
+import time
+import shutil
+import tempfile
+
+from django.conf import settings
+
+from transifex.resources.models import Resource, RLStats
+from transifex.languages.models import Language
+from transifex.resources.formats.compilation import Mode
+from transifex.txcommon.log import logger
+
+from impala.zipstream import ZipStream
+
+# The arguments of _compile_translation_template for each variant
+VARIANTS = {
+    'replaced': (None, None),
+    'empty': (Mode.TRANSLATED, None),
+    'skipped': (None, True),
+}
+
+
+def langpack_path(project, variant):
+    "Returns the path of the archive of a variant of the project"
+    return os.path.join(settings.LANGPACK_DIR, project.slug,
+        "%s_%s.zip" % (project.slug, variant))
+
+
+def _timestamp(dt):
+    """
+    Returns the seconds since the epoch of a (local) datetime, including
+    its microseconds, as the files get the exact time their build started
+    """
+    return time.mktime(dt.timetuple()) + dt.microsecond / 1e6
+
+
+def _temporary_file(path):
+    """
+    Returns the path and the file object of a new temporary file in the
+    directory of path, which is renamed to path once written
+
+    Every build writes to files of its own, so that builds running at once
+    (e.g. the nightly task and the mzbuildlangpacks command) never replace
+    a file with a partly written one.
+    """
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp',
+        dir=os.path.dirname(path))
+    os.chmod(tmp_path, 0644)
+    return tmp_path, os.fdopen(fd, 'wb')
+
+
+def _write(path, content, mtime):
+    "Replaces the content of the file at path and sets its mtime"
+    tmp_path, f = _temporary_file(path)
+    try:
+        try:
+            f.write(content)
+        finally:
+            f.close()
+        os.utime(tmp_path, (mtime, mtime))
+        os.rename(tmp_path, path)
+    except:
+        os.remove(tmp_path)
+        raise
+
+
+def build_language_pack(project, variant):
+    """
+    Brings the archive of a variant of the project up to date
+
+    Returns the number of files recompiled.
+    """
+    from impala.views import _compile_translation_template
+    mode, skip = VARIANTS[variant]
+    # changes made while we compile will be picked by the next build
+    started = time.time()
+    directory = os.path.join(settings.LANGPACK_DIR, project.slug, variant)
+    resources = list(Resource.objects.filter(project=project))
+    updates = {}
+    for (resource_id, language_id, last_update) in RLStats.objects.filter(
+            resource__project=project).values_list('resource', 'language',
+            'last_update'):
+        updates[(resource_id, language_id)] = last_update
+    languages = Language.objects.filter(
+        id__in=set(l for (r, l) in updates)).order_by('code')
+
+    entries = []
+    recompiled = 0
+    for language in languages:
+        for resource in resources:
+            path = os.path.join(directory, language.code, resource.slug)
+            entries.append(("%s/%s" % (language.code, resource.name), path))
+            last_update = max(resource.last_update,
+                updates.get((resource.id, language.id)) or resource.last_update)
+            if os.path.exists(path) and \
+                    os.path.getmtime(path) >= _timestamp(last_update):
+                continue
+            _write(path, _compile_translation_template(resource, language,
+                mode, skip), started)
+            recompiled += 1
+
+    # drop the files of languages and resources that are gone
+    removed = 0
+    paths = set(path for (name, path) in entries)
+    if os.path.isdir(directory):
+        for code in os.listdir(directory):
+            if not os.path.isdir(os.path.join(directory, code)):
+                continue
+            for slug in os.listdir(os.path.join(directory, code)):
+                # the temporary files of builds running at once are kept
+                if slug.endswith('.tmp'):
+                    continue
+                if os.path.join(directory, code, slug) not in paths:
+                    os.remove(os.path.join(directory, code, slug))
+                    removed += 1
+            if not os.listdir(os.path.join(directory, code)):
+                shutil.rmtree(os.path.join(directory, code))
+
+    archive = langpack_path(project, variant)
+    if recompiled or removed or not os.path.exists(archive):
+        stream = ZipStream()
+        tmp_path, f = _temporary_file(archive)
+        try:
+            try:
+                for (name, path) in entries:
+                    f.write(stream.add(name, open(path, 'rb').read()))
+                f.write(stream.close())
+            finally:
+                f.close()
+            os.rename(tmp_path, archive)
+        except:
+            os.remove(tmp_path)
+            raise
+    logger.debug("Language pack %s of %s: %s files recompiled, %s removed" %
+        (variant, project.slug, recompiled, removed))
+    return recompiled
+
+
+def build_language_packs(project):
+    """
+    Brings the archives of all variants of the project up to date
+
+    Returns the number of files recompiled for each variant.
+    """
+    return dict((variant, build_language_pack(project, variant))
+        for variant in sorted(VARIANTS))
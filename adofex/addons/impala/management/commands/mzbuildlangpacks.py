@@ -0,0 +1,28 @@
+# -*- coding: UTF-8 -*-
+from django.core.management.base import BaseCommand, CommandError
+
+from transifex.projects.models import Project
+
+from impala.langpacks import build_language_packs
+
+
+class Command(BaseCommand):
+    help = "Brings the prebuilt archives of all translations of the given "\
+           "projects (or of all public projects) up to date, recompiling "\
+           "only the files of languages updated since the last build"
+    args = "<project_slug project_slug ...>"
+
+    def handle(self, *args, **options):
+        if args:
+            projects = Project.objects.filter(slug__in=args)
+            if len(projects) != len(set(args)):
+                raise CommandError("Unknown project in %s" % ", ".join(args))
+        else:
+            projects = Project.objects.filter(private=False)
+        verbosity = int(options.get('verbosity', 1))
+        for project in projects:
+            recompiled = build_language_packs(project)
+            if verbosity:
+                print "%s: %s" % (project.slug, ", ".join(
+                    "%s %s files recompiled" % (recompiled[v], v)
+                    for v in sorted(recompiled)))
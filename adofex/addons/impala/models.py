@@ -1,9 +1,18 @@
 from datetime import date, datetime
+import os
+import time
+import tempfile
+import zipfile
 
+from django.conf import settings
 from django.db import models
+from django.utils.html import conditional_escape
 
 from transifex.projects.models import Project
 from django.contrib.auth.models import User
+from transifex.txcommon.log import logger
+
+from impala.zipstream import ZipStream, read_raw
 
 class XpiFile(models.Model):
     """
@@ -13,3 +22,139 @@ class XpiFile(models.Model):
     filename = models.CharField(blank=False, null=False, max_length=200)
     added_date = models.DateTimeField(null=False, default=datetime.now)
     user = models.ForeignKey(User, blank=True, null=True)
+
+    @property
+    def path(self):
+        return os.path.join(settings.XPI_DIR, self.filename)
+
+    @property
+    def base_path(self):
+        return self.path + '.base'
+
+    def _is_base_entry(self, filename):
+        "Whether a member of the XPI is kept in the base XPI"
+        # without META-INF, to make it unsigned
+        return not (filename.startswith('META-INF') or
+            filename == 'chrome.manifest')
+
+    def build_base(self):
+        """
+        Builds the base XPI, i.e. the XPI without its signature and
+        chrome.manifest, which localized XPIs are appended to.
+
+        The members are copied compressed, as they are.
+        """
+        start = time.time()
+        orig = zipfile.ZipFile(self.path, "r")
+        stream = ZipStream()
+        # a file of its own, as the base may be built by several requests
+        # at once
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp',
+            dir=os.path.dirname(self.base_path))
+        f = os.fdopen(fd, 'wb')
+        try:
+            for item in orig.infolist():
+                if self._is_base_entry(item.filename):
+                    f.write(stream.add_raw(item, read_raw(orig, item)))
+            f.write(stream.close())
+            f.close()
+            os.chmod(tmp_path, 0644)
+            os.rename(tmp_path, self.base_path)
+        except:
+            f.close()
+            os.remove(tmp_path)
+            raise
+        finally:
+            orig.close()
+        logger.debug("Base XPI of %s built in %.3fs" %
+            (self.filename, time.time() - start))
+
+    def get_base(self):
+        """
+        Returns the path of the base XPI, building it if the XPI has been
+        uploaded since it was last built.
+        """
+        if not os.path.exists(self.base_path) or \
+                os.path.getmtime(self.base_path) < os.path.getmtime(self.path):
+            self.build_base()
+        return self.base_path
+
+
+class BundleImportJob(models.Model):
+    """
+    Import of an uploaded XPI or tar bundle, queued by moz_import when
+    ASYNC_IMPORTS is set and run by impala.tasks.import_bundle
+
+    The messages of the import are kept as HTML, one per line, and are
+    saved after each locale, so that the import can be followed while it
+    runs.
+    """
+    STATUS_PENDING = 'P'
+    STATUS_RUNNING = 'R'
+    STATUS_DONE = 'D'
+    STATUS_FAILED = 'F'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    project = models.ForeignKey(Project, related_name='bundle_import_jobs')
+    user = models.ForeignKey(User, blank=True, null=True)
+    filename = models.CharField(max_length=255,
+        help_text="The name of the uploaded file.")
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES,
+        default=STATUS_PENDING, db_index=True)
+    phase = models.CharField(max_length=20, blank=True, default='',
+        help_text="The phase of the import the job is in.")
+    locales_total = models.PositiveIntegerField(default=0)
+    locales_saved = models.PositiveIntegerField(default=0)
+    messages = models.TextField(blank=True, default='')
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+    last_update = models.DateTimeField(auto_now=True, editable=False)
+
+    def __unicode__(self):
+        return u'%s (%s): %s' % (self.project, self.filename,
+            self.get_status_display())
+
+    @property
+    def finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    def _set_messages(self, messages):
+        self.messages = u'\n'.join(
+            unicode(conditional_escape(m)).replace(u'\n', u' ')
+            for m in messages)
+
+    def set_phase(self, phase, messages, **counters):
+        """
+        Moves the job to another phase of the import, saving the messages
+        so far and any keyword arguments as the values of its fields
+        """
+        self.phase = phase
+        self._set_messages(messages)
+        for field, value in counters.iteritems():
+            setattr(self, field, value)
+        if self.status == self.STATUS_PENDING:
+            self.status = self.STATUS_RUNNING
+        self.save()
+
+    def finish(self, messages, failed=False):
+        "Marks the job as done, or as failed, with the final messages"
+        self.status = failed and self.STATUS_FAILED or self.STATUS_DONE
+        self.phase = ''
+        self._set_messages(messages)
+        self.save()
+
+    def as_dict(self):
+        "Returns the status of the job as a dictionary"
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'status': self.get_status_display().lower(),
+            'phase': self.phase,
+            'locales_total': self.locales_total,
+            'locales_saved': self.locales_saved,
+            'messages': self.messages and self.messages.split(u'\n') or [],
+        }
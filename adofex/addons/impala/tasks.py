@@ -0,0 +1,41 @@
+import os
+
+from celery.decorators import task
+
+from transifex.projects.models import Project
+from transifex.txcommon.log import logger
+
+from impala.bundle import import_bundle_file
+from impala.langpacks import build_language_packs
+from impala.models import BundleImportJob
+
+
+@task(name='build_language_packs', ignore_result=True)
+def build_all_language_packs():
+    """
+    Rebuilds the archives of all public projects, scheduled nightly
+    """
+    for project in Project.objects.filter(private=False):
+        try:
+            build_language_packs(project)
+        except Exception:
+            logger.exception("ERROR building language packs of %s" %
+                project.slug)
+
+
+@task(name='import_bundle', ignore_result=True)
+def import_bundle(job_id, path, remove=False):
+    """
+    Imports an uploaded XPI or tar bundle, queued by moz_import
+
+    The progress and the messages of the import are saved in its
+    BundleImportJob.
+    """
+    try:
+        job = BundleImportJob.objects.select_related('project').get(id=job_id)
+    except BundleImportJob.DoesNotExist:
+        logger.error("Bundle import job %s does not exist." % job_id)
+        if remove:
+            os.remove(path)
+        return
+    import_bundle_file(job.project, path, job.filename, remove, job=job)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import zipfile
+from StringIO import StringIO
+from django.utils import unittest
+
+from impala.zipstream import ZipStream, read_raw
+
+
+class ZipStreamTests(unittest.TestCase):
+    """Test that the archives of ZipStream are read back by zipfile."""
+
+    def _base(self, members):
+        "Returns an archive written by zipfile with the given members"
+        f = StringIO()
+        z = zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED)
+        for (name, data) in members:
+            z.writestr(name, data)
+        z.close()
+        return f.getvalue()
+
+    def _assertMembers(self, data, members):
+        z = zipfile.ZipFile(StringIO(data), 'r')
+        self.assertEqual(z.testzip(), None)
+        self.assertEqual([zinfo.filename for zinfo in z.infolist()],
+            [name for (name, content) in members])
+        for (name, content) in members:
+            self.assertEqual(z.read(name), content)
+        z.close()
+
+    def test_add(self):
+        """Test adding compressed and stored entries."""
+        for compression in (zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED):
+            stream = ZipStream(compression)
+            data = stream.add('a.dtd', '<!ENTITY a "A">\n' * 100)
+            data += stream.add('b/c.properties', 'c=C\n')
+            data += stream.close()
+            self._assertMembers(data, [('a.dtd', '<!ENTITY a "A">\n' * 100),
+                ('b/c.properties', 'c=C\n')])
+
+    def test_unicode(self):
+        """Test unicode names and contents, which are encoded in UTF-8."""
+        stream = ZipStream()
+        data = stream.add(u'el/Ελληνικά.dtd', u'<!ENTITY a "Α">')
+        data += stream.close()
+        self._assertMembers(data,
+            [(u'el/Ελληνικά.dtd', u'<!ENTITY a "Α">'.encode('UTF-8'))])
+
+    def test_empty(self):
+        """Test empty entries and archives."""
+        stream = ZipStream()
+        data = stream.add('empty.dtd', '') + stream.close()
+        self._assertMembers(data, [('empty.dtd', '')])
+        self._assertMembers(ZipStream().close(), [])
+
+    def test_add_raw(self):
+        """Test copying the members of another archive as they are."""
+        members = [('a.dtd', 'a' * 1000), ('empty.dtd', ''),
+            (u'Ελληνικά.properties', 'b=B')]
+        base = zipfile.ZipFile(StringIO(self._base(members)), 'r')
+        stream = ZipStream()
+        data = ''
+        for zinfo in base.infolist():
+            data += stream.add_raw(zinfo, read_raw(base, zinfo))
+        data += stream.close()
+        base.close()
+        self._assertMembers(data, members)
+
+    def test_resume(self):
+        """Test appending entries to an archive written by zipfile."""
+        members = [('a.dtd', 'a' * 1000), ('empty.dtd', '')]
+        data = self._base(members)
+        base = zipfile.ZipFile(StringIO(data), 'r')
+        stream = ZipStream()
+        stream.resume(base)
+        data = data[:base.start_dir]
+        base.close()
+        data += stream.add(u'el/Ελληνικά.dtd', 'b')
+        data += stream.add('chrome.manifest', '')
+        data += stream.close()
+        self._assertMembers(data, members + [(u'el/Ελληνικά.dtd', 'b'),
+            ('chrome.manifest', '')])
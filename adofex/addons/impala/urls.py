@@ -18,6 +18,10 @@ urlpatterns = patterns('impala.views',
         view = "moz_import",
         name = "moz_import"
     ),
+    url(regex = PROJECT_URL + r'import/(?P<job_id>\d+)/$',
+        view = "bundle_import_status",
+        name = "bundle_import_status"
+    ),
     url(regex = PROJECT_URL + r'message/$',
         view = "message_watchers",
         name = "message_watchers"
@@ -1,6 +1,8 @@
 # -*- ceoding: utf-8 -*-
-import os, zipfile, time, shutil, urllib2
-from  StringIO import  StringIO
+import os, re, zipfile, time, shutil, tempfile, urllib2
+import multiprocessing
+from collections import deque
+from itertools import chain
 
 from validator.chromemanifest import ChromeManifest
 
@@ -11,9 +13,12 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.contenttypes.models import ContentType
 from django.http import HttpResponse, HttpResponseRedirect
 from django.core.urlresolvers import reverse
+from django.db import connections
 from django.shortcuts import render_to_response, get_object_or_404
+from django.views.decorators.cache import never_cache
 from django.views.generic.simple import direct_to_template
 from django.template import RequestContext
+from django.utils import simplejson
 
 from transifex.projects.models import Project
 from transifex.resources.models import Resource
@@ -29,10 +34,15 @@ from transifex.txcommon.log import logger
 from notification.models import ObservedItem, send
 
 from impala.forms import ImportForm, MessageForm
-from impala.bundle import XpiBundle, TarBundle
-from impala.models import XpiFile
+from impala.bundle import import_bundle_file, init_worker
+from impala.models import XpiFile, BundleImportJob
+from impala.zipstream import ZipStream
+from impala.langpacks import langpack_path
+from impala.tasks import import_bundle
 
 BZ_URL = "http://www.babelzilla.org/wts/download/locale/all/skipped/%s"
+# a single range of bytes, e.g. "bytes=0-499", "bytes=500-" or "bytes=-500"
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
 
 @login_required
 @one_perm_required_or_403(pr_resource_add_change,
@@ -40,45 +50,61 @@ BZ_URL = "http://www.babelzilla.org/wts/download/locale/all/skipped/%s"
 def moz_import(request, project_slug):
     """
     View to handle XPI upload requests
+
+    With ASYNC_IMPORTS the bundle is imported by a celery worker, and its
+    BundleImportJob is polled through bundle_import_status.
     """
     messages = []
+    job = None
     project = get_object_or_404(Project, slug=project_slug)
     if request.method == 'POST':
         form = ImportForm(request.POST, request.FILES)
         if form.is_valid():
             if form.cleaned_data['xpifile']:
+                path, remove = None, False
                 try:
                     uploaded_xpi = request.FILES['xpifile']
                     if ".tar" in uploaded_xpi.name:
                         # tar = StringIO(urllib2.urlopen(
                         #           BZ_URL % form.cleaned_data['bzid']).read())
-                        tar = StringIO(uploaded_xpi.read())
-                        bundle = TarBundle(tar, project)
+                        # kept until it is imported
+                        fd, path = tempfile.mkstemp(suffix='.tar',
+                            dir=settings.XPI_DIR)
+                        saved_file = os.fdopen(fd, "wb")
+                        remove = True
                     elif ".xpi" in uploaded_xpi.name:
                         # save the file for future recompiling
                         filename = "%s-%s.xpi" % (project.id, project_slug)
-                        saved_xpi = file(
-                            os.path.join(settings.XPI_DIR,filename), "w")
-                        uploaded_xpi.seek(0)
-                        saved_xpi.write(uploaded_xpi.read())
-                        uploaded_xpi.seek(0)
-                        saved_xpi.close()
+                        path = os.path.join(settings.XPI_DIR, filename)
+                        saved_file = file(path, "wb")
+                    else:
+                        raise Exception("Unknown file type")
+                    try:
+                        for chunk in uploaded_xpi.chunks():
+                            saved_file.write(chunk)
+                    finally:
+                        saved_file.close()
+                    if not remove:
                         xpi_row = XpiFile.objects.get_or_create(project=project)[0]
                         xpi_row.filename = filename
                         xpi_row.user = request.user
                         xpi_row.save()
-                        # parse it for strings
-                        bundle = XpiBundle(uploaded_xpi, project,
-                                            name=uploaded_xpi.name)
-                    else:
-                        raise Exception("Unknown file type")
-                    # note bundle's messages just in case we fail on save()
-                    messages = bundle.messages
-                    bundle.save()
-                    messages = bundle.messages
+                        xpi_row.build_base()
                 except:
                     logger.exception("ERROR importing translations from file")
                     messages += ["ERROR importing translations from file"]
+                    if remove:
+                        os.remove(path)
+                else:
+                    # parse it for strings
+                    if settings.ASYNC_IMPORTS:
+                        job = BundleImportJob.objects.create(project=project,
+                            user=request.user, filename=uploaded_xpi.name)
+                        import_bundle.delay(job.id, path, remove)
+                        messages = ["The file has been queued for import."]
+                    else:
+                        messages = import_bundle_file(project, path,
+                            uploaded_xpi.name, remove)
     else:
         form = ImportForm()
 
@@ -87,9 +113,34 @@ def moz_import(request, project_slug):
         'project': project,
         'moz_import': True,
         'work_messages': messages,
+        'job': job,
         })
 
 
+@never_cache
+@login_required
+@one_perm_required_or_403(pr_resource_add_change,
+    (Project, 'slug__exact', 'project_slug'))
+def bundle_import_status(request, project_slug, job_id):
+    """
+    Returns the status of a bundle import job as JSON
+
+    Jobs which have not finished yet are returned with status 202.
+    """
+    job = get_object_or_404(BundleImportJob, id=job_id,
+        project__slug=project_slug)
+    if job.status == job.STATUS_FAILED:
+        status = 400
+    elif job.status == job.STATUS_DONE:
+        status = 200
+    else:
+        status = 202
+    return HttpResponse(simplejson.dumps({
+            'status': status,
+            'job': job.as_dict(),
+        }), status=status, mimetype='application/json')
+
+
 @login_required
 @one_perm_required_or_403(pr_resource_add_change,
     (Project, 'slug__exact', 'project_slug'))
@@ -132,50 +183,41 @@ def message_watchers(request, project_slug):
         })
 
 
+@never_cache
 def get_translation_zip(request, project_slug, lang_code, mode=None):
     """
     Download all resources in given language in one ZIP file
+
+    The archive is streamed, so the response is never cached; the cache
+    middleware would have to pickle its generator.
     """
     project = get_object_or_404(Project, slug=project_slug)
     language = get_object_or_404(Language, code=lang_code)
 
-    zip_buffer = StringIO()
-    zip_file = zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED)
-    for resource in Resource.objects.filter(project=project):
-        template = _compile_translation_template(resource, language, mode)
-        zip_file.writestr(resource.name, template)
-
-    zip_file.close()
-    zip_buffer.flush()
-    zip_contents = zip_buffer.getvalue()
+    entries = [(resource.name, resource, language, mode, None)
+        for resource in Resource.objects.filter(project=project)]
 
     if mode == Mode.TRANSLATED:
         subname = "empty"
     else:
         subname = "replaced"
-    response = HttpResponse(mimetype='application/zip')
+    response = HttpResponse(
+        _zip_stream(entries, settings.ZIP_EXPORT_PROCESSES),
+        mimetype='application/zip')
     response['Content-Disposition'] = 'filename=%s_%s_%s.zip' % \
         (project_slug, lang_code, subname)
-    response.write(zip_contents)
     return response
 
+@never_cache
 def get_all_translations_zip(request, project_slug, mode=None, skip=None):
     """
     Download all resources/languages in given project in one big ZIP file
+
+    The prebuilt archive is served if there is one (see impala.langpacks).
+    Otherwise, the archive is streamed, each file being sent as soon as it
+    is compiled. Neither response is cached.
     """
     project = get_object_or_404(Project, slug=project_slug)
-    resources = Resource.objects.filter(project=project)
-    zip_buffer = StringIO()
-    zip_file = zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED)
-    for stat in RLStats.objects.for_user(request.user).by_project_language_aggregated(project):
-        for resource in resources:
-            template = _compile_translation_template(resource, stat.object, mode, skip)
-            zip_file.writestr("%s/%s" % (stat.object.code, resource.name), template)
-
-    zip_file.close()
-    zip_buffer.flush()
-    zip_contents = zip_buffer.getvalue()
-
     if mode == Mode.TRANSLATED:
         subname = "empty"
     elif skip:
@@ -183,12 +225,139 @@ def get_all_translations_zip(request, project_slug, mode=None, skip=None):
     else:
         subname = "replaced"
     filename = project_slug + "_" + subname
-    response = HttpResponse(mimetype='application/zip')
+
+    if not project.private:
+        path = langpack_path(project, subname)
+        if os.path.exists(path):
+            return _serve_file(request, path, filename + '.zip',
+                'application/zip')
+
+    resources = list(Resource.objects.filter(project=project))
+    entries = []
+    for stat in RLStats.objects.for_user(request.user).by_project_language_aggregated(project):
+        for resource in resources:
+            entries.append(("%s/%s" % (stat.object.code, resource.name),
+                resource, stat.object, mode, skip))
+
+    response = HttpResponse(
+        _zip_stream(entries, settings.ZIP_EXPORT_PROCESSES),
+        mimetype='application/zip')
     response['Content-Disposition'] = 'filename=%s.zip' % filename
-    response.write(zip_contents)
     return response
 
 
+def _read_chunks(f, length, chunk_size=64 * 1024):
+    """
+    Yields length bytes of the file in chunks and closes it
+    """
+    try:
+        while length > 0:
+            data = f.read(min(chunk_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        f.close()
+
+
+@never_cache
+def _serve_file(request, path, filename, mimetype):
+    """
+    Serves a file, through the web server with X-Sendfile if
+    LANGPACK_SENDFILE is set, or else with support for single byte ranges
+
+    The file is read in chunks by a generator, so the response is never
+    cached, whichever view returns it.
+    """
+    if settings.LANGPACK_SENDFILE:
+        response = HttpResponse(mimetype=mimetype)
+        response['X-Sendfile'] = path
+        response['Content-Disposition'] = 'filename=%s' % filename
+        return response
+
+    size = os.path.getsize(path)
+    start, end = 0, size - 1
+    match = RANGE_RE.match(request.META.get('HTTP_RANGE', ''))
+    ranged = bool(match and (match.group(1) or match.group(2)))
+    if ranged:
+        if not match.group(1):
+            # the last bytes
+            start = max(size - int(match.group(2)), 0)
+        else:
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(int(match.group(2)), size - 1)
+        if start > end:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */%s' % size
+            return response
+
+    f = open(path, 'rb')
+    f.seek(start)
+    response = HttpResponse(_read_chunks(f, end - start + 1),
+        mimetype=mimetype, status=ranged and 206 or 200)
+    if ranged:
+        response['Content-Range'] = 'bytes %s-%s/%s' % (start, end, size)
+    response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = 'filename=%s' % filename
+    return response
+
+
+def _compile_entry(args):
+    """
+    Compiles a file of a ZIP archive, possibly in a worker process of a pool
+    """
+    name, resource, language, mode, skip = args
+    return name, _compile_translation_template(resource, language, mode, skip)
+
+
+def _compile_entries(entries, processes=1):
+    """
+    Yields the name and content of the entries in order, compiling them in a
+    pool of processes, if there are more than one.
+
+    At most two entries per process are compiled ahead of the one being
+    sent, which bounds the memory used.
+    """
+    if processes < 2:
+        for entry in entries:
+            yield _compile_entry(entry)
+        return
+    pool = multiprocessing.Pool(processes, init_worker)
+    try:
+        pending = deque()
+        for entry in entries:
+            pending.append(pool.apply_async(_compile_entry, (entry,)))
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _zip_stream(entries, processes=1):
+    """
+    Yields the chunks of a ZIP archive with the compiled entries, see
+    _compile_entry
+
+    The archive is sent after the request has finished and closed the
+    database connections, so the ones opened to compile the entries are
+    closed when it ends.
+    """
+    stream = ZipStream()
+    try:
+        for (name, content) in _compile_entries(entries, processes):
+            yield stream.add(name, content)
+        yield stream.close()
+    finally:
+        for conn in connections.all():
+            conn.close()
+
+
 def get_tranlation_file_skipped(request, project_slug, resource_slug, lang_code):
     """ Download Skipped version of the resource's translation
     """
@@ -199,48 +368,55 @@ def get_tranlation_file_skipped(request, project_slug, resource_slug, lang_code)
     response = HttpResponse(template, mimetype='text/plain')
     return response
 
+@never_cache
 def get_translation_xpi(request, project_slug, lang_code):
     """ Compile project's XPI in given language
+
+    The localized XPI is the base XPI (see XpiFile.build_base), sent as it
+    is, followed by the compiled locale files and a new chrome.manifest.
+    The response is a generator, so it is never cached.
     """
+    start = time.time()
     project = get_object_or_404(Project, slug=project_slug)
     language = get_object_or_404(Language, code=lang_code)
     xpi = get_object_or_404(XpiFile, project=project)
 
-    zip_orig = zipfile.ZipFile(os.path.join(settings.XPI_DIR,xpi.filename), "r")
-
-    zip_buffer = StringIO()
-    zip_file = zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED)
-
-    # copy all the contents from original file except META-INF,
-    # to make it unsigned
-    for item in zip_orig.infolist():
-        if not (item.filename.startswith('META-INF') or
-                item.filename == 'chrome.manifest'):
-            fn = item.filename
-            data = zip_orig.read(item.filename)
-            zip_file.writestr(item, data)
+    base_file = open(xpi.get_base(), "rb")
+    base = zipfile.ZipFile(base_file, "r")
+    stream = ZipStream()
+    stream.resume(base)
+    base_time = time.time() - start
 
     # write our localization
+    entries = []
     for resource in Resource.objects.filter(project=project):
         template = _compile_translation_template(resource, language)
-        zip_file.writestr("tx-locale/%s/%s" % (lang_code, resource.name), template)
+        entries.append(stream.add("tx-locale/%s/%s" % (lang_code, resource.name),
+            template))
+    compile_time = time.time() - start - base_time
 
+    zip_orig = zipfile.ZipFile(xpi.path, "r")
     chrome_str = zip_orig.read("chrome.manifest")
+    zip_orig.close()
     manifest = ChromeManifest(chrome_str, "manifest")
 
-    zip_file.writestr("chrome.manifest", chrome_str +\
+    entries.append(stream.add("chrome.manifest", chrome_str +\
         "\nlocale %(predicate)s %(code)s tx-locale/%(code)s/\n" % {
             'predicate': list(manifest.get_triples("locale"))[0]['predicate'],
             'code': lang_code,
-        })
-
-    zip_file.close()
-    zip_buffer.flush()
-    zip_contents = zip_buffer.getvalue()
+        }))
+    entries.append(stream.close())
+    logger.debug("XPI of %s in %s: base in %.3fs, %s files compiled in "
+        "%.3fs, %.3fs in total" % (project_slug, lang_code, base_time,
+        len(entries) - 2, compile_time, time.time() - start))
 
-    response = HttpResponse(mimetype='application/x-xpinstall')
+    base_file.seek(0)
+    response = HttpResponse(
+        chain(_read_chunks(base_file, base.start_dir), entries),
+        mimetype='application/x-xpinstall')
+    response['Content-Length'] = str(
+        base.start_dir + sum(len(entry) for entry in entries))
     response['Content-Disposition'] = 'filename=%s.xpi' % project_slug
-    response.write(zip_contents)
     return response
 
 
@@ -250,37 +426,11 @@ def _compile_translation_template(resource=None, language=None, mode=None, skip=
     """
     # FIXME: doesn't work with Language from RLStats. DAFAQ?
     language = Language.objects.get(code=language.code)
-    if not mode:
+    if skip:
+        mode = Mode.SKIPPED # only the translated strings
+    elif not mode:
         mode = Mode.DEFAULT # meaning "for use"
-    if not skip:
-        return FormatsBackend(resource, language).compile_translation(mode=mode)
-
-    from transifex.resources.formats.dtd import DTDHandler
-    from transifex.resources.formats.mozillaproperties import MozillaPropertiesHandler
-    from transifex.resources.models import Resource, SourceEntity, Translation
-    formats = {
-        'DTD': {
-            'handler': DTDHandler(),
-            'template': '<!ENTITY %s "%s">',
-            'comment': lambda s: "<!--%s-->" % s,
-        },
-        'MOZILLAPROPERTIES': {
-            'handler': MozillaPropertiesHandler(),
-            'template': '%s=%s',
-            'comment': lambda s: "\n".join(["#" + l for l in s.split("\n")]),
-        }
-    }
-    res = ""
-    for t in Translation.objects.filter(resource=resource, language=language
-        ).select_related('source_entity').order_by('source_entity__order'):
-        se = t.source_entity
-        format = formats[resource.i18n_type]
-        if se.developer_comment:
-            res += format['comment'](se.developer_comment) + "\n"
-        res += format['template'] % (
-            se.string, format['handler']._escape(t.string)
-            ) + "\n"
-    return res.encode('UTF-8')
+    return FormatsBackend(resource, language).compile_translation(mode=mode)
 
 
 # COPY: copied from resourses.views to change filename to simple
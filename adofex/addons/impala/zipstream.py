@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Writing of ZIP archives as streams of chunks.
+
+zipfile.ZipFile needs a seekable file and keeps all the archive in it. Here
+every entry is compressed and returned as soon as it is added, so that it
+can be sent to the client right away, and only the central directory
+records are kept until the archive is closed.
+"""
+import time
+import zlib
+import struct
+import zipfile
+
+
+class ZipStream(object):
+    """
+    A ZIP archive written as a stream of chunks
+    """
+
+    def __init__(self, compression=zipfile.ZIP_DEFLATED):
+        self.compression = compression
+        self.offset = 0
+        self.central_directory = []
+
+    def _dos_date_time(self, date_time):
+        "Returns the MS-DOS date and time of a time tuple"
+        dosdate = (date_time[0] - 1980) << 9 | date_time[1] << 5 | date_time[2]
+        dostime = date_time[3] << 11 | date_time[4] << 5 | (date_time[5] // 2)
+        return dosdate, dostime
+
+    def _entry(self, name, flags, compression, date_time, crc, data, size,
+            external_attr=0644 << 16L):
+        """
+        Returns the local header and the (compressed) data of an entry and
+        keeps its central directory record
+        """
+        if isinstance(name, unicode):
+            name = name.encode('UTF-8')
+            flags |= 0x800
+        if self.offset + len(data) > zipfile.ZIP64_LIMIT:
+            raise zipfile.LargeZipFile("Archive too large for a ZIP stream")
+        dosdate, dostime = self._dos_date_time(date_time)
+        header = struct.pack(zipfile.structFileHeader,
+            zipfile.stringFileHeader, 20, 0, flags, compression,
+            dostime, dosdate, crc, len(data), size, len(name), 0)
+        self.central_directory.append(self._central_record(name, flags,
+            compression, dostime, dosdate, crc, len(data), size,
+            external_attr, self.offset))
+        entry = header + name + data
+        self.offset += len(entry)
+        return entry
+
+    def _central_record(self, name, flags, compression, dostime, dosdate,
+            crc, compress_size, size, external_attr, offset):
+        "Returns the central directory record of an entry"
+        return struct.pack(zipfile.structCentralDir,
+            zipfile.stringCentralDir, 20, 3, 20, 0, flags, compression,
+            dostime, dosdate, crc, compress_size, size, len(name), 0, 0, 0, 0,
+            external_attr, offset) + name
+
+    def add(self, name, data, date_time=None):
+        """
+        Compresses ``data`` and returns the entry of the archive for it,
+        local header included
+        """
+        if isinstance(data, unicode):
+            data = data.encode('UTF-8')
+        crc = zlib.crc32(data) & 0xffffffff
+        size = len(data)
+        if self.compression == zipfile.ZIP_DEFLATED:
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION,
+                zlib.DEFLATED, -15)
+            data = compressor.compress(data) + compressor.flush()
+        return self._entry(name, 0, self.compression,
+            date_time or time.localtime(time.time())[:6], crc, data, size)
+
+    def add_raw(self, zinfo, data):
+        """
+        Returns the entry of a member of another archive, given its
+        ZipInfo and its compressed data (see read_raw), which is copied as
+        it is
+        """
+        # sizes are in the local header, no data descriptor follows
+        return self._entry(zinfo.filename, zinfo.flag_bits & ~0x08,
+            zinfo.compress_type, zinfo.date_time, zinfo.CRC, data,
+            zinfo.file_size, zinfo.external_attr)
+
+    def resume(self, zip_file):
+        """
+        Continues the archive of ``zip_file``, a zipfile.ZipFile, whose
+        entries (everything up to its central directory) have been sent
+        """
+        for zinfo in zip_file.infolist():
+            name = zinfo.filename
+            if isinstance(name, unicode):
+                name = name.encode('UTF-8')
+            dosdate, dostime = self._dos_date_time(zinfo.date_time)
+            self.central_directory.append(self._central_record(name,
+                zinfo.flag_bits, zinfo.compress_type, dostime, dosdate,
+                zinfo.CRC, zinfo.compress_size, zinfo.file_size,
+                zinfo.external_attr, zinfo.header_offset))
+        self.offset = zip_file.start_dir
+
+    def close(self):
+        """
+        Returns the central directory, the last chunk of the archive
+        """
+        directory = "".join(self.central_directory)
+        count = len(self.central_directory)
+        self.central_directory = []
+        return directory + struct.pack(zipfile.structEndArchive,
+            zipfile.stringEndArchive, 0, 0, count, count, len(directory),
+            self.offset, 0)
+
+
+def read_raw(zip_file, zinfo):
+    """
+    Returns the compressed data of a member of a zipfile.ZipFile, without
+    decompressing it
+    """
+    zip_file.fp.seek(zinfo.header_offset)
+    header = struct.unpack(zipfile.structFileHeader,
+        zip_file.fp.read(zipfile.sizeFileHeader))
+    zip_file.fp.seek(header[zipfile._FH_FILENAME_LENGTH] +
+        header[zipfile._FH_EXTRA_FIELD_LENGTH], 1)
+    return zip_file.fp.read(zinfo.compress_size)
@@ -39,11 +39,34 @@ class ChromeManifest(object):
 
         self.triples = triples
 
+        # Index the triples by subject and by predicate, so that lookups
+        # do not need to scan all of them.
+        self.by_subject = {}
+        self.by_predicate = {}
+        for triple in triples:
+            self.by_subject.setdefault(triple["subject"], []).append(triple)
+            self.by_predicate.setdefault(triple["predicate"], []).append(
+                triple)
+
+    def _candidates(self, subject=None, predicate=None):
+        """Returns the triples that may match the given subject and
+        predicate, in the order of the manifest, from the smallest index
+        that applies."""
+
+        candidates = self.triples
+        if subject:
+            candidates = self.by_subject.get(subject, [])
+        if predicate:
+            by_predicate = self.by_predicate.get(predicate, [])
+            if len(by_predicate) < len(candidates):
+                candidates = by_predicate
+        return candidates
+
     def get_value(self, subject=None, predicate=None, object_=None):
         """Returns the first triple value matching the given subject,
         predicate, and/or object"""
 
-        for triple in self.triples:
+        for triple in self._candidates(subject, predicate):
 
             # Filter out non-matches
             if (subject and triple["subject"] != subject) or \
@@ -60,7 +83,7 @@ class ChromeManifest(object):
         """Returns a generator of objects that correspond to the
         specified subjects and predicates."""
 
-        for triple in self.triples:
+        for triple in self._candidates(subject, predicate):
 
             # Filter out non-matches
             if (subject and
@@ -75,7 +98,7 @@ class ChromeManifest(object):
         """Returns triples that correspond to the specified subject,
         predicates, and objects."""
 
-        for triple in self.triples:
+        for triple in self._candidates(subject, predicate):
 
             # Filter out non-matches
             if subject is not None and triple["subject"] != subject:
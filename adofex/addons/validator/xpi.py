@@ -26,12 +26,16 @@ class XPIManager(object):
         self.subpackage = subpackage
 
         self.contents_cache = None
+        # Names of the members below each directory, see files_under()
+        self.directory_cache = None
+        # Managers of the nested JARs by name, see open_jar()
+        self.jar_cache = {}
 
     def __iter__(self):
         return (name for name in self.zf.namelist())
 
     def __contains__(self, item):
-        return item in self.zf.namelist()
+        return item in self.zf.NameToInfo
 
     def info(self, name):
         """Get info on a single file."""
@@ -61,14 +65,44 @@ class XPIManager(object):
         self.contents_cache = out_files
         return out_files
 
+    def files_under(self, directory):
+        """Returns the names of all the files below a directory (and its
+        subdirectories), using an index of the directories that is built
+        once."""
+
+        if self.directory_cache is None:
+            index = {}
+            for name in self.zf.namelist():
+                parts = name.strip("/").split("/")
+                for i in range(1, len(parts)):
+                    index.setdefault("/".join(parts[:i]), []).append(name)
+            self.directory_cache = index
+        return self.directory_cache.get(directory.strip("/"), [])
+
+    def open_jar(self, name):
+        """Returns a manager for a JAR inside the archive, reading it only
+        the first time it is asked for."""
+
+        if name not in self.jar_cache:
+            self.jar_cache[name] = XPIManager(StringIO(self.read(name)),
+                                              mode="r", name=name,
+                                              subpackage=True)
+        return self.jar_cache[name]
+
     def read(self, filename):
         "Reads a file from the archive and returns a string."
 
         data = self.zf.read(filename)
         return data
 
+    def _clear_caches(self):
+        "Forget the information about the members, when they change"
+        self.contents_cache = None
+        self.directory_cache = None
+
     def write(self, name, data):
         """Write a blob of data to the XPI manager."""
+        self._clear_caches()
         if isinstance(data, StringIO):
             self.zf.writestr(name, data.getvalue())
         else:
@@ -80,4 +114,5 @@ class XPIManager(object):
         if path is None:
             path = name
 
+        self._clear_caches()
         self.zf.write(path, name)
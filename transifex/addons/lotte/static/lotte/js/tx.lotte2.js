@@ -390,7 +390,7 @@ function StringSet(json_object, push_url, from_lang, to_lang) {
 
             $.ajax({
                 url: push_url,
-                data: JSON.stringify({strings: to_update}),
+                data: JSON.stringify({strings: to_update, batch: !ts}),
                 dataType : "text", // "json" is strict and we get 500
                 type: "POST",
                 contentType: "application/json",
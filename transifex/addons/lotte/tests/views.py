@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
+from __future__ import with_statement
+from mock import patch
+from django.core.cache import get_cache
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.db.models.loading import get_model
 from django.utils import simplejson as json
 from transifex.txcommon.tests.base import BaseTestCase
+from lotte.views import _get_stringset
 from utils import *
 
 
@@ -327,6 +332,40 @@ class LotteViewsTests(BaseTestCase):
             source_entity=self.source_entity4,
             language=self.language_ar).count(), 1)
 
+    def test_push_translations_batch(self):
+        """Test pushing many translations at once in batch mode."""
+        data = {"batch": True, "strings":[
+            {"id": self.source_string3.id, "translations": {"other": ""}},
+            {"id": self.source_string4.id,
+             "translations": {"other": "String with arguments: %s %f"}},
+            {"id": self.source_string1.id,
+             "translations": {"other": "ArabicString2_1"}},
+            {"id": self.source_string2.id,
+             "translations": {"other": "ArabicString3"}},
+            {"id": self.source_string_plural1.id,
+             "translations": dict((rule, "") for rule in
+                self.language_ar.get_pluralrules())},
+        ]}
+        resp = self.client['maintainer'].post(self.push_translation,
+            json.dumps(data), content_type='application/json')
+        self.assertEqual(resp.status_code, 200)
+        results = json.loads(resp.content)
+        self.assertEqual(results[str(self.source_string3.id)]['message'],
+            'The translation string is empty')
+        self.assertEqual(results[str(self.source_string4.id)]['status'], 400)
+        for source_string in (self.source_string1, self.source_string2,
+                self.source_string_plural1):
+            self.assertEqual(results[str(source_string.id)]['status'], 200)
+
+        translations = Translation.objects.filter(language=self.language_ar)
+        self.assertFalse(translations.filter(source_entity__in=[
+            self.source_entity3, self.source_entity4,
+            self.source_entity_plural]).exists())
+        self.assertEqual(translations.get(
+            source_entity=self.source_entity1).string, "ArabicString2_1")
+        self.assertEqual(translations.get(
+            source_entity=self.source_entity2).string, "ArabicString3")
+
     def test_dt_search_string(self):
         """Test the Datatable's search."""
         self.DataTable_params["sSearch"] = "ArabicTrans"
@@ -399,7 +438,64 @@ class LotteViewsTests(BaseTestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertContains(resp, 'Bad request.')
 
-
-
-
-
+    def _count_stringset_queries(self, params):
+        """Return the number of queries needed to build the stringset
+        datatable with the given params.
+        """
+        connection.use_debug_cursor = True
+        try:
+            start = len(connection.queries)
+            resp = _get_stringset(params, [self.resource], self.language_ar,
+                review=True)
+            self.assertEqual(resp.status_code, 200)
+            return len(connection.queries) - start
+        finally:
+            connection.use_debug_cursor = None
+
+    def test_stringset_queries(self):
+        """Test that the number of queries for the stringset datatable
+        does not depend on the number of displayed rows.
+        """
+        for se in (self.source_entity1, self.source_entity2):
+            se.suggestions.create(string='Suggestion', language=self.language_ar)
+        self.DataTable_params['more_languages'] = '%s,%s,' % (
+            self.language.id, self.language_en.id
+        )
+        self.DataTable_params['iDisplayLength'] = 1
+        one_row = self._count_stringset_queries(self.DataTable_params)
+        self.DataTable_params['iDisplayLength'] = 50
+        all_rows = self._count_stringset_queries(self.DataTable_params)
+        self.assertEqual(one_row, all_rows)
+        self.assertTrue(all_rows <= 8)
+
+        resp = _get_stringset(self.DataTable_params, [self.resource],
+            self.language_ar, review=True)
+        rows = json.loads(resp.content)['aaData']
+        self.assertTrue(len(rows) > 1)
+        suggestions = dict((row[1], row[4]) for row in rows)
+        self.assertEqual(suggestions['String2'], 1)
+        self.assertEqual(suggestions['String4'], 0)
+
+    def test_stringset_keyset_pagination(self):
+        """Test that pages fetched by seeking match the ones fetched with
+        an offset.
+        """
+        expected = list(Translation.objects.source_strings(
+            [self.resource]).order_by('-string', '-id').values_list(
+            'id', flat=True))
+        self.assertTrue(len(expected) > 2)
+
+        locmem = get_cache('django.core.cache.backends.locmem.LocMemCache')
+        self.DataTable_params.update({'iSortCol_0': 2, 'sSortDir_0': 'desc',
+            'iDisplayLength': 2})
+        with patch('transifex.resources.cache.cache', locmem):
+            with patch('lotte.views.cache', locmem):
+                ids = []
+                for dstart in range(0, len(expected), 2):
+                    self.DataTable_params['iDisplayStart'] = dstart
+                    resp = _get_stringset(self.DataTable_params,
+                        [self.resource], self.language_ar)
+                    data = json.loads(resp.content)
+                    self.assertEqual(data['iTotalRecords'], len(expected))
+                    ids.extend(row[0] for row in data['aaData'])
+        self.assertEqual(ids, expected)
@@ -17,7 +17,6 @@ from django.utils import simplejson
 from django.utils.translation import ugettext as _
 from django.utils.html import escape
 from django.views.generic import list_detail
-from django.db import transaction
 from authority.views import permission_denied
 
 from actionlog.models import action_logging
@@ -27,10 +26,12 @@ from transifex.projects.models import Project
 from transifex.projects.permissions import *
 from transifex.projects.permissions.project import ProjectPermission
 from transifex.resources.models import Translation, Resource, SourceEntity, \
-    ReviewHistory, get_source_language
-from transifex.resources.handlers import invalidate_stats_cache
-from transifex.resources.formats.validators import create_error_validators, \
-        create_warning_validators, ValidationError
+    StatsDelta, get_source_language
+from transifex.resources.cache import cached_count, queryset_key, \
+    commit_on_success
+from transifex.resources.handlers import apply_stats_delta
+from transifex.resources.formats.validators import error_validator_chain, \
+        warning_validator_chain, ValidationError
 from transifex.teams.models import Team
 from transifex.txcommon.decorators import one_perm_required_or_403
 from transifex.txcommon.utils import normalize_query
@@ -351,11 +352,12 @@ def _get_stringset(post_data, resources, language, review=False, session='', *ar
         resource__in=resources,
         language=language)
 
+    more_languages = []
     if not isinstance(source_strings, list):
-        more_languages = []
         if post_data and post_data.has_key('more_languages'):
             # rsplit is used to remove the trailing ','
-            more_languages = post_data.get('more_languages').rstrip(',').split(',')
+            more_languages = filter(None,
+                post_data.get('more_languages').rstrip(',').split(','))
 
         # keyword filtering
         search = post_data.get('sSearch', '')
@@ -373,18 +375,24 @@ def _get_stringset(post_data, resources, language, review=False, session='', *ar
                 source_strings = source_strings.filter(search_filter_query)
 
         # sorting
+        # The id breaks ties, so that the rows can be paginated by seeking.
+        ordering = None
         scols = post_data.get('iSortingCols', '0')
         for i in range(0,int(scols)):
             if post_data.has_key('iSortCol_'+str(i)):
                 col = int(post_data.get('iSortCol_'+str(i)))
+                field = SORTING_DICT[col]
+                fields = field == 'id' and ['id'] or [field, 'id']
                 if post_data.has_key('sSortDir_'+str(i)) and \
                     post_data['sSortDir_'+str(i)] == 'asc':
-                    source_strings=source_strings.order_by(SORTING_DICT[col])
+                    source_strings=source_strings.order_by(*fields)
+                    ordering = (field, False)
                 else:
-                    source_strings=source_strings.order_by(SORTING_DICT[col]).reverse()
+                    source_strings=source_strings.order_by(*fields).reverse()
+                    ordering = (field, True)
 
         # for statistics
-        total = source_strings.count()
+        total = cached_count(source_strings, resources, language)
     else:
         total = 0
 
@@ -398,6 +406,14 @@ def _get_stringset(post_data, resources, language, review=False, session='', *ar
     # NOTE: It's important to keep the translation string matching inside this
     # iteration to prevent extra un-needed queries. In this iteration only the
     # strings displayed are calculated, saving a lot of resources.
+    if isinstance(source_strings, list):
+        page = source_strings[dstart:dstart+dlength]
+    else:
+        page = _get_page(source_strings.select_related('source_entity'),
+            resources, language, ordering, dstart, dlength)
+    # Fetch everything the displayed rows need with a fixed number of queries
+    data = _prefetch_stringset_data(page, resources, source_language,
+        language, more_languages)
     response_dict = {
         'sEcho': post_data.get('sEcho','1'),
         'iTotalRecords': total,
@@ -410,13 +426,13 @@ def _get_stringset(post_data, resources, language, review=False, session='', *ar
                 s.source_entity.string,
                 # 3. Get all the necessary source strings, including plurals and
                 # similar langs, all in a dictionary (see also below)
-                _get_source_strings(s, source_language, language.code, more_languages),
+                _get_source_strings(s, source_language, data),
                 # 4. Get all the Translation strings mapped with plural rules
                 # in a single dictionary (see docstring of function)
-                _get_strings(translated_strings, language, s.source_entity),
+                _get_strings(data, language, s.source_entity),
                 # 5. A number which indicates the number of Suggestion objects
                 # attached to this row of the table.
-                Suggestion.objects.filter(source_entity=s.source_entity, language__code=language.code).count(),
+                data['suggestions'].get(s.source_entity_id, 0),
                 # 6. save buttons and hidden context (ready to inject snippet)
                 # It includes the following content, wrapped in span tags:
                 # * SourceEntity object's "context" value
@@ -426,19 +442,16 @@ def _get_stringset(post_data, resources, language, review=False, session='', *ar
                  '<span class="undo edit-panel inactive" id="undo_' + str(counter) + '" style="border:0" title="' + _("Undo to initial text") + '"></span>'
                  '<span class="context" id="context_' + str(counter) + '" style="display:none;">' + escape(str(s.source_entity.context_string.encode('UTF-8'))) + '</span>'
                  '<span class="source_id" id="sourceid_' + str(counter) + '"style="display:none;">' + str(s.source_entity.id) + '</span>'),
-            ] for counter,s in enumerate(source_strings[dstart:dstart+dlength])
+            ] for counter,s in enumerate(page)
         ],
     }
 
     if review:
-        for counter, s in enumerate(source_strings[dstart:dstart+dlength]):
-            try:
-                translation = Translation.objects.get(
-                    source_entity__id=s.source_entity.id,
-                    language__code=language.code, rule=5
-                )
+        for counter, s in enumerate(page):
+            translation = data['translations'].get(s.source_entity_id, {}).get(5)
+            if translation is not None:
                 review_snippet = '<span><input class="review-check" title="' + _("Reviewed string") + '" id="review_source_' + str(s.source_entity.id) + '" type="checkbox" name="review" ' + ('checked="checked"' if translation.reviewed else '') + ' value="Review"/></span>',
-            except Translation.DoesNotExist:
+            else:
                 review_snippet = '<span><input class="review-check" title="' + _("Reviewed string") + '" id="review_source_' + str(s.source_entity.id) + '" type="checkbox" name="review" disabled="disabled" value="Review"/></span>',
 
             response_dict['aaData'][counter].append(review_snippet)
@@ -477,25 +490,13 @@ def proofread(request, project_slug, lang_code, resource_slug=None, *args, **kwa
 
     request_data = simplejson.loads(request.raw_post_data)
 
-    if 'true' in request_data:
-        source_entity_ids = request_data['true']
-        translations = Translation.objects.filter(
-            source_entity__id__in=source_entity_ids,
-            language__code=lang_code,
-        )
-        translations.update(reviewed=True)
-        ReviewHistory.add_many(translations, request.user, project.id, reviewed=True)
-
-    if 'false' in request_data:
-        source_entity_ids = request_data['false']
-        translations = Translation.objects.filter(
-            source_entity__id__in=source_entity_ids,
-            language__code=lang_code,
-        )
-        translations.update(reviewed=False)
-        ReviewHistory.add_many(translations, request.user, project.id, reviewed=False)
+    delta = StatsDelta()
+    for key, reviewed in (('true', True), ('false', False)):
+        if key in request_data:
+            delta += Translation.objects.set_reviewed(resource, language,
+                request_data[key], reviewed, request.user)
 
-    invalidate_stats_cache(resource, language, user=request.user)
+    apply_stats_delta(resource, language, delta, user=request.user)
 
     return HttpResponse(status=200)
 
@@ -669,10 +670,115 @@ def _get_user_filtered_source_strings(resources, users, language, *args, **kwarg
     return Translation.objects.user_translated_strings(resources, language, users)
 
 
-def _get_source_strings(source_string, source_language, lang_code, more_languages):
+def _get_page(source_strings, resources, language, ordering, dstart, dlength):
+    """
+    Return the ``dlength`` source strings starting at position ``dstart``.
+
+    Skipping the first ``dstart`` rows with an OFFSET gets slower the further
+    the page is. So, for ordered source strings, the sort key of the last row
+    of each page served is stored as the anchor of the next page, which is
+    then fetched by seeking past that row. Anchors are keyed by the query
+    and the versions of the translations, so that they are dropped whenever
+    the positions of the rows may have changed.
+
+    Args:
+        source_strings: The queryset of the source strings.
+        resources: The resources of the source strings.
+        language: The language of the translations.
+        ordering: A tuple of the field the source strings are ordered by
+            and a boolean, which is True for descending order, or None.
+        dstart: The position of the first row.
+        dlength: The number of rows.
+    Returns:
+        A list of the source strings.
+    """
+    key = ordering and queryset_key(source_strings, resources, language)
+    if not key:
+        return list(source_strings[dstart:dstart+dlength])
+
+    field, descending = ordering
+    anchor = dstart and cache.get('lotte_anchor_%s_%s' % (key, dstart))
+    if anchor:
+        value, pk = anchor
+        lookup = descending and 'lt' or 'gt'
+        query = Q(**{'id__%s' % lookup: pk})
+        if field != 'id':
+            query = Q(**{'%s__%s' % (field, lookup): value}) | \
+                    (Q(**{field: value}) & query)
+        page = list(source_strings.filter(query)[:dlength])
+    else:
+        page = list(source_strings[dstart:dstart+dlength])
+
+    if page:
+        last = page[-1]
+        cache.set('lotte_anchor_%s_%s' % (key, dstart + len(page)),
+            (getattr(last, field), last.id), 2*60*60)
+    return page
+
+
+def _prefetch_stringset_data(source_strings, resources, source_language,
+        language, more_languages):
+    """
+    Fetch the data needed for the rows of the given source strings.
+
+    A fixed number of queries is used, regardless of the number of rows:
+    one for the plural forms of the source strings, one for the translations
+    in the selected language, one for the number of suggestions and two for
+    the languages in ``more_languages`` and their translations.
+
+    Returns a dictionary with the keys:
+    'source_plurals': {<se_id>: [<Translation>, ...]}
+    'translations': {<se_id>: {<rule>: <Translation>}}
+    'suggestions': {<se_id>: <number of suggestions>}
+    'similar_languages': [<Language>, ...]
+    'similar_translations': {<se_id>: {<language_id>: [<Translation>, ...]}}
+    """
+    data = {
+        'source_plurals': {}, 'translations': {}, 'suggestions': {},
+        'similar_languages': [], 'similar_translations': {},
+    }
+    se_ids = [s.source_entity_id for s in source_strings]
+    if not se_ids:
+        return data
+
+    plural_ids = [
+        s.source_entity_id for s in source_strings
+        if s.source_entity.pluralized
+    ]
+    if plural_ids:
+        for t in Translation.objects.filter(source_entity__in=plural_ids,
+                language=source_language).exclude(rule=5).order_by('rule'):
+            data['source_plurals'].setdefault(t.source_entity_id, []).append(t)
+
+    for t in Translation.objects.filter(source_entity__in=se_ids,
+            resource__in=resources, language=language):
+        data['translations'].setdefault(t.source_entity_id, {})[t.rule] = t
+
+    data['suggestions'] = dict(
+        Suggestion.objects.filter(
+            source_entity__in=se_ids, language=language
+        ).values_list('source_entity').annotate(Count('id')).order_by()
+    )
+
+    if more_languages:
+        data['similar_languages'] = list(
+            Language.objects.filter(pk__in=more_languages)
+        )
+        for t in Translation.objects.filter(source_entity__in=se_ids,
+                language__in=data['similar_languages']).order_by('rule'):
+            data['similar_translations'].setdefault(
+                t.source_entity_id, {}
+            ).setdefault(t.language_id, []).append(t)
+    return data
+
+
+def _get_source_strings(source_string, source_language, data):
     """
     Get all the necessary source strings, including plurals and similar langs.
 
+    The strings are taken from ``data``, as returned by
+    ``_prefetch_stringset_data``.
+
     Returns a dictionary with the keys:
     'source_strings' : {"one":<string>, "two":<string>, ... , "other":<string>}
     'similar_lang_strings' :
@@ -687,18 +793,15 @@ def _get_source_strings(source_string, source_language, lang_code, more_language
 
     if source_entity.pluralized:
         # These are the remaining plural forms of the source string.
-        plural_strings = Translation.objects.filter(
-            source_entity = source_entity,
-            language = source_language).exclude(rule=5).order_by('rule')
-        for pl_string in plural_strings:
+        for pl_string in data['source_plurals'].get(source_entity.id, []):
             plural_name = source_language.get_rule_name_from_num(pl_string.rule)
             source_strings[plural_name] = pl_string.string
 
     # for each similar language fetch all the translation strings
-    for lang_id in more_languages:
-        l = Language.objects.get(pk=lang_id)
+    similar = data['similar_translations'].get(source_entity.id, {})
+    for l in data['similar_languages']:
         similar_lang_strings[l.name] = {}
-        for t in Translation.objects.filter(source_entity=source_entity, language=l).order_by('rule'):
+        for t in similar.get(l.id, []):
             plural_name = source_language.get_rule_name_from_num(t.rule)
             similar_lang_strings[l.name][plural_name] = t.string
     return { 'source_strings' : source_strings,
@@ -707,7 +810,7 @@ def _get_source_strings(source_string, source_language, lang_code, more_language
             }
 
 
-def _get_strings(query, target_language, source_entity):
+def _get_strings(data, target_language, source_entity):
     """
     Helper function for returning all the Translation strings or an empty dict.
 
@@ -718,21 +821,18 @@ def _get_strings(query, target_language, source_entity):
     plural forms.
     """
     # It includes the plural translations, too!
+    translations = data['translations'].get(source_entity.id, {})
     translation_strings = {}
     if source_entity.pluralized:
-        translations = query.filter(source_entity=source_entity).order_by('rule')
         # Fill with empty strings to have the Untranslated entries!
         for rule in target_language.get_pluralrules():
             translation_strings[rule] = ""
-        for translation in translations:
-            plural_name = target_language.get_rule_name_from_num(translation.rule)
-            translation_strings[plural_name] = translation.string
+        for rule in sorted(translations.keys()):
+            plural_name = target_language.get_rule_name_from_num(rule)
+            translation_strings[plural_name] = translations[rule].string
     else:
-        try:
-            translation_strings["other"] = query.get(source_entity=source_entity,
-                                                     rule=5).string
-        except Translation.DoesNotExist:
-            translation_strings["other"] = ""
+        translation = translations.get(5)
+        translation_strings["other"] = translation and translation.string or ""
     return translation_strings
 
 
@@ -785,14 +885,17 @@ def push_translation(request, project_slug, lang_code, *args, **kwargs):
     # translations-> translation strings (includes all plurals)
     # context-> source_entity context
     # occurrence-> occurrence (not yet well supported)
+    # If 'batch' is set, all rows are saved together (see _save_translations).
+    source_ids = [int(row['id']) for row in strings]
+    source_strings = Translation.objects.select_related(depth=1).in_bulk(
+        source_ids
+    )
+    batch = []
     # Iterate through all the row data that have been sent.
     for row in strings:
         source_id = int(row['id'])
-        try:
-            source_string = Translation.objects.select_related(depth=1).get(
-                id=source_id
-            )
-        except Translation.DoesNotExist:
+        source_string = source_strings.get(source_id)
+        if source_string is None:
             # TODO: Log or inform here
             push_response_dict[source_id] = { 'status':400,
                  'message':_("Source string cannot be identified in the DB")}
@@ -808,27 +911,18 @@ def push_translation(request, project_slug, lang_code, *args, **kwargs):
         # If the translated source string is pluralized check that all the
         # source language supported rules have been filled in, else return error
         # and donot save the translations.
-        if source_string.source_entity.pluralized:
-            error_flag = False
-            for rule in target_language.get_pluralrules():
-                if rule in row['translations'] and row['translations'][rule] != "":
-                    continue
-                else:
-                    error_flag = True
-            if error_flag:
-                error_flag = False
-                # Check also if all of them are "". If yes, delete all the plurals!
-                for rule in target_language.get_pluralrules():
-                    if rule in row['translations'] and row['translations'][rule] == "":
-                        continue
-                    else:
-                        error_flag = True
-            if error_flag:
-                push_response_dict[source_id] = { 'status':400,
-                    'message':(_("Cannot save unless plural translations are either "
-                               "completely specified or entirely empty!"))}
-                # Skip the save as we hit on an error.
-                continue
+        if source_string.source_entity.pluralized and not _plurals_complete(
+                row['translations'], target_language):
+            push_response_dict[source_id] = { 'status':400,
+                'message':(_("Cannot save unless plural translations are either "
+                           "completely specified or entirely empty!"))}
+            # Skip the save as we hit on an error.
+            continue
+
+        if data.get('batch'):
+            if source_id not in push_response_dict:
+                batch.append((source_string, row['translations']))
+            continue
         try:
             msgs = _save_translation(
                 source_string, row['translations'],
@@ -852,11 +946,27 @@ def push_translation(request, project_slug, lang_code, *args, **kwargs):
                 'status': 400, 'message': e.message
             }
 
+    if batch:
+        push_response_dict.update(
+            _save_translations(batch, target_language, request.user)
+        )
+
     json_dict = simplejson.dumps(push_response_dict)
     return HttpResponse(json_dict, mimetype='application/json')
 
 
-@transaction.commit_on_success
+def _plurals_complete(translations, target_language):
+    """Check that the plural translations are either all filled in or all
+    empty.
+    """
+    rules = target_language.get_pluralrules()
+    if [rule for rule in rules if rule not in translations]:
+        return False
+    empty = [rule for rule in rules if translations[rule] == ""]
+    return not empty or len(empty) == len(rules)
+
+
+@commit_on_success
 def _save_translation(source_string, translations, target_language, user):
     """Save a translation string to the database.
 
@@ -880,7 +990,10 @@ def _save_translation(source_string, translations, target_language, user):
     source_id = source_string.pk
     resource = source_string.resource
     source_language = resource.source_language
+    source_entity = source_string.source_entity
     warnings = []
+    delta = StatsDelta()
+    changed = False
 
     check = ProjectPermission(user)
     review_perm = check.proofread(resource.project, target_language)
@@ -900,18 +1013,15 @@ def _save_translation(source_string, translations, target_language, user):
 
         # check for errors
         try:
-            for ErrorValidator in create_error_validators(resource.i18n_method):
-                v = ErrorValidator(source_language, target_language, rule)
-                v(source_string.string, target_string)
+            error_validator_chain(resource.i18n_method)(source_language,
+                target_language, rule, source_string.string, target_string)
         except ValidationError, e:
             raise LotteBadRequestError(e.message)
         # check for warnings
-        for WarningValidator in create_warning_validators(resource.i18n_method):
-            v = WarningValidator(source_language, target_language, rule)
-            try:
-                v(source_string.string, target_string)
-            except ValidationError, e:
-                warnings.append(e.message)
+        warnings.extend(warning_validator_chain(resource.i18n_method).messages(
+            source_language, target_language, rule, source_string.string,
+            target_string
+        ))
         try:
             # TODO: Implement get based on context and/or on context too!
             translation_string = Translation.objects.get(
@@ -929,13 +1039,20 @@ def _save_translation(source_string, translations, target_language, user):
             # If an empty string has been issued then we delete the translation.
             if target_string == "":
                 translation_string.delete()
+                if rule == 5:
+                    delta.removed += 1
+                    if translation_string.reviewed:
+                        delta.reviewed -= 1
+                    delta.wordcount -= Translation.objects.source_wordcount(
+                        resource, [source_entity.id]
+                    )
             else:
                 translation_string.string = target_string
                 translation_string.user = user
                 translation_string.save()
 
-            _add_copyright(source_string, target_language, user)
-            invalidate_stats_cache(resource, target_language, user=user)
+            _add_copyright(resource, target_language, user)
+            changed = True
         except Translation.DoesNotExist:
             # Only create new if the translation string sent, is not empty!
             if target_string != "":
@@ -944,8 +1061,13 @@ def _save_translation(source_string, translations, target_language, user):
                     language=target_language, rule=rule, string=target_string,
                     resource=resource
                 )
-                _add_copyright(source_string, target_language, user)
-                invalidate_stats_cache(resource, target_language, user=user)
+                if rule == 5:
+                    delta.added += 1
+                    delta.wordcount += Translation.objects.source_wordcount(
+                        resource, [source_entity.id]
+                    )
+                _add_copyright(resource, target_language, user)
+                changed = True
             else:
                 # In cases of pluralized translations, sometimes only one
                 # translation will exist and the rest plural forms will be
@@ -965,15 +1087,201 @@ def _save_translation(source_string, translations, target_language, user):
             )
             logger.error(msg, exc_info=True)
             raise LotteBadRequestError(msg)
+    if changed:
+        apply_stats_delta(resource, target_language, delta, user=user)
     return warnings
 
 
-def _add_copyright(source_string, target_language, user):
+def _save_translations(rows, target_language, user):
+    """Save the translations of many source strings at once.
+
+    This is the batch counterpart of ``_save_translation``. All rows are
+    validated first, with the data they need fetched in a fixed number of
+    queries. Then, the translations of the valid rows are inserted, updated
+    and deleted in bulk in a single transaction, and the statistics and
+    caches are updated once for each resource.
+
+    Args:
+        rows: A list of (source_string, translations) tuples, where
+            ``source_string`` is a Translation object of the string in the
+            source language and ``translations`` maps the plural rule names
+            to the translated strings.
+        target_language: The language the strings are translated to.
+        user: The translator.
+    Returns:
+        A dictionary mapping the id of each source string to a dictionary
+        with the status (and a message) of its save.
+    """
+    results = {}
+    # If a string is sent more than once, the last translations are saved.
+    rows = dict((source_string.id, (source_string, translations))
+        for source_string, translations in rows).values()
+    se_ids = [source_string.source_entity_id for source_string, t in rows]
+    # The source language of each resource, fetched once
+    source_languages = Language.objects.in_bulk(set(
+        source_string.resource.source_language_id
+        for source_string, t in rows
+    ))
+    # Strings and wordcounts of the source strings of all rules, used for
+    # validation and wordcounts
+    sources = {}
+    for se_id, language_id, rule, string, wordcount in \
+            Translation.objects.filter(source_entity__in=se_ids,
+            language__in=source_languages.keys()).exclude(
+            language=target_language).values_list(
+            'source_entity', 'language', 'rule', 'string', 'wordcount'):
+        sources.setdefault(se_id, {})[(language_id, rule)] = (
+            string, wordcount
+        )
+    existing = {}
+    for t in Translation.objects.filter(source_entity__in=se_ids,
+            language=target_language):
+        existing[(t.source_entity_id, t.rule)] = t
+
+    check = ProjectPermission(user)
+    review_perms = {}
+    new_translations, updated, deleted = [], [], []
+    deltas = {}
+    for source_string, translations in rows:
+        resource = source_string.resource
+        source_entity = source_string.source_entity
+        source_language = source_languages[resource.source_language_id]
+        se_sources = sources.get(source_entity.id, {})
+        if resource.project_id not in review_perms:
+            review_perms[resource.project_id] = check.proofread(
+                resource.project, target_language
+            )
+        error_validators = error_validator_chain(resource.i18n_method)
+        warning_validators = warning_validator_chain(resource.i18n_method)
+
+        warnings = []
+        changes = []
+        delta = StatsDelta()
+        try:
+            for rule, target_string in translations.items():
+                rule = target_language.get_rule_num_from_name(rule)
+                # target language may have extra plural forms
+                source = se_sources.get(
+                    (source_language.id, rule), (source_string.string, None)
+                )[0]
+                try:
+                    error_validators(source_language, target_language, rule,
+                        source, target_string)
+                except ValidationError, e:
+                    raise LotteBadRequestError(e.message)
+                warnings.extend(warning_validators.messages(source_language,
+                    target_language, rule, source, target_string))
+
+                translation = existing.get((source_entity.id, rule))
+                if translation is not None:
+                    if translation.reviewed and not review_perms[
+                            resource.project_id]:
+                        raise LotteBadRequestError(
+                            _('You are not allowed to edit a reviewed string.')
+                        )
+                    if target_string == "":
+                        changes.append((deleted, translation))
+                        if rule == 5:
+                            delta.removed += 1
+                            if translation.reviewed:
+                                delta.reviewed -= 1
+                            delta.wordcount -= _source_wordcount(
+                                se_sources, source_language
+                            )
+                    else:
+                        translation.string = target_string
+                        translation.user = user
+                        changes.append((updated, translation))
+                elif target_string != "":
+                    changes.append((new_translations, Translation(
+                        source_entity=source_entity, user=user,
+                        language=target_language, rule=rule,
+                        string=target_string, resource=resource
+                    )))
+                    if rule == 5:
+                        delta.added += 1
+                        delta.wordcount += _source_wordcount(
+                            se_sources, source_language
+                        )
+                elif not source_entity.pluralized:
+                    raise LotteBadRequestError(
+                        _("The translation string is empty")
+                    )
+        except LotteBadRequestError, e:
+            logger.debug("%s" % e, exc_info=True)
+            results[source_string.id] = {'status': 400, 'message': e.message}
+            continue
+
+        for collection, translation in changes:
+            collection.append(translation)
+        if changes:
+            deltas.setdefault(resource.id, (resource, StatsDelta()))[1] += delta
+        results[source_string.id] = {'status': 200}
+        if warnings:
+            results[source_string.id]['message'] = warnings[-1]
+
+    try:
+        _apply_translation_changes(
+            new_translations, updated, deleted, deltas.values(),
+            target_language, user
+        )
+    except Exception, e:
+        # catch-all. if we don't save we _MUST_ inform the user
+        msg = _(
+            "Error occurred while trying to save translation: %s" % unicode(e)
+        )
+        logger.error(msg, exc_info=True)
+        for source_id, result in results.items():
+            if result['status'] == 200:
+                results[source_id] = {'status': 400, 'message': msg}
+    return results
+
+
+def _source_wordcount(sources, source_language):
+    """Return the wordcount of the source strings of all rules of an entity.
+
+    Args:
+        sources: A dictionary mapping (language_id, rule) tuples to the
+            (string, wordcount) tuples of the source strings of the entity.
+        source_language: The source language of the entity.
+    """
+    return sum(
+        wordcount for (language_id, rule), (string, wordcount) in
+        sources.items() if language_id == source_language.id
+    )
+
+
+@commit_on_success
+def _apply_translation_changes(new_translations, updated, deleted, deltas,
+        language, user):
+    """Save the changes of ``_save_translations`` in a single transaction.
+
+    Args:
+        new_translations: A list of Translation objects to insert.
+        updated: A list of Translation objects to update.
+        deleted: A list of Translation objects to delete.
+        deltas: A list of (resource, StatsDelta) tuples with the changes to
+            the statistics of each resource.
+        language: The language of the translations.
+        user: The translator.
+    """
+    for translation in new_translations + updated:
+        translation.presave()
+    Translation.objects.bulk_insert(new_translations)
+    if updated:
+        Translation.objects.bulk_update(updated)
+    if deleted:
+        Translation.objects.filter(id__in=[t.id for t in deleted]).delete()
+    for resource, delta in deltas:
+        _add_copyright(resource, language, user)
+        apply_stats_delta(resource, language, delta, user=user)
+
+
+def _add_copyright(resource, target_language, user):
     from transifex.addons.copyright.handlers import lotte_copyrights
     lotte_save_translation.connect(lotte_copyrights)
     lotte_save_translation.send(
-        None, resource=source_string.resource,
-        language=target_language, user=user
+        None, resource=resource, language=target_language, user=user
     )
 
 
@@ -1052,6 +1360,15 @@ def delete_translation(request, project_slug=None, resource_slug=None,
         translations = Translation.objects.filter(source_entity__pk__in=ids,
                                    language=language)
 
+        deleted = translations.filter(rule=5).values_list(
+            'source_entity_id', 'reviewed')
+        delta = StatsDelta(
+            removed=len(deleted),
+            reviewed=-len([r for se_id, r in deleted if r]),
+            wordcount=-Translation.objects.source_wordcount(
+                resource, [se_id for se_id, r in deleted]
+            )
+        )
         translations.delete()
 #        request.user.message_set.create(
 #            message=_("Translations deleted successfully!"))
@@ -1060,7 +1377,7 @@ def delete_translation(request, project_slug=None, resource_slug=None,
 #            message=_("Failed to delete translations due to some error!"))
         raise Http404
 
-    invalidate_stats_cache(resource, language, user=request.user)
+    apply_stats_delta(resource, language, delta, user=request.user)
 
     return HttpResponse(status=200)
 
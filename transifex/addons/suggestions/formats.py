@@ -5,7 +5,7 @@ from django.conf import settings
 from suggestions.models import Suggestion
 from transifex.txcommon.log import logger
 from transifex.resources.models import Translation, SourceEntity
-from transifex.resources.formats.utils.string_utils import percent_diff
+from transifex.resources.formats.utils.string_utils import FuzzyIndex
 
 
 class SuggestionFormat(object):
@@ -25,29 +25,34 @@ class SuggestionFormat(object):
         The langs can contain a list of all languages for which the conversion
         will take place. Defaults to all available languages.
         """
-        if langs:
-            translations = Translation.objects.filter(source_entity=source,
-                language__in=langs, rule=5)
-        else:
-            translations = Translation.objects.filter(source_entity=source, rule=5)
-
-        for t in translations:
-            # Skip source language translations
-            if t.language == dest.resource.source_language:
-                continue
+        self._convert_many_to_suggestions([(source, dest)], user, langs)
 
-            tr, created = Suggestion.objects.get_or_create(
-                string = t.string,
-                source_entity = dest,
-                language = t.language
-            )
+    def _convert_many_to_suggestions(self, pairs, user=None, langs=None,
+                                     batch_size=500):
+        """Add the translations of the source entities of each (source, dest)
+        pair as suggestions to the dest one.
 
-            # If the suggestion was created and we have a user assign him as the
-            # one who made the suggestion
-            if created and user:
-                tr.user = user
-                tr.save()
-        return
+        The translations are fetched with one query per batch of pairs and
+        the suggestions are inserted in bulk.
+        """
+        source_language = self.resource.source_language
+        pairs = list(pairs)
+        for start in xrange(0, len(pairs), batch_size):
+            dests = {}
+            for source, dest in pairs[start:start + batch_size]:
+                dests.setdefault(source.id, []).append(dest.id)
+            translations = Translation.objects.filter(
+                source_entity__in=dests.keys(), rule=5
+            ).exclude(language=source_language)
+            if langs:
+                translations = translations.filter(language__in=langs)
+            Suggestion.objects.bulk_add([
+                Suggestion(string=string, source_entity_id=dest_id,
+                    language_id=language_id)
+                for se_id, language_id, string in translations.values_list(
+                    'source_entity_id', 'language_id', 'string').iterator()
+                for dest_id in dests[se_id]
+            ], user=user)
 
     def create_suggestions(self, original, new):
         """Create new suggestions.
@@ -66,22 +71,24 @@ class SuggestionFormat(object):
         Args:
             strings: An iterable of strings to add as suggestions
         """
+        strings = list(strings)
+        if not strings:
+            return
+        se_ids = dict(SourceEntity.objects.filter(
+            resource=self.resource
+        ).values_list('string_hash', 'id').iterator())
+        suggestions = []
         for j in strings:
-            # Check SE existence
-            try:
-                se = SourceEntity.objects.get(
-                    string = j.source_entity, context = j.context or "None",
-                    resource = self.resource
-                )
-            except SourceEntity.DoesNotExist:
+            se = SourceEntity(string=j.source_entity, context=j.context or "None")
+            se.presave()
+            if se.string_hash not in se_ids:
                 logger.warning(
                     "Source entity %s does not exist" % j.source_entity
                 )
                 continue
-            Suggestion.objects.get_or_create(
-                string = j.translation, source_entity = se,
-                language = self.language
-            )
+            suggestions.append(Suggestion(string=j.translation,
+                source_entity_id=se_ids[se.string_hash], language=self.language))
+        Suggestion.objects.bulk_add(suggestions)
 
 
 class KeySuggestionFormat(SuggestionFormat):
@@ -97,21 +104,43 @@ class ContentSuggestionFormat(SuggestionFormat):
     """
 
     def create_suggestions(self, original, new):
-        iterations = len(original)*len(new)
-        # If it's not over the limit, then do it
-        if iterations < settings.MAX_STRING_ITERATIONS:
-            for se in original:
-                for ne in new:
-                    try:
-                        old_trans = Translation.objects.get(source_entity=se,
-                            language=se.resource.source_language, rule=5)
-                        new_trans = Translation.objects.get(source_entity=ne,
-                            language=se.resource.source_language, rule=5)
-                    except Translation.DoesNotExist:
-                        # Source language translation should always exist
-                        # but just in case...
-                        continue
-                    # find Levenshtein distance
-                    if percent_diff(old_trans.string, new_trans.string) < settings.MAX_STRING_DISTANCE:
-                        self._convert_to_suggestions(se, ne, self.user)
-                        break
+        """Add the translations of each original source entity as
+        suggestions to the first new source entity with a similar source
+        string.
+
+        The source strings are loaded in one query and indexed, so that
+        the Levenshtein distance is only calculated for plausible pairs.
+        At most ``MAX_STRING_ITERATIONS`` pairs are compared.
+        """
+        if not original or not new or not settings.MAX_STRING_ITERATIONS:
+            return
+        original = list(original)
+        new = list(new)
+        se_ids = set(se.id for se in original) | set(se.id for se in new)
+        strings = dict(
+            (se_id, string) for se_id, string in Translation.objects.filter(
+                resource=self.resource, rule=5,
+                language=self.resource.source_language
+            ).values_list('source_entity_id', 'string').iterator()
+            if se_id in se_ids
+        )
+
+        # Source language translations should always exist but just in case...
+        new = [ne for ne in new if ne.id in strings]
+        index = FuzzyIndex(
+            [strings[ne.id] for ne in new], settings.MAX_STRING_DISTANCE
+        )
+        pairs = []
+        for se in original:
+            if se.id not in strings:
+                continue
+            if index.comparisons >= settings.MAX_STRING_ITERATIONS:
+                logger.warning(
+                    "Stopped looking for suggestions for resource %s after "
+                    "%s comparisons." % (self.resource, index.comparisons)
+                )
+                break
+            match = index.match(strings[se.id])
+            if match is not None:
+                pairs.append((se, new[match]))
+        self._convert_many_to_suggestions(pairs, self.user)
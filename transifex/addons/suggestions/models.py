@@ -7,6 +7,56 @@ from django.utils.translation import ugettext_lazy as _
 
 from transifex.languages.models import Language
 from transifex.resources.models import Resource, SourceEntity
+from transifex.txcommon.db.bulk import bulk_insert as insert_records
+
+
+class SuggestionManager(models.Manager):
+
+    def bulk_add(self, suggestions, user=None, batch_size=1000):
+        """Insert the suggestions that do not exist already.
+
+        Suggestions are unique per source entity, language and string hash.
+        The existing ones are found with one query per batch and only the
+        missing ones are inserted.
+
+        Args:
+            suggestions: An iterable of unsaved Suggestion objects.
+            user: The user to set for the new suggestions.
+            batch_size: The number of suggestions handled at a time.
+        Returns:
+            The number of suggestions inserted.
+        """
+        unique = {}
+        for s in suggestions:
+            s.presave()
+            unique.setdefault(
+                (s.source_entity_id, s.language_id, s.string_hash), s
+            )
+        keys = sorted(unique.keys())
+        inserted = 0
+        for start in xrange(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            se_ids = set(k[0] for k in batch)
+            existing = set()
+            order = {}
+            for key in self.filter(source_entity__in=se_ids).values_list(
+                'source_entity_id', 'language_id', 'string_hash').iterator():
+                existing.add(key)
+                order[key[0]] = order.get(key[0], 0) + 1
+            new = []
+            for key in batch:
+                if key in existing:
+                    continue
+                s = unique[key]
+                # Mimic order_with_respect_to, which only works in save()
+                s._order = order.get(key[0], 0)
+                order[key[0]] = s._order + 1
+                if user is not None:
+                    s.user = user
+                new.append(s)
+            insert_records(Suggestion, new)
+            inserted += len(new)
+        return inserted
 
 
 class Suggestion(models.Model):
@@ -45,6 +95,8 @@ class Suggestion(models.Model):
         verbose_name=_('User'), blank=False, null=True,
         help_text=_("The user who committed the specific suggestion."))
 
+    objects = SuggestionManager()
+
     def __unicode__(self):
         return self.string
 
@@ -93,9 +145,13 @@ class Suggestion(models.Model):
         """Return a nice, rounded (integer) version of the score."""
         return int(self.score)
 
-    def save(self, *args, **kwargs):
+    def presave(self):
+        """Do any necessary work before saving the object."""
         # Encoding happens to support unicode characters
         self.string_hash = md5(self.string.encode('utf-8')).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.presave()
         super(Suggestion, self).save(*args, **kwargs)
 
 
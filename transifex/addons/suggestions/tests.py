@@ -122,4 +122,29 @@ class SuggestionsModelsTests(BaseTestCase):
     def test_double_suggestion(self):
         self.assertRaises(IntegrityError, self._create_suggestion)
 
-
+    def test_bulk_add(self):
+        """Test that bulk_add only inserts the missing suggestions."""
+        Suggestion = self.suggestion.__class__
+        u = self.user["registered"]
+        inserted = Suggestion.objects.bulk_add([
+            Suggestion(string="Hey!", source_entity=self.entity,
+                language=self.language),
+            Suggestion(string="Hi!", source_entity=self.entity,
+                language=self.language),
+            Suggestion(string="Hi!", source_entity=self.entity,
+                language=self.language),
+            Suggestion(string="Hey!", source_entity=self.entity,
+                language=self.language_en),
+        ], user=u)
+        self.assertEqual(inserted, 2)
+        suggestions = self.entity.suggestions.all()
+        self.assertEqual(suggestions.count(), 3)
+        self.assertEqual(
+            sorted(s._order for s in suggestions), [0, 1, 2]
+        )
+        new = suggestions.get(language=self.language, string="Hi!")
+        self.assertEqual(new.user, u)
+        self.assertEqual(Suggestion.objects.bulk_add([
+            Suggestion(string="Hi!", source_entity=self.entity,
+                language=self.language),
+        ]), 0)
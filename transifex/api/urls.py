@@ -12,7 +12,8 @@ from transifex.languages.api import LanguageHandler
 from transifex.projects.api import ProjectHandler
 from transifex.resources.api import ResourceHandler, StatsHandler, \
         TranslationHandler, FormatsHandler, TranslationObjectsHandler,\
-        SingleTranslationHandler
+        SingleTranslationHandler, TranslationReviewHandler, \
+        TranslationCloneHandler, ImportJobHandler
 from transifex.releases.api import ReleaseHandler
 from transifex.actionlog.api import ActionlogHandler
 from transifex.api.views import reject_legacy_api
@@ -26,10 +27,15 @@ stats_handler = Resource(StatsHandler, authentication=auth)
 translation_handler = Resource(TranslationHandler, authentication=auth)
 actionlog_handler = Resource(ActionlogHandler, authentication=auth)
 formats_handler = Resource(FormatsHandler, authentication=auth)
+import_job_handler = Resource(ImportJobHandler, authentication=auth)
 translation_objects_handler = Resource(TranslationObjectsHandler,
         authentication=auth)
 single_translation_handler = Resource(SingleTranslationHandler,
         authentication=auth)
+translation_review_handler = Resource(TranslationReviewHandler,
+        authentication=auth)
+translation_clone_handler = Resource(TranslationCloneHandler,
+        authentication=auth)
 
 urlpatterns = patterns('',
     url(
@@ -172,5 +178,20 @@ urlpatterns = patterns('',
        single_translation_handler,
        {'api_version': 2},
        name='translation_string'
+    ), url(
+       r'^2/project/(?P<project_slug>[\w-]+)/resource/(?P<resource_slug>[\w-]+)/translation/(?P<language_code>[\-_@\w\.]+)/review/$',
+       translation_review_handler,
+       {'api_version': 2},
+       name='translation_review'
+    ), url(
+       r'^2/project/(?P<project_slug>[\w-]+)/resource/(?P<resource_slug>[\w-]+)/translation/(?P<language_code>[\-_@\w\.]+)/clone/$',
+       translation_clone_handler,
+       {'api_version': 2},
+       name='translation_clone'
+    ), url(
+       r'^2/project/(?P<project_slug>[\w-]+)/resource/(?P<resource_slug>[\w-]+)/import/(?P<job_id>\d+)/$',
+       import_job_handler,
+       {'api_version': 2},
+       name='import_job_api'
     )
 )
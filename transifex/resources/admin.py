@@ -21,8 +21,15 @@ class TemplateAdmin(admin.ModelAdmin):
         'resource__source_language__name']
     list_display = ['resource']
 
+class ImportJobAdmin(admin.ModelAdmin):
+    search_fields = ['resource__name', 'resource__project__name',
+        'user__username']
+    list_display = ['resource', 'language', 'user', 'status', 'created']
+    list_filter = ['status']
+
 
 admin.site.register(Resource, ResourceAdmin)
 admin.site.register(SourceEntity, SourceEntityAdmin)
 admin.site.register(Translation, TranslationAdmin)
 admin.site.register(Template, TemplateAdmin)
+admin.site.register(ImportJob, ImportJobAdmin)
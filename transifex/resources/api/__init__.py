@@ -5,7 +5,7 @@ import os
 import tempfile
 import urllib
 from itertools import ifilter
-from django.db import transaction, IntegrityError, DatabaseError
+from django.db import IntegrityError, DatabaseError
 from django.conf import settings
 from django.forms import ValidationError
 from django.http import HttpResponse
@@ -32,10 +32,10 @@ from transifex.projects.signals import post_submit_translation, post_resource_sa
 
 from transifex.resources.decorators import method_decorator
 from transifex.resources.models import Resource, SourceEntity, \
-        Translation as TranslationModel, RLStats
+        Translation as TranslationModel, RLStats, ImportJob
 from transifex.resources.backends import ResourceBackend, FormatsBackend, \
         ResourceBackendError, content_from_uploaded_file, \
-        filename_of_uploaded_file
+        filename_of_uploaded_file, start_import_job
 from transifex.resources.formats import Mode
 from transifex.resources.formats.registry import registry
 from transifex.resources.formats.core import ParseError
@@ -43,6 +43,7 @@ from transifex.resources.formats.pseudo import get_pseudo_class
 from transifex.teams.models import Team
 
 from transifex.resources.handlers import invalidate_stats_cache
+from transifex.resources.cache import commit_on_success
 
 from transifex.api.utils import BAD_REQUEST
 
@@ -50,6 +51,16 @@ from .translation_object import *
 from .exceptions import BadRequestError, NoContentError, NotFoundError, \
         ForbiddenError
 
+
+def import_job_dict(job):
+    """Return the status of an import job, along with the URL to poll."""
+    result = job.as_dict()
+    result['url'] = reverse('import_job_api', args=[
+        job.resource.project.slug, job.resource.slug, job.id
+    ])
+    return result
+
+
 class ResourceHandler(BaseHandler):
     """
     Resource Handler for CRUD operations.
@@ -188,7 +199,7 @@ class ResourceHandler(BaseHandler):
             return False
         return True
 
-    @transaction.commit_on_success
+    @commit_on_success
     def _create(self, request, project_slug, data):
         # Check for unavailable fields
         try:
@@ -238,15 +249,20 @@ class ResourceHandler(BaseHandler):
         except NoContentError, e:
             raise BadRequestError(unicode(e))
 
+        # The source file is imported by an import job, if 'async' is given
+        async_import = 'async' in request.GET
         try:
             rb = ResourceBackend()
             rb_create =  rb.create(
                 project, slug, name, method, project.source_language, content,
-                extra_data={'filename': filename}
+                user=request.user, extra_data={'filename': filename},
+                async_import=async_import
             )
             post_resource_save.send(sender=None, instance=Resource.objects.get(
                 slug=slug, project=project),
                     created=True, user=request.user)
+            if async_import:
+                return simplejson.dumps(import_job_dict(rb_create))
             return rb_create
         except ResourceBackendError, e:
             raise BadRequestError(unicode(e))
@@ -415,6 +431,33 @@ class StatsHandler(BaseHandler):
         return res
 
 
+class ImportJobHandler(BaseHandler):
+    allowed_methods = ('GET', )
+
+    @method_decorator(one_perm_required_or_403(pr_project_private_perm,
+        (Project, 'slug__exact', 'project_slug')))
+    def read(self, request, project_slug, resource_slug, job_id,
+             api_version=2):
+        """
+        Return the status of an import job.
+
+        Only the user who uploaded the file and the maintainers of the
+        project can see the status of a job.
+        """
+        try:
+            job = ImportJob.objects.select_related('resource__project').get(
+                id=job_id, resource__slug=resource_slug,
+                resource__project__slug=project_slug
+            )
+        except ImportJob.DoesNotExist:
+            return rc.NOT_FOUND
+        check = ProjectPermission(request.user)
+        if job.user != request.user and not check.maintain(
+                job.resource.project):
+            return rc.FORBIDDEN
+        return import_job_dict(job)
+
+
 class TranslationHandler(BaseHandler):
     allowed_methods = ('GET', 'PUT', 'DELETE',)
 
@@ -636,7 +679,7 @@ class Translation(object):
         """
         raise NotImplementedError
 
-    @transaction.commit_on_success
+    @commit_on_success
     def delete(self):
         """
         Delete a specific translation.
@@ -673,10 +716,14 @@ class Translation(object):
         parser.set_language(self.language)
 
         is_source = self.resource.source_language == self.language
+        if 'async' in self.request.GET:
+            return self._start_import_job(parser, is_source)
+        # Validation is enabled by the 'validate' parameter or the settings
+        validate = 'validate' in self.request.GET or None
         try:
             parser.parse_file(is_source)
             strings_added, strings_updated = parser.save2db(
-                is_source, user=self.request.user
+                is_source, user=self.request.user, validate=validate
             )
         except Exception, e:
             raise BadRequestError("Could not import file: %s" % e)
@@ -694,6 +741,8 @@ class Translation(object):
                 args=[self.resource.project.slug, self.resource.slug]
             )
         }
+        if parser.validation_report is not None:
+            retval['validation'] = parser.validation_report
         logger.debug("Extraction successful, returning: %s" % retval)
 
         # If any string added/updated
@@ -708,6 +757,24 @@ class Translation(object):
 
         return retval
 
+    def _start_import_job(self, parser, is_source):
+        """
+        Queue the import of the file bound to the parser.
+
+        Returns:
+            The status of the import job in JSON.
+        """
+        f = open(parser.filename, 'rb')
+        try:
+            content = f.read()
+        finally:
+            f.close()
+        job = start_import_job(
+            self.resource, self.language, self.request.user, content,
+            is_source=is_source, filename=os.path.basename(parser.filename)
+        )
+        return simplejson.dumps(import_job_dict(job))
+
 
 class FileTranslation(Translation):
     """
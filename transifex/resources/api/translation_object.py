@@ -5,7 +5,6 @@ API for Translation objects.
 """
 
 from __future__ import absolute_import
-from django.db import transaction
 from django.db.models import Q
 from django.conf import settings
 from django.contrib.auth.models import User
@@ -18,10 +17,13 @@ from transifex.languages.models import Language
 from transifex.projects.models import Project
 from transifex.projects.permissions.project import ProjectPermission
 from transifex.resources.decorators import method_decorator
-from transifex.resources.models import Resource, SourceEntity, Translation
+from transifex.resources.models import Resource, SourceEntity, Translation, \
+        StatsDelta
 from transifex.resources.formats.utils.hash_tag import hash_tag
 from transifex.teams.models import Team
-from transifex.resources.handlers import invalidate_stats_cache
+from transifex.resources.handlers import apply_stats_delta
+from transifex.resources.cache import commit_on_success
+from transifex.resources.backends import FormatsBackend, FormatsBackendError
 from transifex.api.utils import BAD_REQUEST, FORBIDDEN_REQUEST,\
         NOT_FOUND_REQUEST
 from .exceptions import BadRequestError, NoContentError, NotFoundError, \
@@ -425,7 +427,28 @@ class BaseTranslationHandler(BaseHandler):
                     'context': translation.get('context')})
         return is_pluralized
 
-    @transaction.commit_on_success
+    def _reviewed_delta(self, updated_translations):
+        """Calculate the change in reviewed translations.
+
+        Must be called before the translations are saved, since it compares
+        them to the values stored in the database.
+
+        Args:
+            updated_translations: A list of updated Translation objects
+        Returns:
+            A StatsDelta object
+        """
+        reviewed = dict(
+            (t.id, bool(t.reviewed)) for t in updated_translations
+            if t.rule == 5
+        )
+        delta = StatsDelta()
+        for t_id, was_reviewed in Translation.objects.filter(
+                id__in=reviewed.keys()).values_list('id', 'reviewed'):
+            delta.reviewed += int(reviewed[t_id]) - int(bool(was_reviewed))
+        return delta
+
+    @commit_on_success
     def _update_translations(self, updated_translations):
         """Bulk update translations
         Args:
@@ -680,7 +703,11 @@ class SingleTranslationHandler(BaseTranslationHandler):
                     language, team, check, is_maintainer, request.user,
                     se_ids, updated_translations, trans_obj_dict)
             # Updated translations are saved to db
+            delta = self._reviewed_delta(updated_translations)
             self._update_translations(updated_translations)
+            if updated_translations:
+                apply_stats_delta(resource, language, delta,
+                        user=request.user)
 
             translations = Translation.objects.filter(
                     source_entity=source_entity, language=language)
@@ -716,6 +743,10 @@ class TranslationObjectsHandler(BaseTranslationHandler):
         of a resource. It also allows to filter source entities
         by key and/or context and takes a 'details' GET parameter
         to show detailed info about the translations.
+
+        If a 'limit' GET parameter is given, only the translations of that
+        many source entities are returned, along with the value of the
+        'after' GET parameter for the next page.
         """
         try:
             project, resource, language = self._requested_objects(
@@ -729,8 +760,62 @@ class TranslationObjectsHandler(BaseTranslationHandler):
         filters = self._get_translation_query_filters(
             request, resource, language
         )
-        translations = Translation.objects.filter(**filters).values(*fields)
-        return self._generate_translations_dict(translations, field_map)
+        translations = Translation.objects.filter(**filters)
+        if not request.GET.get('limit'):
+            return self._generate_translations_dict(
+                translations.values(*fields), field_map
+            )
+        try:
+            translations, next_after = self._paginate_translations(
+                translations, request.GET['limit'], request.GET.get('after')
+            )
+        except BadRequestError, e:
+            return BAD_REQUEST(unicode(e))
+        return {
+            'translations': self._generate_translations_dict(
+                translations.values(*fields), field_map
+            ),
+            'next': next_after,
+        }
+
+    def _paginate_translations(self, translations, limit, after=None):
+        """
+        Restrict the translations to the ones of the first ``limit`` source
+        entities after the source entity with id ``after``.
+
+        Pages are found by seeking over the ids of the source entities
+        instead of using an OFFSET, so that the cost of a page does not
+        depend on its position.
+
+        Args:
+            translations: A Translation QuerySet
+            limit: The number of source entities in the page
+            after: The id of the last source entity of the previous page
+        Returns:
+            A tuple of the translations in the page and the id to use as
+            ``after`` for the next page or None, if this is the last page.
+        """
+        try:
+            limit = int(limit)
+            after = int(after or 0)
+        except ValueError:
+            raise BadRequestError("Invalid pagination parameters.")
+        if limit <= 0:
+            raise BadRequestError("The limit must be a positive number.")
+
+        se_ids = list(translations.filter(
+            source_entity__id__gt=after
+        ).order_by('source_entity').values_list(
+            'source_entity', flat=True
+        ).distinct()[:limit + 1])
+        next_after = None
+        if len(se_ids) > limit:
+            se_ids = se_ids[:limit]
+            next_after = se_ids[-1]
+        translations = translations.filter(
+            source_entity__id__in=se_ids
+        ).order_by('source_entity', 'rule')
+        return translations, next_after
 
     @require_mime('json')
     @throttle(settings.API_MAX_REQUESTS, settings.API_THROTTLE_INTERVAL)
@@ -776,7 +861,11 @@ class TranslationObjectsHandler(BaseTranslationHandler):
                         language, team, check, is_maintainer, request.user,
                         se_ids, updated_translations, trans_obj_dict)
 
+            delta = self._reviewed_delta(updated_translations)
             self._update_translations(updated_translations)
+            if updated_translations:
+                apply_stats_delta(resource, language, delta,
+                        user=request.user)
 
             keys = ['key', 'context', 'translation',
                     'reviewed', 'pluralized', 'wordcount',
@@ -796,3 +885,132 @@ class TranslationObjectsHandler(BaseTranslationHandler):
             return BAD_REQUEST(unicode(e))
         except User.DoesNotExist, e:
             return BAD_REQUEST(unicode(e))
+
+
+class TranslationReviewHandler(BaseTranslationHandler):
+    """
+    Mark the translations of many source entities of a resource as
+    reviewed or unreviewed at one go.
+    """
+
+    allowed_methods = ('PUT',)
+
+    @require_mime('json')
+    @throttle(settings.API_MAX_REQUESTS, settings.API_THROTTLE_INTERVAL)
+    @method_decorator(one_perm_required_or_403(
+            pr_project_private_perm,
+            (Project, 'slug__exact', 'project_slug')
+    ))
+    def update(self, request, project_slug, resource_slug,
+            language_code, api_version=2):
+        """
+        Set the reviewed flag of the translations of source entities.
+
+        The request data is expected in JSON, with the source entity
+        hashes of the strings to review and unreview:
+
+        {
+            'reviewed': ['<hash>', ...],
+            'unreviewed': ['<hash>', ...]
+        }
+
+        Returns the number of source entities which were reviewed and
+        unreviewed.
+        """
+        try:
+            project, resource, language = \
+                    self._requested_objects(
+                    project_slug, resource_slug, language_code)
+            self._validate_language_is_not_source_language(
+                    project.source_language, language)
+            data = request.data
+            if not isinstance(data, dict) or not (
+                    data.get('reviewed') or data.get('unreviewed')):
+                raise NoContentError("No strings to review found!")
+            check = ProjectPermission(request.user)
+            if not check.proofread(project, language):
+                raise ForbiddenError("You are not allowed to review "
+                        "translations in language '%s'." % language.code)
+
+            result = {}
+            delta = StatsDelta()
+            for key, reviewed in (('reviewed', True), ('unreviewed', False)):
+                hashes = data.get(key) or []
+                if not isinstance(hashes, list):
+                    raise BadRequestError("The '%s' hashes are not in a "
+                            "list!" % key)
+                se_ids = list(SourceEntity.objects.filter(
+                    resource=resource, string_hash__in=hashes
+                ).values_list('id', flat=True)) if hashes else []
+                delta += Translation.objects.set_reviewed(resource,
+                        language, se_ids, reviewed, request.user)
+                result[key] = len(se_ids)
+            if any(result.values()):
+                apply_stats_delta(resource, language, delta,
+                        user=request.user)
+            return result
+        except NotFoundError, e:
+            return NOT_FOUND_REQUEST(unicode(e))
+        except NoContentError, e:
+            return BAD_REQUEST(unicode(e))
+        except ForbiddenError, e:
+            return FORBIDDEN_REQUEST(unicode(e))
+        except BadRequestError, e:
+            return BAD_REQUEST(unicode(e))
+
+
+class TranslationCloneHandler(BaseTranslationHandler):
+    """
+    Copy the translations of a resource from another language.
+    """
+
+    allowed_methods = ('POST',)
+
+    @require_mime('json')
+    @throttle(settings.API_MAX_REQUESTS, settings.API_THROTTLE_INTERVAL)
+    @method_decorator(one_perm_required_or_403(
+            pr_project_private_perm,
+            (Project, 'slug__exact', 'project_slug')
+    ))
+    def create(self, request, project_slug, resource_slug,
+            language_code, api_version=2):
+        """
+        Copy the translations of the language given as 'source_language'
+        in the JSON request data to the requested language.
+
+        Strings already translated in the requested language are left
+        intact. Returns the number of strings that got translated.
+        """
+        try:
+            project, resource, language = \
+                    self._requested_objects(
+                    project_slug, resource_slug, language_code)
+            data = request.data
+            if not isinstance(data, dict) or not data.get('source_language'):
+                raise NoContentError("No source language found!")
+            try:
+                source_language = Language.objects.by_code_or_alias(
+                        data['source_language'])
+            except Language.DoesNotExist:
+                raise NotFoundError("Language with code '%s' does not "
+                        "exist." % data['source_language'])
+            team = Team.objects.get_or_none(project, language.code)
+            check = ProjectPermission(request.user)
+            if not check.submit_translations(team or project) or not \
+                    resource.accept_translations:
+                raise ForbiddenError("You are not allowed to add "
+                        "translations in language '%s'." % language.code)
+            try:
+                added = FormatsBackend(resource, language,
+                        request.user).clone_translation(source_language)
+            except FormatsBackendError, e:
+                raise BadRequestError(unicode(e))
+            return {'strings_added': added}
+        except NotFoundError, e:
+            return NOT_FOUND_REQUEST(unicode(e))
+        except NoContentError, e:
+            return BAD_REQUEST(unicode(e))
+        except ForbiddenError, e:
+            return FORBIDDEN_REQUEST(unicode(e))
+        except BadRequestError, e:
+            return BAD_REQUEST(unicode(e))
@@ -7,10 +7,14 @@ These are used by views and the API.
 """
 
 from itertools import ifilter
+from django.conf import settings
 from django.utils.translation import ugettext as _
 from django.db import IntegrityError, DatabaseError
 from transifex.txcommon.log import logger
-from transifex.resources.models import Resource
+from transifex.resources.models import Resource, Translation, ImportJob
+from transifex.resources.cache import compiled_translations
+from transifex.resources.handlers import apply_stats_delta
+from transifex.resources.tasks import process_import_job
 from transifex.resources.formats.exceptions import FormatError
 from transifex.resources.formats.registry import registry
 from transifex.resources.formats.compilation import Mode
@@ -36,7 +40,7 @@ class ResourceBackend(object):
     """
 
     def create(self, project, slug, name, method, source_language,
-               content, user=None, extra_data={}):
+               content, user=None, extra_data={}, async_import=False):
         """Create a new resource.
 
         Any extra arguments will be passed to the Resource initialization
@@ -53,9 +57,12 @@ class ResourceBackend(object):
             content: The content of the resource's source file.
             user: The user that creates the resource.
             extra_data: Any extra info for the Resource constructor.
+            async_import: Whether the source file is imported by an import
+                job (see ``start_import_job``).
         Returns:
             A two-elements tuple. The first element is the number of added
-            strings and the second the number of updated strings.
+            strings and the second the number of updated strings. If
+            ``async_import`` is set, the ImportJob of the source file.
         """
         # save resource
         try:
@@ -83,6 +90,11 @@ class ResourceBackend(object):
             msg = _("Error creating resource: %s")
             logger.warning(msg % e)
             raise ResourceBackendError(msg % e)
+        if async_import:
+            return start_import_job(
+                r, source_language, user, content, is_source=True,
+                filename=extra_data.get('filename')
+            )
         # save source entities
         try:
             fb = FormatsBackend(r, source_language, user)
@@ -117,13 +129,14 @@ class FormatsBackend(object):
         self.language = language
         self.user = user
 
-    def import_source(self, content, filename=None):
+    def import_source(self, content, filename=None, job=None):
         """Parse some content which is of a particular i18n type and save
         it to the database.
 
         Args:
             content: The content to parse.
             filename: The filename of the uploaded content (if any).
+            job: The ImportJob to report the progress to (if any).
         Returns:
             A two-element tuple (pair). The first element is the number of
             strings added and the second one is the number of those updated.
@@ -139,24 +152,55 @@ class FormatsBackend(object):
             msg = "Files of type %s are not supported."
             logger.error(msg % self.resource.i18n_method)
             raise FormatsBackendError(msg % self.resource.i18n_method)
-        return self._import_content(handler, content, True)
+        return self._import_content(handler, content, True, job)
 
     @need_language
-    def import_translation(self, content):
+    def import_translation(self, content, filename=None, job=None):
         """Parse a translation file for a resource.
 
         Args:
             content: The content to parse.
+            filename: The filename of the uploaded content (if any).
+            job: The ImportJob to report the progress to (if any).
         Returns:
             A two element tuple(pair). The first element is the number of
             strings added and the second one is the number of those upadted.
         """
-        handler = self._get_handler(self.resource, self.language)
+        handler = self._get_handler(
+            self.resource, self.language, filename=filename
+        )
         if handler is None:
             msg = "Files of type %s are not supported."
             logger.error(msg % self.resource.i18n_method)
             raise FormatsBackendError(msg % self.resource.i18n_method)
-        return self._import_content(handler, content, False)
+        return self._import_content(handler, content, False, job)
+
+    @need_language
+    def clone_translation(self, source_language):
+        """Copy the translations of the resource in another language.
+
+        Strings which are already translated are left intact. The
+        statistics of the language are updated by the copied strings.
+
+        Args:
+            source_language: The language to copy the translations from.
+        Returns:
+            The number of strings that got translated.
+        """
+        if self.language == self.resource.source_language:
+            raise FormatsBackendError(
+                _("Translations cannot be copied to the source language.")
+            )
+        try:
+            delta = Translation.objects.clone_language(
+                self.resource, source_language, self.language, self.user
+            )
+        except DatabaseError, e:
+            msg = _("Error copying translations: %s")
+            logger.warning(msg % e)
+            raise FormatsBackendError(msg % e)
+        apply_stats_delta(self.resource, self.language, delta, user=self.user)
+        return delta.added
 
     def _get_handler(self, resource, language, filename=None):
         """Get the appropriate hanlder for the resource."""
@@ -164,12 +208,13 @@ class FormatsBackend(object):
             resource, language, filename=filename
         )
 
-    def _import_content(self, handler, content, is_source):
+    def _import_content(self, handler, content, is_source, job=None):
         """Import content to the database.
 
         Args:
             content: The content to save.
             is_source: A flag to indicate a source or a translation file.
+            job: The ImportJob to report the progress to (if any).
         Returns:
             A two element tuple(pair). The first element is the number of
             strings added and the second one is the number of those upadted.
@@ -179,6 +224,9 @@ class FormatsBackend(object):
             handler.set_language(self.language)
             handler.bind_content(content)
             handler.parse_file(is_source=is_source)
+            if job is not None:
+                job.set_phase('saving', strings_total=len(handler.stringset))
+                handler.progress_callback = job.report_progress
             return handler.save2db(is_source=is_source, user=self.user)
         except FormatError, e:
             raise FormatsBackendError(unicode(e))
@@ -194,6 +242,9 @@ class FormatsBackend(object):
         it. This is necessary for formats that do not fallback to the source
         language in case of empty translations.
 
+        Compiled files are cached until the translations or the template
+        of the resource change.
+
         Args:
             pseudo_type: The pseudo_type (if any).
             mode: The mode for compiling this translation.
@@ -202,6 +253,13 @@ class FormatsBackend(object):
         """
         if mode is None:
             mode = Mode.DEFAULT
+        return compiled_translations.get_or_compile(
+            self.resource, self.language, mode, pseudo_type,
+            lambda: self._compile(pseudo_type, mode)
+        )
+
+    def _compile(self, pseudo_type, mode):
+        """Compile the translation, without using the cache."""
         handler = registry.appropriate_handler(
             resource=self.resource, language=self.language
         )
@@ -211,6 +269,59 @@ class FormatsBackend(object):
         return content if isinstance(content, basestring) else ''
 
 
+def start_import_job(resource, language, user, content, is_source=False,
+        filename=None):
+    """Store an uploaded file and queue its import.
+
+    If ASYNC_IMPORTS is not set, the job is run at once.
+
+    Args:
+        resource: The resource to import the file to.
+        language: The language of the file.
+        user: The user who uploaded the file.
+        content: The content of the file.
+        is_source: Whether the file is a source file.
+        filename: The name of the uploaded file (if any).
+    Returns:
+        The ImportJob object.
+    """
+    job = ImportJob.objects.create(
+        resource=resource, language=language, user=user,
+        is_source=is_source, filename=filename, content=content
+    )
+    if settings.ASYNC_IMPORTS:
+        process_import_job.delay(job.id)
+    else:
+        run_import_job(job)
+    return job
+
+
+def run_import_job(job):
+    """Parse and save the content of an import job.
+
+    Failures are stored in the job.
+    """
+    job.set_phase('parsing')
+    fb = FormatsBackend(job.resource, job.language, job.user)
+    try:
+        if job.is_source:
+            added, updated = fb.import_source(
+                job.content, filename=job.filename, job=job
+            )
+        else:
+            added, updated = fb.import_translation(
+                job.content, filename=job.filename, job=job
+            )
+    except FormatsBackendError, e:
+        job.fail(unicode(e))
+    except Exception, e:
+        logger.error("Import job %s failed: %s" % (job.id, e), exc_info=True)
+        job.fail(unicode(e))
+    else:
+        job.finish(added, updated)
+    return job
+
+
 def content_from_uploaded_file(files, encoding='UTF-8'):
     """Get the content of an uploaded file.
 
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cache of compiled translation files.
+
+Compiled files are kept in memory, in an LRU cache bounded by the total size
+of the files. Each entry is keyed by the resource, the language, the mode and
+the pseudo type it was compiled with and by the versions of the resource and
+the language. The versions are stored in the django cache, so that they are
+shared by all processes, and are bumped whenever the translations or the
+template of a resource change, which makes any stale entries unreachable.
+
+The same versions key the cached counts of filtered querysets (e.g. the
+number of untranslated strings shown in Lotte).
+
+Versions bumped inside a managed transaction are bumped again after it
+commits (see commit_on_success), because until then other processes still
+read the old data and could cache it under the new version.
+"""
+
+import time
+import hashlib
+import threading
+from functools import wraps
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.sql.datastructures import EmptyResultSet
+from transifex.txcommon.log import logger
+
+# Memcached does not accept longer timeouts
+VERSION_TIMEOUT = 60 * 60 * 24 * 30
+COUNT_TIMEOUT = 60 * 60 * 24
+
+
+def _new_version():
+    """Return a version, which is bigger than any previous one of a key."""
+    return int(time.time() * 1000)
+
+
+def version_keys(resource, language):
+    """Return the keys of the versions of the resource and the language."""
+    resource_key = 'compiled_translation.version.%s' % resource.id
+    if language is None or language == resource.source_language:
+        return [resource_key]
+    return [resource_key, '%s.%s' % (resource_key, language.id)]
+
+
+def get_versions(resources, language):
+    """Return the current versions of the resources and the language.
+
+    Returns:
+        A tuple with the versions or None, if the versions cannot be
+        stored (e.g. with the dummy cache backend).
+    """
+    keys = []
+    for resource in resources:
+        keys.extend(version_keys(resource, language))
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), VERSION_TIMEOUT)
+            versions[key] = cache.get(key)
+            if versions[key] is None:
+                return None
+    return tuple(versions[key] for key in keys)
+
+
+# Keys of the versions bumped in the managed transaction of each thread.
+_pending = threading.local()
+
+
+def _incr(key):
+    """Increment a version."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The version does not exist; a new one will be created.
+        pass
+
+
+def bump_version(resource, language=None):
+    """Bump the version of a language of the resource.
+
+    Changes in the source language bump the version of the resource,
+    which invalidates the cached data of all languages. Inside a managed
+    transaction, the version is bumped again by bump_pending_versions.
+    """
+    key = version_keys(resource, language)[-1]
+    _incr(key)
+    if transaction.is_managed():
+        if not hasattr(_pending, 'keys'):
+            _pending.keys = set()
+        _pending.keys.add(key)
+
+
+def bump_pending_versions():
+    """Bump again the versions bumped inside the transaction of the
+    thread.
+
+    This must be called after the transaction commits, so that any files
+    compiled from the data committed before it are not used.
+    """
+    keys = getattr(_pending, 'keys', None)
+    _pending.keys = set()
+    for key in keys or ():
+        _incr(key)
+
+
+def commit_on_success(func):
+    """Like transaction.commit_on_success, but bump the versions changed
+    in the transaction once more after it commits (or rolls back).
+    """
+    func = transaction.commit_on_success(func)
+
+    @wraps(func)
+    def _commit_on_success(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            bump_pending_versions()
+    return _commit_on_success
+
+
+def query_key(queryset):
+    """Return a key that identifies the SQL query of the queryset.
+
+    Returns:
+        The key or None, if the queryset matches nothing.
+    """
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return None
+    return hashlib.md5(repr((sql, params))).hexdigest()
+
+
+def queryset_key(queryset, resources, language):
+    """Return a key for data about a queryset over the translations of the
+    resources in the language.
+
+    The key changes whenever the versions of the resources and the language
+    change, i.e. when their translations or templates change.
+
+    Returns:
+        The key or None, if the versions cannot be stored or the queryset
+        matches nothing.
+    """
+    versions = get_versions(resources, language)
+    key = query_key(queryset)
+    if versions is None or key is None:
+        return None
+    return '%s.%s' % (key, hashlib.md5(repr(versions)).hexdigest())
+
+
+def cached_count(queryset, resources, language):
+    """Return the number of objects of a queryset over the translations of
+    the resources in the language.
+
+    The count is cached until the translations of the resources change.
+    """
+    key = queryset_key(queryset, resources, language)
+    if key is None:
+        return queryset.count()
+    key = 'filtered_count.%s' % key
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_TIMEOUT)
+    return count
+
+
+class CompiledTranslationCache(object):
+    """A size-bounded LRU cache of compiled translation files."""
+
+    def __init__(self, max_size):
+        """Set the maximum total size of the cached files (in bytes)."""
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def invalidate(self, resource, language=None):
+        """Bump the version of a language of the resource.
+
+        Changes in the source language bump the version of the resource,
+        which invalidates the compiled files of all languages.
+        """
+        bump_version(resource, language)
+
+    def get_or_compile(self, resource, language, mode, pseudo_type, compile):
+        """Return the compiled file for the arguments.
+
+        Args:
+            resource: The resource of the file.
+            language: The language of the file.
+            mode: The Mode the file is compiled in.
+            pseudo_type: The pseudo type, if any.
+            compile: A callable that compiles the file, in case of a miss.
+        Returns:
+            The compiled file.
+        """
+        versions = self.max_size and get_versions([resource], language)
+        if not versions:
+            return compile()
+
+        key = (
+            resource.id, language and language.id, mode._value,
+            pseudo_type and pseudo_type.__class__.__name__, versions
+        )
+        with self._lock:
+            content = self._entries.pop(key, None)
+            if content is not None:
+                self._entries[key] = content
+                self.hits += 1
+                return content
+            self.misses += 1
+
+        content = compile()
+        self._store(key, content)
+        return content
+
+    def _store(self, key, content):
+        """Store the content, evicting the least recently used entries, if
+        the cache is full.
+        """
+        size = len(content)
+        if size > self.max_size:
+            logger.debug("Compiled file of %s bytes is too big to cache." % size)
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = content
+            self.size += size
+            while self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.size = self.hits = self.misses = 0
+
+    def stats(self):
+        """Return the hits, misses and usage of the cache."""
+        return {
+            'hits': self.hits, 'misses': self.misses,
+            'entries': len(self._entries), 'size': self.size,
+            'max_size': self.max_size,
+        }
+
+
+compiled_translations = CompiledTranslationCache(
+    settings.COMPILED_TRANSLATION_CACHE_SIZE
+)
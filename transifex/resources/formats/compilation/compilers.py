@@ -10,7 +10,7 @@ from __future__ import absolute_import
 import re
 from transifex.resources.models import SourceEntity
 from ..exceptions import UninitializedCompilerError
-from ..utils.hash_tag import hash_regex, pluralized_hash_regex
+from ..utils.hash_tag import split_by_hash, substitute_hashes
 
 
 class Compiler(object):
@@ -24,6 +24,12 @@ class Compiler(object):
     type of translation we want (``tdecorator). This allows for
     full customization of those steps. See
     http://en.wikipedia.org/wiki/Builder_pattern.
+
+    The translations are applied by splitting the template once to its
+    literal segments and hashes (see ``split_by_hash``) and joining them
+    with the translations. If the offsets of the hashes are given, the
+    template is split at them instead of being searched for hashes, as long
+    as it is applied unchanged.
     """
 
     def __init__(self, resource, **kwargs):
@@ -43,6 +49,8 @@ class Compiler(object):
         self._initialized = False
         self._translations = None
         self._tdecorator = None
+        self._template = None
+        self._offsets = None
 
     def _set_tset(self, t):
         self._tset = t
@@ -52,7 +60,7 @@ class Compiler(object):
         self._tdecorator = a
     translation_decorator = property(fset=_set_tdecorator)
 
-    def compile(self, template, language):
+    def compile(self, template, language, offsets=None):
         """Compile the template using the database strings.
 
         The result is the content of the translation file.
@@ -66,10 +74,14 @@ class Compiler(object):
         Args:
             template: The template to compile. It must be a unicode string.
             language: The language of the translation.
+            offsets: The offsets of the hashes in the template (see
+                ``hash_offsets``), if they are known.
         Returns:
             The compiled template as a unicode string.
         """
         self.language = language
+        self._template = template
+        self._offsets = offsets
         if self._tset is None or self._tdecorator is None:
             msg = "One of the builders has not been set."
             raise UninitializedCompilerError(msg)
@@ -78,6 +90,7 @@ class Compiler(object):
         self._compile(content)
         self._post_compile()
         del self.language
+        self._template = self._offsets = None
         return self.compiled_template
 
     def _apply_translations(self, translations, text):
@@ -89,10 +102,8 @@ class Compiler(object):
         Returns:
             The text with the translations applied.
         """
-        regex = hash_regex()
-        return regex.sub(
-            lambda m: translations.get(m.group(0), m.group(0)), text
-        )
+        offsets = self._offsets if text is self._template else None
+        return substitute_hashes(split_by_hash(text, offsets), translations)
 
     def _compile(self, content):
         """Internal compile function.
@@ -143,20 +154,6 @@ class Compiler(object):
 class PluralCompiler(Compiler):
     """Compiler that handles plurals, too."""
 
-    def _apply_translations(self, translations, text):
-        """Apply the translations to the text.
-
-        Args:
-            translations: A list of translations to use.
-            text: The text to apply the translations.
-        Returns:
-            The text with the translations applied.
-        """
-        regex = pluralized_hash_regex()
-        return regex.sub(
-            lambda m: translations.get(m.group(0), m.group(0)), text
-        )
-
     def _compile(self, content):
         """Internal compile function.
 
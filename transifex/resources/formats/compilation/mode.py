@@ -32,7 +32,7 @@ class _Mode(object):
 
     def __contains__(self, item):
         """Return whether the mode contains the specified state."""
-        return (self._value >> (item._value - 1)) % 2
+        return bool(self._value & item._value)
 
     def __unicode__(self):
         return u'<Mode %s>' % self._value
@@ -44,3 +44,5 @@ class Mode(object):
     DEFAULT = _Mode(0, 'for_use')
     TRANSLATED = _Mode(1, 'for_translation')
     REVIEWED = _Mode(2, 'for_use_reviewed')
+    # Only the translated strings, without the template.
+    SKIPPED = _Mode(4, 'skipped')
@@ -3,6 +3,7 @@
 from __future__ import absolute_import
 import codecs, copy, os, re
 import gc
+from resource import getrusage, RUSAGE_SELF
 from django.utils import simplejson as json
 from django.conf import settings
 from django.db import transaction
@@ -10,12 +11,14 @@ from django.db.models import get_model
 from django.utils.datastructures import SortedDict
 from django.utils.translation import ugettext as _
 from transifex.txcommon.log import logger
+from transifex.txcommon.timers import Timer
 from transifex.languages.models import Language
 from transifex.projects.permissions.project import ProjectPermission
 from suggestions.models import Suggestion
 from suggestions.formats import ContentSuggestionFormat
 from transifex.actionlog.models import action_logging
-from transifex.resources.handlers import invalidate_stats_cache
+from transifex.resources.handlers import invalidate_stats_cache, \
+        apply_stats_delta
 from transifex.resources.formats.exceptions import FormatError, ParseError, \
         CompileError
 from .compilation import Compiler, NormalDecoratorBuilder, \
@@ -23,7 +26,10 @@ from .compilation import Compiler, NormalDecoratorBuilder, \
         SourceTranslationsBuilder, ReviewedTranslationsBuilder, Mode
 from transifex.resources.formats.pseudo import PseudoTypeMixin
 from transifex.resources.formats.utils.decorators import *
+from transifex.resources.formats.validators import validate_many_in_pool
 from transifex.resources.signals import post_save_translation
+from transifex.resources.cache import bump_pending_versions
+from transifex.resources.models import StatsDelta
 from transifex.resources.formats.resource_collections import StringSet, \
         GenericTranslation, SourceEntityCollection, TranslationCollection
 from transifex.teams.models import Team
@@ -40,6 +46,9 @@ STRICT flag is used to switch between two parsing modes:
 """
 STRICT=False
 
+# The number of strings saved between two reports of the progress of save2db()
+PROGRESS_INTERVAL = 500
+
 Resource = get_model('resources', 'Resource')
 Translation = get_model('resources', 'Translation')
 SourceEntity = get_model('resources', 'SourceEntity')
@@ -117,6 +126,26 @@ class Handler(object):
 
         self.key_dict = {}
 
+        # Changes to the statistics caused by the last save2db() call, if
+        # they are known. Otherwise, statistics are recalculated.
+        self.stats_delta = None
+
+        # Timings and memory usage of the last chunked import.
+        self.import_report = None
+
+        # Whether save2db() validates the translations and the failures
+        # found (see _validate_translations).
+        self.validation_enabled = False
+        self.validation_report = None
+
+        # A callable, which is given the number of strings processed so
+        # far, while save2db() runs (e.g. to report the progress of jobs).
+        self.progress_callback = None
+
+        # Whether save2db() updates the statistics of the resource. Callers
+        # that save many files of a resource may recount them once instead.
+        self.update_stats = True
+
         # Hold warning messages from the parser in a sorted dict way to avoid
         # duplicated messages and keep them in the order they were added.
         self.warning_messages = SortedDict()
@@ -204,11 +233,15 @@ class Handler(object):
         Args:
             resource: The resource the template of which we want.
         Returns:
-            The template as a unicode string.
+            A tuple of the template as a unicode string and the offsets of
+            its hashes. The offsets are None, if they are not stored or do
+            not refer to the content decoded with the default encoding.
         """
-        return Template.objects.get(
-            resource=resource
-        ).content.decode(self.default_encoding)
+        template = Template.objects.get(resource=resource)
+        content = template.content.decode(self.default_encoding)
+        if codecs.lookup(self.default_encoding).name != 'utf-8':
+            return content, None
+        return content, template.get_hash_offsets()
 
     def set_language(self, language):
         """Set the language for the handler."""
@@ -310,16 +343,62 @@ class Handler(object):
         """
         if language is None:
             language = self.language
-        content = self._content_from_template(self.resource)
+        if Mode.SKIPPED in mode:
+            try:
+                return self._compile_skipped(language).encode(
+                    self.format_encoding
+                )
+            except Exception, e:
+                logger.error("Error compiling file: %s" % e, exc_info=True)
+                raise self.HandlerCompileError(unicode(e))
+        content, offsets = self._content_from_template(self.resource)
         compiler = self.construct_compiler(language, pseudo, mode)
         try:
             return compiler.compile(
-                content, language
+                content, language, offsets
             ).encode(self.format_encoding)
         except Exception, e:
             logger.error("Error compiling file: %s" % e, exc_info=True)
             raise self.HandlerCompileError(unicode(e))
 
+    def _compile_skipped(self, language):
+        """Compile a file with only the translated strings of the language.
+
+        The entries follow the order of the source strings, preceded by
+        their developer comments. Only the needed columns are fetched and
+        the file is joined at once.
+
+        Args:
+            language: The language of the translation.
+        Returns:
+            The compiled file as a unicode string.
+        """
+        rows = Translation.objects.filter(
+            resource=self.resource, language=language
+        ).order_by('source_entity__order').values_list(
+            'source_entity__string', 'source_entity__developer_comment',
+            'string'
+        )
+        escape = self._escape
+        lines = []
+        for key, comment, string in rows.iterator():
+            if comment:
+                lines.append(self._skipped_comment(comment))
+            lines.append(self._skipped_entry(key, escape(string)))
+        lines.append(u'')
+        return u'\n'.join(lines)
+
+    def _skipped_entry(self, key, translation):
+        """Return the entry of an (escaped) translation in a file compiled
+        in Mode.SKIPPED.
+
+        Formats that support the mode must override this.
+        """
+        raise NotImplementedError
+
+    def _skipped_comment(self, comment):
+        """Return a developer comment in a file compiled in Mode.SKIPPED."""
+        raise NotImplementedError
 
     #######################
     #  save methods
@@ -341,7 +420,8 @@ class Handler(object):
         Args:
             user: The user that caused the update.
         """
-        self._update_stats_of_resource(self.resource, self.language, user)
+        if self.update_stats:
+            self._update_stats_of_resource(self.resource, self.language, user)
 
         if self.language == self.resource.source_language:
             nt = 'project_resource_changed'
@@ -451,6 +531,11 @@ class Handler(object):
         Raises:
             Any exception.
         """
+        chunk_size = settings.SOURCE_IMPORT_CHUNK_SIZE
+        if chunk_size and len(self.stringset) > chunk_size:
+            return self._save_source_in_chunks(
+                user, overwrite_translations, chunk_size
+            )
         qs = SourceEntity.objects.filter(resource=self.resource).iterator()
         original_sources = list(qs) # TODO Use set() instead? Hash by pk
         updated_entities = set([])
@@ -462,7 +547,8 @@ class Handler(object):
         strings_updated = 0
         strings_deleted = 0
         try:
-            for j in self.stringset:
+            for processed, j in enumerate(self.stringset):
+                self._report_progress(processed)
                 if j in source_entities:
                     se = source_entities.get(j)
                     if se in new_entities:
@@ -536,8 +622,7 @@ class Handler(object):
         ).iterator()
         untouched_ses = set(original_sources) - updated_entities
         sg_handler.create_suggestions(untouched_ses, list(new_entities))
-        for se in untouched_ses:
-            se.delete()
+        SourceEntity.objects.delete_by_ids([se.id for se in untouched_ses])
         self._update_template(self.template)
 
         strings_deleted = len(untouched_ses)
@@ -545,6 +630,185 @@ class Handler(object):
         del new_sources
         return strings_added, strings_updated, strings_deleted
 
+    def _source_entity_hash(self, j):
+        """Return the string_hash the source entity of ``j`` has.
+
+        Args:
+            j: A GenericTranslation object.
+        Returns:
+            The hash, as calculated by SourceEntity.presave().
+        """
+        se = SourceEntity(
+            string=j.source_entity, context=self._context_value(j.context)
+        )
+        se.presave()
+        return se.string_hash
+
+    def _report_progress(self, processed, force=False):
+        """Pass the number of strings processed to the progress callback,
+        every PROGRESS_INTERVAL strings.
+        """
+        if self.progress_callback is None:
+            return
+        if force or processed % PROGRESS_INTERVAL == 0:
+            self.progress_callback(processed)
+
+    def _start_phase(self, name):
+        """Start timing a phase of the import and return its timer."""
+        timer = Timer(name, "Import of resource %s" % self.resource)
+        timer.start()
+        return timer
+
+    def _end_phase(self, timer):
+        """Stop timing a phase of the import and record the results."""
+        timer.stop()
+        phases = self.import_report['phases']
+        phases[timer.name] = phases.get(timer.name, 0) + timer.duration
+        peak = getrusage(RUSAGE_SELF).ru_maxrss
+        self.import_report['peak_memory'] = max(
+            peak, self.import_report['peak_memory']
+        )
+
+    def _save_source_in_chunks(self, user, overwrite_translations, chunk_size):
+        """Save source language translations to the database in chunks.
+
+        This is used for huge files instead of the default behavior of
+        `_save_source`. The stringset is processed in batches of
+        `chunk_size` strings and only the objects needed for each batch
+        are loaded from the database. Existing source entities are tracked
+        only by their hash and id.
+
+        The duration of each phase and the peak memory usage (in KB) are
+        stored in `self.import_report` and logged.
+
+        Returns:
+            A tuple of number of strings added, updated and deleted.
+        """
+        self.import_report = {'phases': SortedDict(), 'peak_memory': 0}
+        timer = self._start_phase('load')
+        existing = dict(SourceEntity.objects.filter(
+            resource=self.resource
+        ).values_list('string_hash', 'id').iterator())
+        original_ids = set(existing.itervalues())
+        self._end_phase(timer)
+
+        touched_ids = set([])
+        new_ids = set([])
+        strings_added = 0
+        strings_updated = 0
+        strings = list(self.stringset)
+        try:
+            for start in xrange(0, len(strings), chunk_size):
+                self._report_progress(start, force=True)
+                chunk = [
+                    (self._source_entity_hash(j), j)
+                    for j in strings[start:start + chunk_size]
+                ]
+
+                timer = self._start_phase('source entities')
+                new_entities = SortedDict()
+                for h, j in chunk:
+                    if h in existing or h in new_entities:
+                        continue
+                    new_entities[h] = SourceEntity(
+                        string=j.source_entity,
+                        context=self._context_value(j.context),
+                        resource=self.resource, pluralized=j.pluralized,
+                        position=1, flags=j.flags or "",
+                        developer_comment=j.comment or "",
+                        occurrences=j.occurrences, order=j.order
+                    )
+                SourceEntity.objects.bulk_insert(new_entities.values())
+                for h, se_id in SourceEntity.objects.filter(
+                        resource=self.resource,
+                        string_hash__in=new_entities.keys()
+                    ).values_list('string_hash', 'id'):
+                    existing[h] = se_id
+                    new_ids.add(se_id)
+
+                chunk_ids = set(existing[h] for h, j in chunk)
+                source_entities = SourceEntity.objects.in_bulk(chunk_ids)
+                updated_entities = {}
+                for h, j in chunk:
+                    se_id = existing[h]
+                    if se_id in new_ids:
+                        continue
+                    se = source_entities[se_id]
+                    se.flags = j.flags or ""
+                    se.pluralized = j.pluralized
+                    se.developer_comment = j.comment or ""
+                    se.occurrences = j.occurrences
+                    se.order = j.order
+                    updated_entities[se_id] = se
+                SourceEntity.objects.bulk_update(updated_entities.values())
+                touched_ids.update(updated_entities.iterkeys())
+                self._end_phase(timer)
+
+                timer = self._start_phase('translations')
+                translations = dict(
+                    ((t.source_entity_id, t.rule), t)
+                    for t in Translation.objects.filter(
+                        language=self.language, source_entity__in=chunk_ids
+                    ).iterator()
+                )
+                new_translations = []
+                updated_translations = []
+                for h, j in chunk:
+                    se = source_entities[existing[h]]
+                    if self._should_skip_translation(se, j):
+                        continue
+                    tr = translations.get((se.id, j.rule))
+                    if tr is not None:
+                        if overwrite_translations and tr.string != j.translation:
+                            tr.string = j.translation
+                            tr.user = user
+                            updated_translations.append(tr)
+                            strings_updated += 1
+                    else:
+                        tr = Translation(
+                            source_entity=se, language=self.language,
+                            rule=j.rule, string=j.translation, user=user,
+                            resource=self.resource
+                        )
+                        translations[(se.id, j.rule)] = tr
+                        new_translations.append(tr)
+                        if j.rule==5:
+                            strings_added += 1
+                Translation.objects.bulk_insert(new_translations)
+                Translation.objects.bulk_update(updated_translations)
+                self._end_phase(timer)
+                del chunk, new_entities, source_entities, updated_entities
+                del translations, new_translations, updated_translations
+        except Exception, e:
+            msg = "Error importing the entries into the database: %s"
+            logger.error(msg % e)
+            raise
+        del strings
+        existing.clear()
+
+        timer = self._start_phase('suggestions')
+        sg_handler = self.SuggestionFormat(self.resource, self.language, user)
+        sg_handler.add_from_strings(self.suggestions)
+        untouched_ids = original_ids - touched_ids
+        if untouched_ids and new_ids:
+            sg_handler.create_suggestions(
+                list(SourceEntity.objects.filter(id__in=untouched_ids)),
+                list(SourceEntity.objects.filter(id__in=new_ids))
+            )
+        self._end_phase(timer)
+
+        timer = self._start_phase('delete')
+        SourceEntity.objects.delete_by_ids(untouched_ids)
+        self._update_template(self.template)
+        self._end_phase(timer)
+
+        logger.info("Imported %s strings in resource %s. Phases: %s. "
+            "Peak memory: %s KB" % (len(self.stringset), self.resource,
+            ', '.join(['%s %.3fsec' % p for p in
+                self.import_report['phases'].items()]),
+            self.import_report['peak_memory']))
+        return strings_added, strings_updated, len(untouched_ids)
+
     def _save_translation(self, user, overwrite_translations):
         """Save other language translations to the database.
 
@@ -568,6 +832,9 @@ class Handler(object):
         qs = SourceEntity.objects.filter(resource=self.resource).iterator()
         source_entities = self._init_source_entity_collection(qs)
         translations = self._init_translation_collection(source_entities.se_ids)
+        invalid = set()
+        if self.validation_enabled:
+            invalid = self._validate_translations(source_entities)
         new_translations = []
         updated_translations = set([])
 
@@ -575,7 +842,8 @@ class Handler(object):
         strings_updated = 0
         strings_deleted = 0
         try:
-            for j in self.stringset:
+            for processed, j in enumerate(self.stringset):
+                self._report_progress(processed)
                 if j not in source_entities:
                     continue
                 else:
@@ -583,6 +851,8 @@ class Handler(object):
 
                 if self._should_skip_translation(se, j):
                     continue
+                if se.id in invalid:
+                    continue
                 if (se, j) in translations:
                     tr = translations.get((se, j))
 
@@ -621,6 +891,14 @@ class Handler(object):
                         strings_added += 1
             Translation.objects.bulk_insert(new_translations)
             Translation.objects.bulk_update(updated_translations)
+            self.stats_delta = StatsDelta(
+                added=strings_added,
+                wordcount=Translation.objects.source_wordcount(
+                    self.resource,
+                    [t.source_entity_id for t in new_translations
+                        if t.rule == 5]
+                )
+            )
         except Exception, e:
             logger.error(
                 "There was a problem while importing the entries into the "
@@ -634,12 +912,72 @@ class Handler(object):
         del new_translations, updated_translations, source_entities, translations
         return strings_added, strings_updated, strings_deleted
 
+    def _validate_translations(self, source_entities):
+        """Run the error and warning validators over the translations of
+        the stringset.
+
+        The source strings are loaded with a single query and the whole
+        stringset is validated in one pass with the cached validator chains
+        (in a pool of processes for big files, see
+        IMPORT_VALIDATION_PROCESSES). The failures are stored in
+        ``self.validation_report``.
+
+        Args:
+            source_entities: A SourceEntityCollection of the resource.
+        Returns:
+            A set of the ids of the source entities whose translations must
+            not be saved. If any plural form of a source entity fails an
+            error validator, none of its forms is saved, so that the plural
+            set is never stored partially.
+        """
+        source_language = self.resource.source_language
+        sources = dict(
+            ((se_id, rule), string) for se_id, rule, string in
+            Translation.objects.filter(
+                resource=self.resource, language=source_language
+            ).values_list('source_entity_id', 'rule', 'string').iterator()
+        )
+        entries, items = [], []
+        for j in self.stringset:
+            if j not in source_entities:
+                continue
+            se = source_entities.get(j)
+            if self._should_skip_translation(se, j):
+                continue
+            # The target language may have extra plural forms
+            source = sources.get((se.id, j.rule), sources.get((se.id, 5)))
+            if source is None:
+                continue
+            entries.append((se, j.rule))
+            items.append((j.rule, source, j.translation))
+
+        results = validate_many_in_pool(
+            self.resource.i18n_method, source_language, self.language, items,
+            processes=settings.IMPORT_VALIDATION_PROCESSES,
+            chunk_size=settings.IMPORT_VALIDATION_CHUNK_SIZE
+        )
+        invalid = set()
+        self.validation_report = []
+        for (se, rule), (error, warnings) in zip(entries, results):
+            if error is None and not warnings:
+                continue
+            if error is not None:
+                invalid.add(se.id)
+            self.validation_report.append({
+                'key': se.string, 'context': se.context, 'rule': rule,
+                'error': error, 'warnings': warnings,
+            })
+        return invalid
+
     def _update_stats_of_resource(self, resource, language, user):
         """Update the statistics for the resource.
 
         Also, invalidate any caches.
         """
-        invalidate_stats_cache(resource, language, user=user)
+        if self.stats_delta is not None:
+            apply_stats_delta(resource, language, self.stats_delta, user=user)
+        else:
+            invalidate_stats_cache(resource, language, user=user)
 
     def _update_template(self, content):
         """Update the template of the resource.
@@ -655,10 +993,23 @@ class Handler(object):
     @need_language
     @need_stringset
     @transaction.commit_manually
-    def save2db(self, is_source=False, user=None, overwrite_translations=True):
+    def save2db(self, is_source=False, user=None, overwrite_translations=True,
+            validate=None, update_stats=True):
         """
         Saves parsed file contents to the database. duh
+
+        If ``validate`` is True (or None and VALIDATE_TRANSLATION_IMPORTS is
+        set), translations are validated before they are saved.
+
+        If ``update_stats`` is False, the statistics of the resource are
+        left to the caller (see RLStats.objects.recount_resource).
         """
+        self.stats_delta = None
+        self.update_stats = update_stats
+        if validate is None:
+            validate = settings.VALIDATE_TRANSLATION_IMPORTS
+        self.validation_enabled = validate and not is_source
+        self.validation_report = None
         self._pre_save2db(is_source, user, overwrite_translations)
         try:
             if is_source:
@@ -693,6 +1044,7 @@ class Handler(object):
         finally:
             gc.collect()
         transaction.commit()
+        bump_pending_versions()
         return (added, updated)
 
     ####################
@@ -42,6 +42,12 @@ class DTDHandler(FillEmptyCompilerFactory, Handler):
         """ Unescape entities for easy editing """
         return s.replace('&quot;', '"')
 
+    def _skipped_entry(self, key, translation):
+        return u'<!ENTITY %s "%s">' % (key, translation)
+
+    def _skipped_comment(self, comment):
+        return u"<!--%s-->" % comment
+
     def _should_skip_translation(self, se, trans):
         """ Never skip empty translations, they are valid in DTD
         """
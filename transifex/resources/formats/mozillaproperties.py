@@ -62,6 +62,12 @@ class MozillaPropertiesHandler(FillEmptyCompilerFactory, PropertiesHandler):
                  .replace(r'\\', '\\')
         )
 
+    def _skipped_entry(self, key, translation):
+        return u'%s=%s' % (key, translation)
+
+    def _skipped_comment(self, comment):
+        return u"\n".join([u"#" + l for l in comment.split("\n")])
+
 
     def _visit_value(self, value):
 
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import re
+from array import array
+from itertools import izip
 from django.utils.hashcompat import md5_constructor
 
 
@@ -70,3 +72,62 @@ class _HashRegex(object):
 
 hash_regex = _HashRegex()
 pluralized_hash_regex = _HashRegex(plurals=True)
+
+
+def hash_offsets(text):
+    """Find the hashes of a template.
+
+    Both normal and pluralized hashes are recognized.
+
+    Args:
+        text: The template to search.
+    Returns:
+        An array of integers with the start and the end offset of each
+        hash, in the order the hashes appear in the text.
+    """
+    offsets = array('i')
+    for m in pluralized_hash_regex().finditer(text):
+        offsets.extend(m.span())
+    return offsets
+
+
+def split_by_hash(text, offsets=None):
+    """Split a template to its literal segments and the hashes between them.
+
+    Args:
+        text: The template to split.
+        offsets: The offsets of the hashes in the text, as returned by
+            ``hash_offsets``. If None, the text is searched for them.
+    Returns:
+        A tuple with the list of the literal segments and the list of the
+        hashes. There is always one more literal segment than hashes.
+    """
+    if offsets is None:
+        offsets = hash_offsets(text)
+    literals, hashes = [], []
+    position = 0
+    bounds = iter(offsets)
+    for start, end in izip(bounds, bounds):
+        literals.append(text[position:start])
+        hashes.append(text[start:end])
+        position = end
+    literals.append(text[position:])
+    return literals, hashes
+
+
+def substitute_hashes(segments, translations):
+    """Replace the hashes of a split template with their translations.
+
+    Hashes that have no translation are left as is.
+
+    Args:
+        segments: The template, as returned by ``split_by_hash``.
+        translations: A dictionary of hash -> translation.
+    Returns:
+        The compiled template.
+    """
+    literals, hashes = segments
+    parts = [None] * (len(literals) + len(hashes))
+    parts[::2] = literals
+    parts[1::2] = [translations.get(h, h) for h in hashes]
+    return u''.join(parts)
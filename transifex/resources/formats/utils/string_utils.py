@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from Levenshtein import distance
 
 def percent_diff(a, b):
@@ -10,6 +12,108 @@ def percent_diff(a, b):
         else: return 100
 
 
+def _ngrams(text, n):
+    """Count the character n-grams of the text.
+
+    Returns:
+        A dictionary of n-gram -> number of occurrences.
+    """
+    grams = defaultdict(int)
+    for i in xrange(len(text) - n + 1):
+        grams[text[i:i + n]] += 1
+    return grams
+
+
+class FuzzyIndex(object):
+    """An index of strings for finding the ones that are similar to a
+    given string, that is their ``percent_diff`` is less than ``max_diff``.
+
+    Instead of calculating the Levenshtein distance against all indexed
+    strings, the candidates are first filtered by their length (the distance
+    of two strings is at least the difference of their lengths) and by the
+    number of n-grams they have in common with the given string (a string
+    within distance k of another one shares at least
+    ``max(len) - n + 1 - k * n`` n-grams with it). Both filters are exact,
+    so no matching string is ever missed.
+    """
+
+    def __init__(self, strings, max_diff, n=3):
+        self.strings = list(strings)
+        self.max_diff = max_diff
+        self.n = n
+        self.comparisons = 0
+        self._by_length = defaultdict(list)
+        self._postings = defaultdict(list)
+        for i, s in enumerate(self.strings):
+            self._by_length[len(s)].append(i)
+            for gram, count in _ngrams(s, n).iteritems():
+                self._postings[gram].append((i, count))
+        self._lengths = sorted(self._by_length.keys())
+
+    def _within_length(self, a, b):
+        """Check whether strings of lengths a and b can be similar."""
+        longest = max(a, b)
+        if not longest:
+            return True
+        return 100.0 * abs(a - b) / longest < self.max_diff
+
+    def _min_common(self, longest):
+        """The number of n-grams two similar strings have in common, at
+        least, if the longest one has the given length.
+        """
+        max_distance = int(self.max_diff * longest / 100.0)
+        return longest - self.n + 1 - max_distance * self.n
+
+    def candidates(self, text):
+        """Find the indexed strings, which may be similar to text.
+
+        Returns:
+            A sorted list of the positions of the strings in the index.
+        """
+        length = len(text)
+        if self.max_diff >= 100:
+            lengths = self._lengths
+        else:
+            ratio = 1 - self.max_diff / 100.0
+            lengths = self._lengths[
+                bisect_left(self._lengths, int(length * ratio)):
+                bisect_right(self._lengths, int(length / ratio) + 1)
+            ]
+
+        result = set()
+        thresholds = {}
+        for l in lengths:
+            if not self._within_length(length, l):
+                continue
+            min_common = self._min_common(max(length, l))
+            if min_common <= 0:
+                result.update(self._by_length[l])
+            else:
+                thresholds[l] = min_common
+
+        if thresholds:
+            common = defaultdict(int)
+            for gram, count in _ngrams(text, self.n).iteritems():
+                for i, c in self._postings.get(gram, ()):
+                    common[i] += min(count, c)
+            for i, c in common.iteritems():
+                if c >= thresholds.get(len(self.strings[i]), c + 1):
+                    result.add(i)
+        return sorted(result)
+
+    def match(self, text):
+        """Find the first indexed string similar to text.
+
+        Returns:
+            The position of the string in the index or None.
+        """
+        for i in self.candidates(text):
+            self.comparisons += 1
+            if percent_diff(text, self.strings[i]) < self.max_diff:
+                return i
+        return None
+
+
 def split_by_newline(text, start=0):
     """Generator to split the text in newlines.
 
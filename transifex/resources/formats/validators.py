@@ -1,14 +1,40 @@
 # -*- coding: utf-8 -*-
 """
 Validator classes for individual strings.
+
+The validators configured for each i18n type are grouped in chains (see
+``get_validator_chain``), which are built once per process and reuse their
+validator objects.
 """
 
 import re
-from polib import escape, unescape        # TODO: Fix the regex
+import threading
+import multiprocessing
+from itertools import chain
+from polib import escape, unescape as _polib_unescape  # TODO: Fix the regex
 from django.conf import settings
 from django.utils.translation import ugettext as _
 from transifex.txcommon import import_to_python
 
+# The unescaped strings cached by ``unescape``
+_UNESCAPED_CACHE_SIZE = 64
+_unescaped = {}
+
+
+def unescape(st):
+    """Unescape a string, like ``polib.unescape``.
+
+    All validators of a chain check the same pair of strings, so the results
+    of the most recent calls are kept, to unescape each string only once.
+    """
+    try:
+        return _unescaped[st]
+    except KeyError:
+        if len(_unescaped) >= _UNESCAPED_CACHE_SIZE:
+            _unescaped.clear()
+        result = _unescaped[st] = _polib_unescape(st)
+        return result
+
 
 class ValidationError(Exception):
     pass
@@ -360,14 +386,175 @@ class PrintfFormatTranslationValidator(BaseValidator):
                 raise ValidationError( _(msg  % pattern.group(0)))
 
 
+class ValidatorChain(object):
+    """The validators of a severity for an i18n type.
+
+    The validator objects are created once for each combination of
+    languages and plural rule and are reused afterwards.
+    """
+
+    # The maximum number of combinations kept
+    max_size = 1024
+
+    def __init__(self, classes):
+        self.classes = classes
+        self._validators = {}
+        self._lock = threading.Lock()
+
+    def validators(self, source_language, target_language, rule):
+        """Return the validator objects for the languages and the rule."""
+        key = (source_language, target_language, rule)
+        validators = self._validators.get(key)
+        if validators is None:
+            validators = [
+                klass(source_language, target_language, rule)
+                for klass in self.classes
+            ]
+            with self._lock:
+                if len(self._validators) >= self.max_size:
+                    self._validators.clear()
+                self._validators[key] = validators
+        return validators
+
+    def __call__(self, source_language, target_language, rule, old, new):
+        """Validate the `new` translation against the `old` one.
+
+        Raises:
+            A ValidationError of the first validator that fails.
+        """
+        for v in self.validators(source_language, target_language, rule):
+            v(old, new)
+
+    def messages(self, source_language, target_language, rule, old, new):
+        """Validate the `new` translation against the `old` one with all
+        validators.
+
+        Returns:
+            A list with the messages of the validators that fail.
+        """
+        messages = []
+        for v in self.validators(source_language, target_language, rule):
+            try:
+                v(old, new)
+            except ValidationError, e:
+                messages.append(e.message)
+        return messages
+
+
+_chains = {}
+_chains_lock = threading.Lock()
+
+
+def get_validator_chain(i18n_type, type_):
+    """Return the cached validator chain for an i18n type.
+
+    Args:
+        i18n_type: The i18n type for the validators.
+        type_: A string with the name of the type of the validators we need.
+            Currently, either I18N_ERROR_VALIDATORS or I18N_WARNING_VALIDATORS.
+    Returns:
+        A ValidatorChain object.
+    """
+    key = (i18n_type, type_)
+    chain = _chains.get(key)
+    if chain is None:
+        with _chains_lock:
+            chain = _chains.get(key)
+            if chain is None:
+                chain = _chains[key] = ValidatorChain(
+                    list(_create_validators(i18n_type, type_))
+                )
+    return chain
+
+
+def error_validator_chain(i18n_type):
+    """Return the chain of the error validators for the i18n type."""
+    return get_validator_chain(i18n_type, 'I18N_ERROR_VALIDATORS')
+
+
+def warning_validator_chain(i18n_type):
+    """Return the chain of the warning validators for the i18n type."""
+    return get_validator_chain(i18n_type, 'I18N_WARNING_VALIDATORS')
+
+
+def validate_many(i18n_type, source_language, target_language, items):
+    """Validate many translations of an i18n type at once.
+
+    Args:
+        i18n_type: The i18n type of the translations.
+        source_language: The source language.
+        target_language: The language of the translations.
+        items: An iterable of (rule, old, new) tuples, where ``old`` is the
+            source string and ``new`` the translation.
+    Returns:
+        A list with an (error, warnings) tuple for each item, where
+        ``error`` is the message of the first error validator that failed
+        or None and ``warnings`` a list with the messages of the warning
+        validators that failed.
+    """
+    errors = error_validator_chain(i18n_type)
+    warnings = warning_validator_chain(i18n_type)
+    results = []
+    for rule, old, new in items:
+        try:
+            errors(source_language, target_language, rule, old, new)
+            error = None
+        except ValidationError, e:
+            error = e.message
+        results.append((error, warnings.messages(
+            source_language, target_language, rule, old, new
+        )))
+    return results
+
+
+def _validate_chunk(args):
+    """Validate a chunk of items in a worker process.
+
+    Args:
+        args: A tuple with the arguments of ``validate_many``.
+    """
+    return validate_many(*args)
+
+
+def validate_many_in_pool(i18n_type, source_language, target_language,
+        items, processes, chunk_size=1000):
+    """Validate many translations of an i18n type, like ``validate_many``,
+    in a pool of processes.
+
+    The items are split in chunks of ``chunk_size`` items, which are
+    validated in parallel. Validation happens in the current process, if
+    there is only one chunk or ``processes`` is less than two.
+
+    Returns:
+        A list with an (error, warnings) tuple for each item.
+    """
+    items = list(items)
+    if processes < 2 or len(items) <= chunk_size:
+        return validate_many(
+            i18n_type, source_language, target_language, items
+        )
+    chunks = [
+        (i18n_type, source_language, target_language,
+         items[start:start + chunk_size])
+        for start in xrange(0, len(items), chunk_size)
+    ]
+    pool = multiprocessing.Pool(processes)
+    try:
+        results = pool.map(_validate_chunk, chunks)
+    finally:
+        pool.terminate()
+        pool.join()
+    return list(chain.from_iterable(results))
+
+
 def create_error_validators(i18n_type):
     """Create a suitable errors validator for the specific i18n type."""
-    return _create_validators(i18n_type, 'I18N_ERROR_VALIDATORS')
+    return iter(error_validator_chain(i18n_type).classes)
 
 
 def create_warning_validators(i18n_type):
     """Create a suitable warnings validator for the specific i18n type."""
-    return _create_validators(i18n_type, 'I18N_WARNING_VALIDATORS')
+    return iter(warning_validator_chain(i18n_type).classes)
 
 
 def _create_validators(i18n_type, type_):
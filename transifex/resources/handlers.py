@@ -5,6 +5,7 @@ from django.db.models.signals import pre_save
 from transifex.actionlog.models import action_logging
 from transifex.projects.signals import post_resource_save, post_resource_delete
 from transifex.txcommon import notifications as txnotification
+from transifex.resources.cache import compiled_translations
 from transifex.resources.utils import invalidate_template_cache
 from transifex.teams.models import Team
 
@@ -44,13 +45,13 @@ def invalidate_stats_cache(resource, language, **kwargs):
     else:
         rl, created = RLStats.objects.get_or_create(resource=resource,
             language=language)
-        # Source file was updated. Update all language statistics
-        stats = RLStats.objects.filter(resource=resource)
-        for s in stats:
-            s.update(kwargs['user'] if kwargs.has_key('user') else None)
-            if s.translated == 0 and s.language.id not in\
-              team_languages:
-                s.delete()
+        # Source file was updated. Update all language statistics at once
+        stats = RLStats.objects.recount_resource(resource,
+            kwargs['user'] if kwargs.has_key('user') else None)
+        empty = [s.id for s in stats
+            if s.translated == 0 and s.language_id not in team_languages]
+        if empty:
+            RLStats.objects.filter(id__in=empty).delete()
 
         # Update resource wordcount and total entities
         resource.update_total_entities(save=False)
@@ -58,10 +59,41 @@ def invalidate_stats_cache(resource, language, **kwargs):
 
     invalidate_object_templates(resource, language, **kwargs)
 
+def apply_stats_delta(resource, language, delta, **kwargs):
+    """
+    Update the persistent stats of a translation language by the changes
+    in ``delta`` and invalidate the template caches.
+
+    This is the incremental counterpart of ``invalidate_stats_cache``. Source
+    language changes affect all languages, so they still cause a full
+    recalculation.
+    """
+    if not language or language == resource.source_language:
+        return invalidate_stats_cache(resource, language, **kwargs)
+
+    user = kwargs.get('user')
+    rl, created = RLStats.objects.get_or_create(resource=resource,
+        language=language)
+    if created:
+        # A new RLStats object is counted from scratch when saved, so the
+        # changes are already accounted for.
+        rl.update(user)
+    else:
+        rl.apply_delta(delta, user)
+
+    if rl.translated == 0:
+        team_languages = get_project_teams(resource.project).values_list(
+            'language', flat=True)
+        if rl.language_id not in team_languages:
+            rl.delete()
+
+    invalidate_object_templates(resource, language, **kwargs)
+
 def invalidate_object_templates(resource, language, **kwargs):
     """
     Invalidate all template level caches related to a specific object
     """
+    compiled_translations.invalidate(resource, language)
 
     if language == resource.source_language:
         langs = resource.available_languages
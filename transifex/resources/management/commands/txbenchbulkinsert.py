@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import sys, time
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.db.models import get_model
+from djangobulk.bulk import insert_many
+from transifex.txcommon.db.bulk import supports_copy, copy_insert
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the bulk insertion of source entities and translations.
+    """
+    help = "This command creates a synthetic resource with the given "\
+           "number of strings and compares the time needed to insert its "\
+           "source entities and translations with multi-row INSERTs and "\
+           "with COPY. All data are rolled back afterwards."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--strings', type='int', dest='strings', default=200000,
+            help='The number of strings of the synthetic resource.'),
+    )
+
+    can_import_settings = True
+
+    def handle(self, *args, **options):
+        SourceEntity = get_model('resources', 'SourceEntity')
+        connection = connections[router.db_for_write(SourceEntity) or
+            'default']
+        if not supports_copy(connection):
+            raise CommandError("The database does not support COPY.")
+
+        strings = options.get('strings')
+        copy = lambda model, records: copy_insert(model, records, connection)
+        for name, insert in (('INSERT', insert_many), ('COPY', copy)):
+            se_time, t_time = self._run(insert, strings)
+            sys.stdout.write(
+                "%s: %s source entities in %.3fsec, %s translations in "
+                "%.3fsec\n" % (name, strings, se_time, strings, t_time)
+            )
+
+    @transaction.commit_manually
+    def _run(self, insert, strings):
+        """Insert the synthetic resource with ``insert``.
+
+        Returns:
+            A tuple with the durations of the source entities and the
+            translations insertions.
+        """
+        Project = get_model('projects', 'Project')
+        Resource = get_model('resources', 'Resource')
+        SourceEntity = get_model('resources', 'SourceEntity')
+        Translation = get_model('resources', 'Translation')
+        Language = get_model('languages', 'Language')
+        try:
+            language = Language.objects.all()[0]
+            project = Project.objects.create(slug='txbenchbulkinsert',
+                name='txbenchbulkinsert', source_language=language)
+            resource = Resource.objects.create(slug='txbenchbulkinsert',
+                name='txbenchbulkinsert', project=project, i18n_type='PO')
+
+            entities = [
+                SourceEntity(string='Source string number %s' % i,
+                    context='None', resource=resource, position=1)
+                for i in xrange(strings)
+            ]
+            start = time.time()
+            insert(SourceEntity, entities)
+            se_time = time.time() - start
+
+            translations = [
+                Translation(string='Translation of string number %s' % i,
+                    source_entity_id=se_id, language=language,
+                    resource=resource, rule=5)
+                for i, se_id in enumerate(SourceEntity.objects.filter(
+                    resource=resource).values_list('id', flat=True))
+            ]
+            start = time.time()
+            insert(Translation, translations)
+            t_time = time.time() - start
+            return se_time, t_time
+        finally:
+            transaction.rollback()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import sys, time
+from hashlib import md5
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from transifex.resources.formats.utils.hash_tag import hash_regex, \
+        hash_offsets, split_by_hash, substitute_hashes
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the substitution of the hashes of a template.
+    """
+    help = "This command builds a synthetic template with the given number "\
+           "of strings and compares the time needed to substitute its "\
+           "hashes with a regular expression, by splitting it to its "\
+           "segments and by splitting it at the stored offsets of its "\
+           "hashes. No data are read from or written to the database."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--strings', type='int', dest='strings', default=50000,
+            help='The number of strings of the synthetic template.'),
+    )
+
+    can_import_settings = True
+
+    def handle(self, *args, **options):
+        strings = options.get('strings')
+        hashes = [md5(str(i)).hexdigest() + '_tr' for i in xrange(strings)]
+        template = u''.join(
+            u'<message><source>String %s</source>'
+            u'<translation>%s</translation></message>\n' % (i, h)
+            for i, h in enumerate(hashes)
+        )
+        # The last string is left untranslated
+        translations = dict(
+            (h, u'Translation %s' % h[:8]) for h in hashes[:-1]
+        )
+        offsets = hash_offsets(template)
+
+        regex = hash_regex()
+        methods = (
+            ('regex', lambda: regex.sub(
+                lambda m: translations.get(m.group(0), m.group(0)), template
+            )),
+            ('segments', lambda: substitute_hashes(
+                split_by_hash(template), translations
+            )),
+            ('offsets', lambda: substitute_hashes(
+                split_by_hash(template, offsets), translations
+            )),
+        )
+        expected = None
+        for name, substitute in methods:
+            start = time.time()
+            compiled = substitute()
+            duration = time.time() - start
+            if expected is None:
+                expected = compiled
+            elif compiled != expected:
+                raise CommandError("The %s substitution differs." % name)
+            sys.stdout.write("%s: %s strings in %.3fsec\n" % (
+                name, strings, duration
+            ))
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+import sys, time
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import get_model
+from transifex.txcommon.db.bulk import bulk_insert
+
+# Filters of TranslationManager and the arguments of the translations they
+# look for.
+FILTERS = (
+    ('translated', 'translated_source_strings', {}),
+    ('untranslated', 'untranslated_source_strings', {}),
+    ('reviewed', 'reviewed_source_strings', {'reviewed': True}),
+    ('unreviewed', 'unreviewed_source_strings', {'reviewed': False}),
+)
+
+
+def _id_list_filter(resources, source_language, language, translated=True,
+        **filters):
+    """Filter the source strings with a list of source entity ids fetched
+    beforehand, which is how the filters used to be implemented.
+    """
+    SourceEntity = get_model('resources', 'SourceEntity')
+    Translation = get_model('resources', 'Translation')
+    se_ids = frozenset(Translation.objects.filter(
+        resource__in=resources, language=language, rule=5, **filters
+    ).values_list('source_entity_id', flat=True))
+    if not translated:
+        se_ids = frozenset(SourceEntity.objects.filter(
+            resource__in=resources
+        ).values_list('id', flat=True)) - se_ids
+    return Translation.objects.filter(resource__in=resources,
+        source_entity__id__in=se_ids, language=source_language, rule=5)
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the filters of the source strings used by Lotte.
+    """
+    help = "This command creates synthetic resources of the given sizes, "\
+           "with half of their strings translated and a quarter reviewed, "\
+           "and compares the time needed to count the source strings and "\
+           "fetch a page of them for each filter with lists of source "\
+           "entity ids and with IN subqueries. All data are rolled back "\
+           "afterwards."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--sizes', dest='sizes', default='1000,10000,50000',
+            help='Comma-separated numbers of strings of the resources.'),
+        make_option('--runs', type='int', dest='runs', default=5,
+            help='The number of times each query is run.'),
+    )
+
+    can_import_settings = True
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(s) for s in options.get('sizes').split(',')]
+        except ValueError:
+            raise CommandError("Invalid sizes: %s" % options.get('sizes'))
+        runs = options.get('runs')
+        for size in sizes:
+            for name, id_list_time, subquery_time in self._run(size, runs):
+                sys.stdout.write(
+                    "%s strings, %s: id list %.2fms, IN subquery %.2fms\n" % (
+                        size, name, id_list_time * 1000, subquery_time * 1000
+                    )
+                )
+
+    def _time(self, get_queryset, runs):
+        """Return the average time to build a queryset, count it and fetch
+        its first page.
+        """
+        start = time.time()
+        for i in xrange(runs):
+            qs = get_queryset()
+            qs.count()
+            list(qs.order_by('id')[:50])
+        return (time.time() - start) / runs
+
+    @transaction.commit_manually
+    def _run(self, size, runs):
+        """Create a resource with ``size`` strings and time the filters.
+
+        Returns:
+            A list of tuples with the name of each filter and its average
+            time with lists of ids and with IN subqueries.
+        """
+        Project = get_model('projects', 'Project')
+        Resource = get_model('resources', 'Resource')
+        SourceEntity = get_model('resources', 'SourceEntity')
+        Translation = get_model('resources', 'Translation')
+        Language = get_model('languages', 'Language')
+        try:
+            source_language, language = Language.objects.all()[:2]
+            project = Project.objects.create(slug='txbenchfilters',
+                name='txbenchfilters', source_language=source_language)
+            resource = Resource.objects.create(slug='txbenchfilters',
+                name='txbenchfilters', project=project, i18n_type='PO')
+            entities = [
+                SourceEntity(string='Source string number %s' % i,
+                    context='None', resource=resource, position=i)
+                for i in xrange(size)
+            ]
+            for se in entities:
+                se.presave()
+            bulk_insert(SourceEntity, entities)
+            translations = []
+            se_ids = SourceEntity.objects.filter(
+                resource=resource
+            ).values_list('id', flat=True)
+            for i, se_id in enumerate(se_ids):
+                translations.append(Translation(
+                    string='Source string number %s' % i,
+                    source_entity_id=se_id, language=source_language,
+                    resource=resource, rule=5
+                ))
+                if i % 2 == 0:
+                    translations.append(Translation(
+                        string='Translation of string number %s' % i,
+                        source_entity_id=se_id, language=language,
+                        resource=resource, rule=5, reviewed=i % 4 == 0
+                    ))
+            for t in translations:
+                t.presave()
+            bulk_insert(Translation, translations)
+
+            results = []
+            resources = [resource]
+            for name, method, filters in FILTERS:
+                id_list_time = self._time(
+                    lambda: _id_list_filter(resources, source_language,
+                        language, translated=name != 'untranslated',
+                        **filters),
+                    runs
+                )
+                subquery_time = self._time(
+                    lambda: getattr(Translation.objects, method)(
+                        resources, language),
+                    runs
+                )
+                results.append((name, id_list_time, subquery_time))
+            return results
+        finally:
+            transaction.rollback()
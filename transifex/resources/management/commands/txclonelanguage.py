@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import get_model
+from transifex.resources.backends import FormatsBackend, FormatsBackendError
+from transifex.resources.cache import commit_on_success
+
+
+class Command(BaseCommand):
+    """
+    Management command to copy the translations of resources from one
+    language to another.
+    """
+    help = "This command copies the translations of the given resources "\
+           "(or of all the resources of the given projects) from the source "\
+           "language code to the target one, inside the database. Strings "\
+           "already translated in the target language are left intact."
+    args = "<source_lang_code> <target_lang_code> "\
+           "<project_slug1[.resource_slug1] project_slug2[.resource_slug2]>"
+
+    can_import_settings = True
+
+    def handle(self, *args, **options):
+        Resource = get_model('resources', 'Resource')
+        Language = get_model('languages', 'Language')
+
+        verbosity = int(options.get('verbosity', 1))
+        if len(args) < 3:
+            raise CommandError("Usage: %s" % self.args)
+        try:
+            source_language = Language.objects.by_code_or_alias(args[0])
+            target_language = Language.objects.by_code_or_alias(args[1])
+        except Language.DoesNotExist, e:
+            raise CommandError(unicode(e))
+
+        resources = []
+        for arg in args[2:]:
+            if '.' in arg:
+                prj, res = arg.split('.', 1)
+                found = Resource.objects.filter(project__slug=prj, slug=res)
+            else:
+                found = Resource.objects.filter(project__slug=arg)
+            if not found:
+                raise CommandError("Unknown resource or project %s" % arg)
+            resources.extend(found)
+
+        for r in resources:
+            try:
+                added = self._clone(r, source_language, target_language)
+            except FormatsBackendError, e:
+                sys.stderr.write((u"Skipping resource %s.%s: %s\n" % (
+                    r.project.slug, r.slug, e)).encode('UTF-8'))
+                continue
+            if verbosity:
+                sys.stdout.write((u"Copied %s strings of resource %s.%s.\n" %
+                    (added, r.project.slug, r.slug)).encode('UTF-8'))
+
+    @commit_on_success
+    def _clone(self, resource, source_language, target_language):
+        """Copy the translations of a resource in its own transaction."""
+        return FormatsBackend(resource, target_language).clone_translation(
+            source_language
+        )
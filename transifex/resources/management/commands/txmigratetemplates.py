@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import sys
+from optparse import make_option
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import get_model, Q
+
+
+class Command(BaseCommand):
+    """
+    Management command to move the content of the templates to the
+    compressed binary column and to store the offsets of their hashes.
+    """
+    help = "This command moves the content of the templates that are still "\
+           "stored pickled and base64-encoded to the content_data column, "\
+           "which holds the raw zlib-compressed bytes, and stores the "\
+           "offsets of the hashes of the templates that have none. "\
+           "Templates are migrated in batches, each one in its own "\
+           "transaction."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size', type='int', dest='batch_size',
+            default=100, help='The number of templates migrated at a time.'),
+    )
+
+    can_import_settings = True
+
+    def handle(self, *args, **options):
+        Template = get_model('resources', 'Template')
+
+        verbosity = int(options.get('verbosity', 1))
+        batch_size = options.get('batch_size')
+
+        ids = Template.objects.filter(
+            Q(content_data__isnull=True, legacy_content__isnull=False) |
+            Q(content_data__isnull=False, hash_offsets__isnull=True)
+        ).order_by('id').values_list('id', flat=True)
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            self._migrate(Template, batch)
+            last_id = batch[-1]
+            total += len(batch)
+            if verbosity:
+                sys.stdout.write("Migrated %s templates.\n" % total)
+
+    @transaction.commit_on_success
+    def _migrate(self, Template, ids):
+        """Migrate the templates with the given ids."""
+        for t in Template.objects.filter(id__in=ids):
+            t.content = t.content
+            t.save()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import copy
+import sys
+from optparse import make_option
+from django.core.management.base import BaseCommand
+from django.db.models import get_model
+
+# Fields of RLStats maintained incrementally
+COUNTERS = ('translated', 'untranslated', 'reviewed', 'translated_wordcount')
+
+
+class Command(BaseCommand):
+    """
+    Management command to verify the incrementally maintained statistics
+    against a full recount.
+    """
+    help = "This command recounts the statistics of the given resources "\
+           "(or all resources) and reports any RLStats objects whose "\
+           "counters have drifted. Use --fix to correct them."
+    args = "<project_slug1.resource_slug1 project_slug1.resource_slug2>"
+
+    option_list = BaseCommand.option_list + (
+        make_option('--fix', action='store_true', dest='fix', default=False,
+            help='Save the recounted values for the mismatched objects.'),
+    )
+
+    can_import_settings = True
+
+    def handle(self, *args, **options):
+        RLStats = get_model('resources', 'RLStats')
+
+        verbosity = int(options.get('verbosity', 1))
+        fix = options.get('fix')
+
+        rlstats = RLStats.objects.select_related('resource__project',
+            'resource__source_language', 'language'
+        ).order_by('resource', 'language')
+        if args:
+            resources = []
+            for arg in args:
+                try:
+                    prj, res = arg.split('.')
+                except ValueError:
+                    raise Exception("Argument %s is not in the correct format"
+                        % arg)
+                resources.append((prj, res))
+            rlstats = [
+                rl for rl in rlstats.filter(resource__project__slug__in=[
+                    p for p, r in resources])
+                if (rl.resource.project.slug, rl.resource.slug) in resources
+            ]
+
+        mismatches = 0
+        for rl in rlstats:
+            expected = copy.copy(rl)
+            expected.recount()
+            diffs = [
+                (field, getattr(rl, field), getattr(expected, field))
+                for field in COUNTERS
+                if getattr(rl, field) != getattr(expected, field)
+            ]
+            if not diffs:
+                continue
+            mismatches += 1
+            if verbosity:
+                sys.stdout.write((u"Mismatch for %s.%s in %s: %s\n" % (
+                    rl.resource.project.slug, rl.resource.slug,
+                    rl.language.code, ', '.join(
+                        ["%s is %s, should be %s" % d for d in diffs]
+                    ))).encode('UTF-8'))
+            if fix:
+                expected.save(update=False)
+
+        if verbosity:
+            sys.stdout.write("%s statistics objects found out of sync.\n" %
+                mismatches)
+            if mismatches and fix:
+                sys.stdout.write("All of them have been fixed.\n")
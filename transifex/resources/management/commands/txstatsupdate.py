@@ -65,13 +65,17 @@ class Command(LabelCommand):
                 resource=r).order_by('language').values_list(
                 'language',flat=True).distinct())
 
-            # Update stats
+            # Make sure a RLStats object exists for every language. The
+            # statistics are calculated for all of them at once below.
+            existing = set(RLStats.objects.filter(resource=r).values_list(
+                'language', flat=True))
             for lang in langs:
+                if lang in existing:
+                    continue
                 lang = Language.objects.get(id=lang)
                 if verbosity:
-                    sys.stdout.write("Calculating statistics for language %s.\n" % lang)
-                rl, created = RLStats.objects.get_or_create(resource=r, language=lang)
-                rl.update()
+                    sys.stdout.write("Adding statistics for language %s.\n" % lang)
+                RLStats(resource=r, language=lang).save(update=False)
 
             if r.project.outsource:
                 teams = Team.objects.filter(project=r.project.outsource)
@@ -85,17 +89,18 @@ class Command(LabelCommand):
                 lang = team.language
                 # Add team languages to the existing languages
                 langs.append(lang.id)
+                if lang.id in existing:
+                    continue
                 if verbosity:
-                    sys.stdout.write("Calculating statistics for team language %s.\n" % lang)
-                rl,created = RLStats.objects.get_or_create(resource=r, language=lang)
-                rl.update()
+                    sys.stdout.write("Adding statistics for team language %s.\n" % lang)
+                RLStats(resource=r, language=lang).save(update=False)
 
             # Add source language to the existing languages
             langs.append(r.source_language.id)
 
             # For all existing languages that don't have a translation or
             # don't have a corresponding team, delete RLStat object
-            rlstats = RLStats.objects.filter(resource=r)
-            for stat in rlstats:
-                if not stat.language.id in langs:
-                    stat.delete()
+            RLStats.objects.filter(resource=r).exclude(
+                language__id__in=langs).delete()
+
+            RLStats.objects.recount_resource(r)
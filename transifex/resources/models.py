@@ -4,24 +4,26 @@ String Level models.
 """
 
 import datetime, sys, re, operator
+from array import array
 from itertools import groupby
 
 from hashlib import md5
 from django.conf import settings
 from django.core.cache import cache
 from django.core.validators import validate_slug
-from django.db import models, connection
-from django.db.models import Q, Sum, Max
+from django.db import models, connection, transaction
+from django.db.models import Q, F, Sum, Max
 from django.utils.translation import ugettext_lazy as _
 from django.utils.hashcompat import md5_constructor
 from django.utils import simplejson as json
 from django.contrib.auth.models import User, AnonymousUser
 from django.forms import ValidationError
-from djangobulk.bulk import insert_many, update_many
+from djangobulk.bulk import update_many
 from transifex.languages.models import Language
 from transifex.projects.models import Project
 from transifex.txcommon.db.models import CompressedTextField, \
-    ChainerManager, ListCharField
+    CompressedBinaryField, ChainerManager, ListCharField
+from transifex.txcommon.db.bulk import bulk_insert as insert_records
 from transifex.txcommon.log import logger
 from transifex.resources.utils import invalidate_template_cache
 from transifex.resources.signals import post_update_rlstats
@@ -330,14 +332,58 @@ class SourceEntityManager(models.Manager):
             resource__in=Resource.objects.for_user(user))
 
     def bulk_insert(self, records):
-        """Bulk insert records to the database."""
-        # TODO Maybe use COPY instead?
-        insert_many(SourceEntity, records)
+        """Bulk insert records to the database.
+
+        COPY is used on PostgreSQL, multi-row INSERTs otherwise.
+        """
+        insert_records(SourceEntity, records)
 
     def bulk_update(self, records):
         """Bulk update records to the database."""
         update_many(SourceEntity, records)
 
+    def delete_by_ids(self, se_ids, batch_size=500):
+        """Delete source entities along with their translations, suggestions
+        and votes for the suggestions.
+
+        Instead of letting Django collect and delete every related object
+        separately, the rows are removed with a few DELETE statements for
+        each batch of ``batch_size`` ids.
+
+        Args:
+            se_ids: An iterable of source entity ids.
+            batch_size: The number of source entities deleted at a time.
+        Returns:
+            The number of source entities deleted.
+        """
+        qn = connection.ops.quote_name
+        # Tables to delete from, with the column that refers to the source
+        # entity (directly or through a subquery), in dependency order.
+        tables = []
+        Suggestion = models.get_model('suggestions', 'Suggestion')
+        if Suggestion is not None:
+            Vote = models.get_model('suggestions', 'Vote')
+            tables.append((Vote._meta.db_table, 'suggestion_id',
+                "SELECT id FROM %s WHERE source_entity_id IN (%%s)" % qn(
+                    Suggestion._meta.db_table)))
+            tables.append((Suggestion._meta.db_table, 'source_entity_id',
+                "%s"))
+        tables.append((Translation._meta.db_table, 'source_entity_id', "%s"))
+        tables.append((SourceEntity._meta.db_table, 'id', "%s"))
+
+        se_ids = list(se_ids)
+        deleted = 0
+        cursor = connection.cursor()
+        for start in xrange(0, len(se_ids), batch_size):
+            batch = se_ids[start:start + batch_size]
+            placeholders = ', '.join(['%s'] * len(batch))
+            for table, column, values in tables:
+                cursor.execute("DELETE FROM %s WHERE %s IN (%s)" % (
+                    qn(table), qn(column), values % placeholders), batch)
+            deleted += cursor.rowcount
+        transaction.commit_unless_managed()
+        return deleted
+
 
 class SourceEntity(models.Model):
     """
@@ -503,6 +549,52 @@ class TranslationManager(models.Manager):
             resource__in=resources, language=source_language, rule=5
         )
 
+    def _source_strings_by_translations(self, resources, language,
+            translated=True, reviewed=None, users=None):
+        """Return the source strings which have (or have not) been translated
+        in the specified language.
+
+        The translations are matched with an IN (or NOT IN) subquery, so
+        that the ids of the source entities never leave the database. The
+        subquery is restricted to the same resources as the source strings,
+        so that it only reads the translations of those resources through
+        the indexes on resource and language, instead of all the
+        translations in the language.
+
+        Args:
+            resources: An iterable of Resource objects.
+            language: The language of the translations.
+            translated: Whether the source strings must have a translation
+                or not.
+            reviewed: If not None, the value the ``reviewed`` field of the
+                translations must have.
+            users: If not None, an iterable of the ids of the users, who
+                must have made the translations.
+
+        Returns:
+            A queryset which returns the matching source strings.
+        """
+        source_language = get_source_language(resources)
+        translations = self.model.objects.filter(
+            resource__in=resources, language=language, rule=5
+        )
+        if reviewed is not None:
+            translations = translations.filter(reviewed=reviewed)
+        if users is not None:
+            users = list(users)
+            if not users:
+                return self.none()
+            translations = translations.filter(user__in=users)
+        # Add resource_id as well to reduce the search space
+        # by taking advantage of the indexes in resource and language
+        source_strings = self.filter(
+            resource__in=resources, language=source_language, rule=5
+        )
+        subquery = translations.values('source_entity')
+        if translated:
+            return source_strings.filter(source_entity__in=subquery)
+        return source_strings.exclude(source_entity__in=subquery)
+
     def untranslated_source_strings(self, resources, language):
         """Return the source strings which have not been translated in the specified
         language.
@@ -515,20 +607,8 @@ class TranslationManager(models.Manager):
             A queryset which returns all untranslated source strings in the specified
             language.
         """
-        source_language = get_source_language(resources)
-        all_se_ids = frozenset(SourceEntity.objects.filter(
-            resource__in=resources
-        ).values_list('id', flat=True))
-        translated_se_ids = frozenset(self.filter(
-            resource__in=resources, language=language, rule=5
-        ).values_list('source_entity_id', flat=True))
-        untranslated_se_ids = all_se_ids - translated_se_ids
-        # Add resource_id as well to reduce the search space
-        # by taking advantage of the indexes in resource and language
-        return self.filter(
-            resource__in=resources,
-            source_entity__id__in=untranslated_se_ids,
-            language=source_language, rule=5
+        return self._source_strings_by_translations(
+            resources, language, translated=False
         )
 
     def translated_source_strings(self, resources, language):
@@ -543,17 +623,7 @@ class TranslationManager(models.Manager):
             A queryset which returns all translated source strings in the specified
             language.
         """
-        source_language = get_source_language(resources)
-        translated_se_ids = frozenset(self.filter(
-            resource__in=resources, language=language, rule=5
-        ).values_list('source_entity_id', flat=True))
-        # Add resource_id as well to reduce the search space
-        # by taking advantage of the indexes in resource and language
-        return self.filter(
-            resource__in=resources,
-            source_entity__id__in=translated_se_ids,
-            language=source_language, rule=5
-        )
+        return self._source_strings_by_translations(resources, language)
 
     def reviewed_source_strings(self, resources, language):
         """Return the source strings which have been translated and reviewed
@@ -567,15 +637,8 @@ class TranslationManager(models.Manager):
             A queryset which returns all reviewed source strings in the
             specified language.
         """
-        source_language = get_source_language(resources)
-        reviewed_se_ids = frozenset(self.filter(resource__in=resources,
-            language=language, rule=5, reviewed=True,
-        ).values_list('source_entity_id', flat=True))
-
-        return self.filter(
-            resource__in=resources,
-            source_entity__id__in=reviewed_se_ids,
-            language=source_language, rule=5
+        return self._source_strings_by_translations(
+            resources, language, reviewed=True
         )
 
     def unreviewed_source_strings(self, resources, language):
@@ -590,15 +653,8 @@ class TranslationManager(models.Manager):
             A queryset which returns all reviewed source strings in the
             specified language.
         """
-        source_language = get_source_language(resources)
-        reviewed_se_ids = frozenset(self.filter(resource__in=resources,
-            language=language, rule=5, reviewed=False,
-        ).values_list('source_entity_id', flat=True))
-
-        return self.filter(
-            resource__in=resources,
-            source_entity__id__in=reviewed_se_ids,
-            language=source_language, rule=5
+        return self._source_strings_by_translations(
+            resources, language, reviewed=False
         )
 
     def user_translated_strings(self, resources, language, users):
@@ -614,24 +670,144 @@ class TranslationManager(models.Manager):
             A queryset that returns all source strigns which have been translated in
             `language` by `users`.
         """
-        source_language = get_source_language(resources)
-        user_translated_se_ids = frozenset(self.filter(
-            language=language, rule=5,
-            user__id__in=users,
-            resource__in=resources
-        ).values_list('source_entity_id', flat=True))
-        # Add resource_id as well to reduce the search space
-        # by taking advantage of the indexes in resource and language
+        return self._source_strings_by_translations(
+            resources, language, users=users
+        )
+
+    def source_wordcount(self, resource, se_ids):
+        """Return the wordcount of the source strings of some entities.
+
+        This is the amount ``RLStats.translated_wordcount`` changes by, when
+        the specified source entities get translated (or untranslated).
+
+        Args:
+            resource: The resource the source entities belong to.
+            se_ids: An iterable of source entity ids.
+        Returns:
+            The sum of the wordcount of all the source language translations
+            of the entities.
+        """
+        se_ids = list(se_ids)
+        if not se_ids:
+            return 0
         return self.filter(
-            resource__in=resources,
-            source_entity__id__in=user_translated_se_ids,
-            language=source_language, rule=5,
+            resource=resource, language=resource.source_language,
+            source_entity__id__in=se_ids
+        ).aggregate(Sum('wordcount'))['wordcount__sum'] or 0
+
+    def set_reviewed(self, resource, language, se_ids, reviewed, user):
+        """Set the reviewed flag of the translations of some entities.
+
+        The translations are updated with a single UPDATE and their review
+        history is stored with a single bulk insert.
+
+        Args:
+            resource: The resource the source entities belong to.
+            language: The language of the translations.
+            se_ids: An iterable of source entity ids.
+            reviewed: The new value of the reviewed flag.
+            user: The user who reviews the translations.
+        Returns:
+            A StatsDelta object with the change in the reviewed strings of
+            the language, to be applied to its RLStats object.
+        """
+        delta = StatsDelta()
+        reviewed = bool(reviewed)
+        se_ids = list(se_ids)
+        if not se_ids:
+            return delta
+        translations = self.filter(resource=resource, language=language,
+            source_entity__id__in=se_ids)
+        rows = list(translations.values_list('id', 'string', 'rule',
+            'reviewed'))
+        if not rows:
+            return delta
+        changed = len([
+            1 for t_id, string, rule, was_reviewed in rows
+            if rule == 5 and bool(was_reviewed) != reviewed
+        ])
+        delta.reviewed = reviewed and changed or -changed
+        translations.update(reviewed=reviewed)
+        ReviewHistory.bulk_add(
+            [(t_id, string) for t_id, string, rule, was_reviewed in rows],
+            user, resource.project_id, reviewed
+        )
+        return delta
+
+    def clone_language(self, resource, source_language, target_language,
+            user=None):
+        """Copy the translations of a resource in a language to another one.
+
+        The translations are copied with a single INSERT ... SELECT, which
+        skips the strings that are already translated in the target language.
+        Pluralized strings are only copied, if the two languages have the
+        same plural rules.
+
+        Args:
+            resource: The resource of the translations.
+            source_language: The language to copy the translations from.
+            target_language: The language to copy the translations to.
+            user: The user to set as the committer of the new translations.
+        Returns:
+            A StatsDelta object with the changes in the statistics of the
+            target language.
+        """
+        delta = StatsDelta()
+        if source_language == target_language:
+            return delta
+        qn = connection.ops.quote_name
+        table = qn(self.model._meta.db_table)
+        conditions = [
+            "s.resource_id = %s", "s.language_id = %s",
+            "NOT EXISTS (SELECT 1 FROM %s t WHERE "
+            "t.source_entity_id = s.source_entity_id AND "
+            "t.language_id = %%s AND t.rule = s.rule)" % table,
+        ]
+        params = [resource.id, source_language.id, target_language.id]
+        if source_language.get_pluralrules() != \
+                target_language.get_pluralrules():
+            conditions.append(
+                "NOT EXISTS (SELECT 1 FROM %s se WHERE "
+                "se.id = s.source_entity_id AND se.pluralized = %%s)" % qn(
+                    SourceEntity._meta.db_table)
+            )
+            params.append(True)
+        where = ' AND '.join(conditions)
+
+        cursor = connection.cursor()
+        # The translated wordcount is that of the source strings of the
+        # resource, whichever the language the translations are copied from.
+        cursor.execute(
+            "SELECT COUNT(*), SUM(src.wordcount) FROM %s s "
+            "INNER JOIN %s src ON src.source_entity_id = s.source_entity_id "
+            "AND src.language_id = %%s AND src.rule = 5 "
+            "WHERE s.rule = 5 AND %s" % (table, table, where),
+            [resource.source_language_id] + params
         )
+        added, wordcount = cursor.fetchone()
+        delta.added = added or 0
+        delta.wordcount = wordcount or 0
+
+        now = datetime.datetime.now()
+        cursor.execute(
+            "INSERT INTO %s (string, string_hash, rule, wordcount, origin, "
+            "reviewed, created, last_update, source_entity_id, resource_id, "
+            "language_id, user_id) "
+            "SELECT s.string, s.string_hash, s.rule, s.wordcount, NULL, "
+            "%%s, %%s, %%s, s.source_entity_id, s.resource_id, %%s, %%s "
+            "FROM %s s WHERE %s" % (table, table, where),
+            [False, now, now, target_language.id, user and user.id or None]
+            + params
+        )
+        transaction.commit_unless_managed()
+        return delta
 
     def bulk_insert(self, records):
-        """Bulk insert translations."""
-        # TODO Maybe use COPY instead?
-        insert_many(Translation, records)
+        """Bulk insert translations.
+
+        COPY is used on PostgreSQL, multi-row INSERTs otherwise.
+        """
+        insert_records(Translation, records)
 
     def bulk_update(self, records):
         """Bulk update records to the database."""
@@ -755,6 +931,41 @@ class Translation(models.Model):
             pass
 
 
+def _translation_counts_by_language(resource):
+    """
+    Count the translated and reviewed entities and the translated wordcount
+    of a resource for every language with a single grouped query.
+
+    The translated wordcount is the wordcount of the source strings (of all
+    plural forms) of the translated entities, like in
+    ``RLStats._calculate_translated_wordcount``.
+
+    Returns:
+        A dictionary mapping language ids to (translated, reviewed,
+        translated_wordcount) tuples.
+    """
+    qn = connection.ops.quote_name
+    table = qn(Translation._meta.db_table)
+    sql = (
+        "SELECT t.language_id, COUNT(t.id), "
+        "SUM(CASE WHEN t.reviewed THEN 1 ELSE 0 END), "
+        "SUM(COALESCE(s.wordcount, 0)) "
+        "FROM %(table)s t LEFT OUTER JOIN ("
+        "SELECT source_entity_id, SUM(wordcount) AS wordcount "
+        "FROM %(table)s WHERE resource_id = %%s AND language_id = %%s "
+        "GROUP BY source_entity_id"
+        ") s ON s.source_entity_id = t.source_entity_id "
+        "WHERE t.resource_id = %%s AND t.rule = 5 "
+        "GROUP BY t.language_id" % {'table': table}
+    )
+    cursor = connection.cursor()
+    cursor.execute(sql, [resource.id, resource.source_language_id, resource.id])
+    return dict(
+        (row[0], (row[1], int(row[2] or 0), int(row[3] or 0)))
+        for row in cursor.fetchall()
+    )
+
+
 class RLStatsQuerySet(models.query.QuerySet):
 
     def for_user(self, user):
@@ -835,6 +1046,36 @@ class RLStatsQuerySet(models.query.QuerySet):
         resources = Resource.objects.by_project(project)
         return self.by_language(language).by_resources(resources)
 
+    def recount_resource(self, resource, user=None):
+        """
+        Recalculate the statistics of ``resource`` in all the languages it
+        has RLStats objects for.
+
+        Instead of updating each RLStats object with its own queries, the
+        counters of all languages are calculated with a single query grouped
+        by language and are written back with a single bulk update.
+
+        Returns:
+            A list of the updated RLStats objects.
+        """
+        total = SourceEntity.objects.filter(resource=resource).count()
+        counts = _translation_counts_by_language(resource)
+        rlstats = list(self.filter(resource=resource))
+        for rl in rlstats:
+            translated, reviewed, wordcount = counts.get(
+                rl.language_id, (0, 0, 0)
+            )
+            rl.translated = translated
+            rl.untranslated = total - translated
+            rl.reviewed = reviewed
+            rl.translated_wordcount = wordcount
+            rl._calculate_perc()
+            rl._update_now(user)
+        update_many(RLStats, rlstats)
+        for rl in rlstats:
+            post_update_rlstats.send_robust(sender=rl)
+        return rlstats
+
     def by_release_aggregated(self, release):
         """
         Aggregate stats for a ``release``.
@@ -898,6 +1139,50 @@ class RLStatsQuerySet(models.query.QuerySet):
         return _aggregate_rlstats(self.by_project(project).order_by('resource__slug'),
             'resource', total)
 
+class StatsDelta(object):
+    """
+    The changes to the statistics of a resource in a language.
+
+    Code that adds, removes or reviews translations collects the changes
+    here, so that they can be applied to the relevant RLStats object
+    without recounting everything (see ``RLStats.apply_delta``).
+
+    Only translations of rule 5 ('other') should be accounted for, since
+    these are the ones the statistics are calculated from.
+    """
+
+    def __init__(self, added=0, removed=0, reviewed=0, wordcount=0):
+        # Number of source entities that got translated
+        self.added = added
+        # Number of source entities that lost their translation
+        self.removed = removed
+        # Net change of reviewed translations
+        self.reviewed = reviewed
+        # Net change of the wordcount of the translated entities
+        self.wordcount = wordcount
+
+    def __repr__(self):
+        return '<StatsDelta: +%s -%s reviewed:%+d wordcount:%+d>' % (
+            self.added, self.removed, self.reviewed, self.wordcount
+        )
+
+    def __nonzero__(self):
+        return bool(self.added or self.removed or self.reviewed or
+                    self.wordcount)
+
+    def __iadd__(self, other):
+        self.added += other.added
+        self.removed += other.removed
+        self.reviewed += other.reviewed
+        self.wordcount += other.wordcount
+        return self
+
+    @property
+    def translated(self):
+        """Net change of translated entities."""
+        return self.added - self.removed
+
+
 class RLStats(models.Model):
     """
     Resource-Language statistics object.
@@ -1003,20 +1288,65 @@ class RLStats(models.Model):
         ).count()
         self.reviewed = reviewed
 
-    def update(self, user=None, save=True):
+    def recount(self):
         """
-        Update the RLStat object
+        Recalculate all counters from the translations in the database,
+        without saving the object.
         """
         self._calculate_translated()
         self._calculate_reviewed()
         self._calculate_translated_wordcount()
         self._calculate_perc()
+
+    def update(self, user=None, save=True):
+        """
+        Update the RLStat object
+        """
+        self.recount()
         if user:
             self._update_now(user)
         if save:
             self.save(update=False)
         post_update_rlstats.send_robust(sender=self)
 
+    def apply_delta(self, delta, user=None):
+        """
+        Update the RLStat object by the changes in ``delta``.
+
+        The counters are updated atomically in the database with F()
+        expressions, so that concurrent saves do not overwrite each other.
+        The percentages are recalculated from the resulting values.
+
+        Args:
+            delta: A StatsDelta object.
+            user: The user that caused the changes.
+        """
+        self._update_now(user)
+        values = {'last_update': self.last_update}
+        if user:
+            values['last_committer'] = user
+        if delta:
+            values.update({
+                'translated': F('translated') + delta.translated,
+                'untranslated': F('untranslated') - delta.translated,
+                'reviewed': F('reviewed') + delta.reviewed,
+                'translated_wordcount': F('translated_wordcount') +\
+                    delta.wordcount,
+            })
+        qs = RLStats.objects.filter(pk=self.pk)
+        qs.update(**values)
+        (self.translated, self.untranslated, self.reviewed,
+         self.translated_wordcount) = qs.values_list(
+            'translated', 'untranslated', 'reviewed', 'translated_wordcount'
+        )[0]
+        self._calculate_perc()
+        qs.update(
+            translated_perc=self.translated_perc,
+            untranslated_perc=self.untranslated_perc,
+            reviewed_perc=self.reviewed_perc
+        )
+        post_update_rlstats.send_robust(sender=self)
+
     def _update_now(self, user=None):
         """
         Update the last update and last committer.
@@ -1035,8 +1365,17 @@ class Template(models.Model):
     replace each time we want to recreate the file.
     """
 
-    content = CompressedTextField(null=False, blank=False,
+    content_data = CompressedBinaryField(null=True, blank=True,
+        editable=False,
         help_text=_("This is the actual content of the template"))
+    legacy_content = CompressedTextField(null=True, blank=True,
+        editable=False, db_column='content',
+        help_text=_("The content of templates stored before content_data "
+            "was introduced. See the txmigratetemplates command."))
+    hash_offsets = CompressedBinaryField(null=True, blank=True,
+        editable=False,
+        help_text=_("The offsets of the hashes in the content, so that it "
+            "is not searched for them each time it is compiled."))
     resource = models.OneToOneField(Resource,
         verbose_name=_("Resource"),unique=True,
         blank=False, null=False,related_name="source_file_template",
@@ -1048,6 +1387,53 @@ class Template(models.Model):
         verbose_name_plural = _('Templates')
         ordering = ['resource']
 
+    def _get_content(self):
+        if self.content_data is None:
+            return self.legacy_content
+        return self.content_data
+
+    def _set_content(self, value):
+        self.content_data = value
+        self.legacy_content = None
+        self.hash_offsets = self._find_hash_offsets()
+
+    content = property(_get_content, _set_content,
+        doc="The content of the template, in whichever column it is.")
+
+    def _find_hash_offsets(self):
+        """Return the offsets of the hashes in content_data, packed.
+
+        The offsets refer to the content decoded as UTF-8. They are None,
+        if there is no content or it is not valid UTF-8.
+        """
+        from transifex.resources.formats.utils.hash_tag import hash_offsets
+        if self.content_data is None:
+            return None
+        try:
+            text = self.content_data.decode('UTF-8')
+        except UnicodeDecodeError:
+            return None
+        offsets = hash_offsets(text)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        return offsets.tostring()
+
+    def get_hash_offsets(self):
+        """Return the offsets of the hashes in the content.
+
+        The offsets are stored, whenever the ``content`` is set.
+
+        Returns:
+            An array, as returned by ``hash_offsets``, or None, if the
+            offsets have not been stored.
+        """
+        if self.hash_offsets is None or self.content_data is None:
+            return None
+        offsets = array('i', self.hash_offsets)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        return offsets
+
 post_update_rlstats.connect(check_and_notify_resource_full_reviewed)
 
 
@@ -1116,5 +1502,140 @@ class ReviewHistory(models.Model):
         if isinstance(t, Translation):
             cls.add_one(t, user, project_id, reviewed)
         elif isinstance(t, models.query.QuerySet):
-            for translation in t:
-                cls.add_one(translation, user, project_id, reviewed)
+            cls.bulk_add(t.values_list('id', 'string'), user, project_id,
+                reviewed)
+
+    @classmethod
+    def bulk_add(cls, rows, user, project_id, reviewed):
+        """Create the entries of many translations with a bulk insert.
+
+        Args:
+            rows: An iterable of (translation id, string) tuples.
+            user: The user who performed the review action.
+            project_id: The id of the project of the translations.
+            reviewed: Whether the translations were reviewed or unreviewed.
+        """
+        action = 'R' if reviewed else 'U'
+        created = datetime.datetime.now()
+        insert_records(cls, [
+            cls(translation_id=t_id, project_id=project_id, string=string,
+                username=user.username, created=created, action=action)
+            for t_id, string in rows
+        ])
+
+
+class ImportJob(models.Model):
+    """
+    The import of an uploaded file to a resource.
+
+    Jobs are run by celery workers (see ``resources.tasks.run_import_job``),
+    so that big files are not parsed and saved inside the request. The
+    uploaded content is kept in the job until the import ends.
+
+    The import of the strings runs in a single transaction, which means the
+    job cannot be updated while the strings are saved. The number of strings
+    processed so far is kept in the cache instead.
+    """
+
+    STATUS_PENDING = 'P'
+    STATUS_RUNNING = 'R'
+    STATUS_DONE = 'D'
+    STATUS_FAILED = 'F'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    resource = models.ForeignKey(Resource, related_name='import_jobs',
+        help_text="The resource the file is imported to.")
+    language = models.ForeignKey(Language, null=True,
+        help_text="The language of the file.")
+    user = models.ForeignKey(User, blank=True, null=True,
+        help_text="The user who uploaded the file.")
+    is_source = models.BooleanField(default=False,
+        help_text="Whether the file is a source file.")
+    filename = models.CharField(max_length=255, blank=True, null=True,
+        help_text="The name of the uploaded file.")
+    content = CompressedBinaryField(null=True, blank=True, editable=False,
+        help_text="The content of the uploaded file.")
+
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES,
+        default=STATUS_PENDING, db_index=True)
+    phase = models.CharField(max_length=20, blank=True, default='',
+        help_text="The phase of the import the job is in.")
+    strings_total = models.PositiveIntegerField(default=0,
+        help_text="The number of strings found in the file.")
+    strings_processed = models.PositiveIntegerField(default=0,
+        help_text="The number of strings saved so far.")
+    strings_added = models.PositiveIntegerField(default=0)
+    strings_updated = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, null=True,
+        help_text="The reason the import failed.")
+
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+    last_update = models.DateTimeField(auto_now=True, editable=False)
+
+    def __unicode__(self):
+        return u'%s (%s): %s' % (self.resource, self.language,
+            self.get_status_display())
+
+    @property
+    def _progress_key(self):
+        return 'import_job.progress.%s' % self.id
+
+    @property
+    def finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    def set_phase(self, phase, **counters):
+        """Move the job to another phase of the import.
+
+        Any keyword arguments are set as the values of the fields of the job.
+        """
+        self.phase = phase
+        for field, value in counters.iteritems():
+            setattr(self, field, value)
+        if self.status == self.STATUS_PENDING:
+            self.status = self.STATUS_RUNNING
+        self.save()
+
+    def report_progress(self, processed):
+        """Record the number of strings processed so far."""
+        cache.set(self._progress_key, processed, 60 * 60 * 24)
+
+    def finish(self, strings_added, strings_updated):
+        """Mark the job as done and drop the uploaded content."""
+        self.strings_added = strings_added
+        self.strings_updated = strings_updated
+        self.strings_processed = self.strings_total
+        self._end(self.STATUS_DONE)
+
+    def fail(self, error):
+        """Mark the job as failed because of ``error``."""
+        self.error = error
+        self._end(self.STATUS_FAILED)
+
+    def _end(self, status):
+        self.status = status
+        self.phase = ''
+        self.content = None
+        self.save()
+        cache.delete(self._progress_key)
+
+    def as_dict(self):
+        """Return the status of the job as a dictionary."""
+        processed = self.strings_processed
+        if self.status == self.STATUS_RUNNING:
+            processed = cache.get(self._progress_key, processed)
+        return {
+            'id': self.id,
+            'status': self.get_status_display().lower(),
+            'phase': self.phase,
+            'strings_total': self.strings_total,
+            'strings_processed': processed,
+            'strings_added': self.strings_added,
+            'strings_updated': self.strings_updated,
+            'error': self.error,
+        }
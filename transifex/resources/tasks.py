@@ -83,3 +83,25 @@ def send_notices_for_resource_edited(resource, user):
     post_resource_save.send(
         sender=None, instance=resource, created=False, user=user
     )
+
+
+@task(name='process_import_job', ignore_result=True)
+def process_import_job(job_id):
+    """
+    Import the file of an import job.
+
+    Args:
+        job_id: The id of the ImportJob.
+    """
+    # The backends depend on the models, which import this module.
+    from transifex.resources.backends import run_import_job
+    ImportJob = get_model('resources', 'ImportJob')
+    try:
+        job = ImportJob.objects.select_related('resource').get(id=job_id)
+    except ImportJob.DoesNotExist:
+        logger.error("Import job %s does not exist." % job_id)
+        return
+    if job.status != ImportJob.STATUS_PENDING:
+        logger.warning("Import job %s has already run." % job_id)
+        return
+    run_import_job(job)
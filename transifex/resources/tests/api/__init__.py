@@ -12,7 +12,8 @@ from transifex.txcommon.tests.base import Users, TransactionNoticeTypes,\
                             TransactionUsers, TransactionBaseTestCase,\
                             BaseTestCase
 from transifex.txcommon.utils import log_skip_transaction_test
-from transifex.resources.models import Resource, RLStats, SourceEntity
+from transifex.resources.models import Resource, RLStats, SourceEntity, \
+        Translation, ReviewHistory
 from transifex.resources.api import (ResourceHandler,
         TranslationObjectsHandler, NoContentError, BadRequestError,
         ForbiddenError, NotFoundError)
@@ -1247,6 +1248,98 @@ class SystemTestTranslationStrings(BaseTestCase):
             args=['project1', 'resource1', self.language_ar.code]))
         self.assertEqual(response.status_code, 200)
 
+    def test_read_translations_paginated(self):
+        se_ids = [self.source_entity.id]
+        for i in range(2):
+            se = SourceEntity.objects.create(string='Paginated %s' % i,
+                context='None', resource=self.resource)
+            se.translations.create(string='Paginated %s' % i,
+                language=self.language_ar, rule=5, resource=self.resource)
+            se_ids.append(se.id)
+        url = reverse('translation_strings',
+            args=['project1', 'resource1', self.language_ar.code])
+
+        response = self.client['team_member'].get(url, {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        page = simplejson.loads(response.content)
+        self.assertEqual(len(page['translations']), 2)
+        self.assertEqual(page['next'], se_ids[1])
+
+        response = self.client['team_member'].get(url,
+            {'limit': 2, 'after': page['next']})
+        self.assertEqual(response.status_code, 200)
+        page = simplejson.loads(response.content)
+        self.assertEqual(len(page['translations']), 1)
+        self.assertEqual(page['translations'][0]['key'], 'Paginated 1')
+        self.assertEqual(page['next'], None)
+
+        for params in ({'limit': 0}, {'limit': 'a'}, {'limit': 1, 'after': 'a'}):
+            response = self.client['team_member'].get(url, params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_review_translations(self):
+        url = reverse('translation_review',
+            args=['project1', 'resource1', self.language_ar.code])
+        data = simplejson.dumps({
+            'reviewed': [self.source_entity.string_hash]
+        })
+        response = self.client['team_member'].put(url, data=data,
+            content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+        response = self.client['maintainer'].put(url, data=simplejson.dumps({}),
+            content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client['maintainer'].put(url, data=data,
+            content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(simplejson.loads(response.content),
+            {'reviewed': 1, 'unreviewed': 0})
+        self.assertTrue(Translation.objects.get(
+            id=self.translation_ar.id).reviewed)
+        self.assertEqual(ReviewHistory.objects.filter(
+            translation_id=self.translation_ar.id, action='R').count(), 1)
+        rl = RLStats.objects.get(resource=self.resource,
+            language=self.language_ar)
+        self.assertEqual(rl.reviewed, 1)
+
+        response = self.client['maintainer'].put(url, data=simplejson.dumps({
+            'unreviewed': [self.source_entity.string_hash]
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        rl = RLStats.objects.get(resource=self.resource,
+            language=self.language_ar)
+        self.assertEqual(rl.reviewed, 0)
+
+    def test_clone_translations(self):
+        url = reverse('translation_clone',
+            args=['project1', 'resource1', self.language.code])
+        data = simplejson.dumps({'source_language': self.language_ar.code})
+        response = self.client['anonymous'].post(url, data=data,
+            content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        response = self.client['maintainer'].post(url,
+            data=simplejson.dumps({'source_language': 'foo'}),
+            content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client['maintainer'].post(url, data=data,
+            content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(simplejson.loads(response.content),
+            {'strings_added': 1})
+        self.assertEqual(Translation.objects.get(
+            source_entity=self.source_entity, language=self.language).string,
+            self.translation_ar.string)
+        rl = RLStats.objects.get(resource=self.resource,
+            language=self.language)
+        self.assertEqual(rl.translated, 1)
+
+        response = self.client['maintainer'].post(reverse('translation_clone',
+            args=['project1', 'resource1', self.language_en.code]),
+            data=data, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
 
 class SystemTestPutTranslationStrings(TransactionBaseTestCase):
     """Test updating translation strings"""
@@ -4,13 +4,18 @@ from __future__ import with_statement
 import os
 from mock import patch, Mock
 from django.conf import settings
+from django.core.cache import get_cache
 from django.test import TransactionTestCase
 from transifex.projects.models import Project
 from transifex.txcommon.tests.base import TransactionLanguages, \
         TransactionUsers, TransactionNoticeTypes
 from transifex.languages.models import Language
-from transifex.resources.models import Resource, SourceEntity, Translation
+from transifex.resources.models import Resource, SourceEntity, Translation, \
+        ImportJob
 from transifex.resources.backends import *
+from transifex.resources.cache import CompiledTranslationCache
+from transifex.resources.handlers import invalidate_stats_cache
+from transifex.resources.tasks import process_import_job
 
 
 class TestBackend(TransactionUsers, TransactionLanguages,
@@ -50,6 +55,80 @@ class TestResourceBackend(TestBackend):
         self.assertEquals(res[0], 6)
         self.assertEquals(res[1], 0)
 
+    def test_create_with_import_job(self):
+        rb = ResourceBackend()
+        job = rb.create(
+            self.project, slug='test1', name='Test', method=self.method,
+            source_language=self.source_lang, content=self.content,
+            user=self.maintainer, async_import=True
+        )
+        self.assertEquals(job.status, ImportJob.STATUS_DONE)
+        self.assertTrue(job.is_source)
+        self.assertEquals(job.strings_added, 6)
+        self.assertEquals(SourceEntity.objects.filter(
+            resource__slug='test1', resource__project=self.project
+        ).count(), 6)
+
+
+class TestImportJobs(TestBackend):
+
+    def test_import_job(self):
+        """Test that jobs run at once, if ASYNC_IMPORTS is not set."""
+        start_import_job(self.resource, self.source_lang, self.maintainer,
+            self.content, is_source=True)
+        job = start_import_job(self.resource, self.target_lang,
+            self.maintainer, self.content)
+        job = ImportJob.objects.get(id=job.id)
+        self.assertEquals(job.status, ImportJob.STATUS_DONE)
+        self.assertEquals(job.strings_total, 7)
+        self.assertEquals(job.strings_processed, 7)
+        self.assertEquals(job.strings_added, 6)
+        self.assertEquals(job.content, None)
+        self.assertEquals(job.as_dict()['status'], 'done')
+
+        job = start_import_job(self.resource, self.target_lang,
+            self.maintainer, 'invalid content')
+        self.assertEquals(job.status, ImportJob.STATUS_FAILED)
+        self.assertTrue(job.error)
+
+    def test_queued_import_job(self):
+        """Test that jobs are queued and run by the celery task."""
+        with patch.object(settings, 'ASYNC_IMPORTS', True):
+            with patch.object(process_import_job, 'delay') as delay:
+                job = start_import_job(self.resource, self.source_lang,
+                    self.maintainer, self.content, is_source=True,
+                    filename='source.po')
+                delay.assert_called_once_with(job.id)
+        job = ImportJob.objects.get(id=job.id)
+        self.assertEquals(job.status, ImportJob.STATUS_PENDING)
+        self.assertEquals(job.content, self.content)
+        self.assertEquals(job.as_dict()['strings_processed'], 0)
+
+        process_import_job(job.id)
+        job = ImportJob.objects.get(id=job.id)
+        self.assertEquals(job.status, ImportJob.STATUS_DONE)
+        self.assertEquals(job.strings_added, 6)
+        # Finished jobs are not run again
+        process_import_job(job.id)
+        self.assertEquals(SourceEntity.objects.filter(
+            resource=self.resource).count(), 6)
+
+    def test_import_job_progress(self):
+        """Test the progress of running jobs."""
+        locmem = get_cache('django.core.cache.backends.locmem.LocMemCache')
+        job = ImportJob.objects.create(resource=self.resource,
+            language=self.source_lang, is_source=True, content=self.content)
+        with patch('transifex.resources.models.cache', locmem):
+            job.set_phase('saving', strings_total=7)
+            job.report_progress(5)
+            progress = ImportJob.objects.get(id=job.id).as_dict()
+            self.assertEquals(progress['status'], 'running')
+            self.assertEquals(progress['phase'], 'saving')
+            self.assertEquals(progress['strings_processed'], 5)
+            job.finish(7, 0)
+            self.assertEquals(job.as_dict()['strings_processed'], 7)
+            self.assertEquals(locmem.get(job._progress_key), None)
+
 
 class TestFormatsBackend(TestBackend):
 
@@ -172,3 +251,61 @@ class TestFormatsBackend(TestBackend):
                 fb = FormatsBackend(resource, lang, None)
                 self.assertRaises(FormatsBackendError, fb.import_source, '')
 
+
+    def test_compiled_translations_cache(self):
+        """Test that compiled files are cached until the translations
+        change.
+        """
+        fb = FormatsBackend(self.resource, self.source_lang, self.maintainer)
+        fb.import_source(self.content, self.method)
+        fb = FormatsBackend(self.resource, self.target_lang, self.maintainer)
+        fb.import_translation(self.content)
+
+        locmem = get_cache('django.core.cache.backends.locmem.LocMemCache')
+        compiled_translations.clear()
+        with patch('transifex.resources.cache.cache', locmem):
+            content = fb.compile_translation()
+            self.assertEquals(fb.compile_translation(), content)
+            fb.compile_translation(mode=Mode.REVIEWED)
+            stats = compiled_translations.stats()
+            self.assertEquals(stats['hits'], 1)
+            self.assertEquals(stats['misses'], 2)
+
+            # A new translation must invalidate the cached files
+            fb.import_translation(self.content.replace(
+                'msgstr "Ação"', 'msgstr "Ação nova"'
+            ))
+            fb.compile_translation()
+            self.assertEquals(compiled_translations.stats()['misses'], 3)
+
+            # Changes in the source language invalidate all languages
+            invalidate_stats_cache(self.resource, self.source_lang)
+            fb.compile_translation()
+            self.assertEquals(compiled_translations.stats()['misses'], 4)
+        compiled_translations.clear()
+
+    def test_compiled_translations_cache_eviction(self):
+        """Test that the least recently used files are evicted, when the
+        cache is full.
+        """
+        locmem = get_cache('django.core.cache.backends.locmem.LocMemCache')
+        c = CompiledTranslationCache(10)
+        with patch('transifex.resources.cache.cache', locmem):
+            for mode, content in ((Mode.DEFAULT, 'aaaa'),
+                    (Mode.TRANSLATED, 'bbbb'), (Mode.DEFAULT, 'xxxx'),
+                    (Mode.REVIEWED, 'cccc')):
+                self.assertEquals(c.get_or_compile(self.resource,
+                    self.target_lang, mode, None, lambda: content),
+                    mode is Mode.DEFAULT and 'aaaa' or content)
+            stats = c.stats()
+            self.assertEquals(stats['hits'], 1)
+            self.assertEquals(stats['entries'], 2)
+            self.assertEquals(stats['size'], 8)
+            self.assertEquals(c.get_or_compile(self.resource,
+                self.target_lang, Mode.DEFAULT, None, lambda: 'new'), 'aaaa')
+            self.assertEquals(c.get_or_compile(self.resource,
+                self.target_lang, Mode.TRANSLATED, None, lambda: 'new'), 'new')
+            # Files bigger than the cache are not stored
+            c.get_or_compile(self.resource, self.target_lang,
+                Mode.REVIEWED, None, lambda: 'x' * 11)
+            self.assertEquals(c.stats()['size'], 7)
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from hashlib import md5
 from django.utils import unittest
+from transifex.resources.formats.utils.hash_tag import hash_offsets, \
+        split_by_hash, substitute_hashes
 from transifex.resources.formats.compilation.compilers import Compiler, \
         PluralCompiler
 
@@ -36,3 +39,53 @@ class TestPluralCompiler(unittest.TestCase):
         res = compiler._apply_translations(translations, text)
         self.assertEquals(res, 'normal plural')
 
+
+class TestTemplateSegments(unittest.TestCase):
+    """Test compiling templates split to their segments."""
+
+    def test_split_by_hash(self):
+        """Test splitting a template to literals and hashes."""
+        hash_normal = '1' * 32 + '_tr'
+        hash_plural = '2' * 32 + '_pl_0'
+        literals, hashes = split_by_hash(
+            u'a%s b %s%s' % (hash_normal, hash_plural, hash_normal)
+        )
+        self.assertEquals(literals, [u'a', u' b ', u'', u''])
+        self.assertEquals(hashes, [hash_normal, hash_plural, hash_normal])
+        self.assertEquals(split_by_hash(u''), ([u''], []))
+
+    def test_hash_offsets(self):
+        """Test splitting a template at the stored offsets of its hashes."""
+        hashes = [md5(str(i)).hexdigest() + '_tr' for i in xrange(3)]
+        template = u''.join(
+            u'<message><source>Σ %s</source>'
+            u'<translation>%s</translation></message>\n' % (i, h)
+            for i, h in enumerate(hashes)
+        )
+        offsets = hash_offsets(template)
+        self.assertEquals(len(offsets), 2 * len(hashes))
+        self.assertEquals(
+            split_by_hash(template, offsets), split_by_hash(template)
+        )
+
+    def test_apply_translations_with_offsets(self):
+        """Test that the offsets are only used for the unchanged template."""
+        hashes = [md5(str(i)).hexdigest() + '_tr' for i in xrange(3)]
+        template = u'a %s b %s c %s' % tuple(hashes)
+        # The last string is left untranslated
+        translations = {hashes[0]: u'A', hashes[1]: u'B'}
+        expected = u'a A b B c %s' % hashes[2]
+        compiler = Compiler(resource=None)
+        compiler._template = template
+        compiler._offsets = hash_offsets(template)
+        self.assertEquals(
+            compiler._apply_translations(translations, template), expected
+        )
+        changed = u'x' + template
+        self.assertEquals(
+            compiler._apply_translations(translations, changed),
+            u'x' + expected
+        )
+        self.assertEquals(
+            substitute_hashes(split_by_hash(template), translations), expected
+        )
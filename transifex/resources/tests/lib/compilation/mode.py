@@ -31,3 +31,9 @@ class TestCompilationModes(unittest.TestCase):
         m = Mode.DEFAULT
         self.assertNotIn(Mode.TRANSLATED, m)
         self.assertNotIn(Mode.REVIEWED, m)
+        self.assertNotIn(Mode.SKIPPED, m)
+
+        m = Mode.SKIPPED
+        self.assertIn(Mode.SKIPPED, m)
+        self.assertNotIn(Mode.TRANSLATED, m)
+        self.assertNotIn(Mode.REVIEWED, m)
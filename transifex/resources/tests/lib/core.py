@@ -7,9 +7,10 @@ from django.conf import settings
 from transifex.txcommon.tests.base import TransactionUsers,\
         TransactionLanguages
 from transifex.projects.models import Project
-from transifex.resources.models import Resource, SourceEntity
+from transifex.resources.models import Resource, SourceEntity, Translation
 from transifex.languages.models import Language
 from transifex.resources.formats.joomla import JoomlaINIHandler
+from transifex.resources.formats.pofile import POHandler
 from transifex.resources.formats.core import Handler
 from transifex.resources.formats.compilation import mode
 
@@ -44,6 +45,124 @@ class TestCoreFunctions(TransactionUsers, TransactionLanguages,
         self.assertEquals(SourceEntity.objects.filter(resource=r).count(), 2)
         settings.MAX_STRING_ITERATIONS = old_max_iters
 
+    def test_chunked_source_import(self):
+        """Test that importing a source file in chunks gives the same
+        results as importing it at once.
+        """
+        old_chunk_size = settings.SOURCE_IMPORT_CHUNK_SIZE
+        settings.SOURCE_IMPORT_CHUNK_SIZE = 2
+        content = ';1.6\nKEY1="value1"\nKEY2="value2"\nKEY3="value3"\n' \
+                'KEY4="value4"\nKEY5="value5"\n'
+        parser = JoomlaINIHandler()
+        parser.bind_content(content)
+        p = Project.objects.create(slug="pr", name="Pr", source_language=self.language_en)
+        l = self.language_en
+        r = Resource.objects.create(
+            slug="core", name="Core", project=p, source_language=l
+        )
+        parser.bind_resource(r)
+        parser.set_language(l)
+        parser.parse_file(is_source=True)
+        self.assertEquals(parser.save2db(is_source=True), (5, 0))
+        self.assertEquals(SourceEntity.objects.filter(resource=r).count(), 5)
+        self.assertEquals(Translation.objects.filter(
+            resource=r, language=l).count(), 5)
+        self.assertTrue(parser.import_report['peak_memory'] > 0)
+        self.assertEquals(parser.import_report['phases'].keys(),
+            ['load', 'source entities', 'translations', 'suggestions',
+             'delete'])
+
+        content = ';1.6\nKEY1="value1"\nKEY2="changed"\nKEY4="value4"\n' \
+                'KEY6="value6"\n'
+        parser.bind_content(content)
+        parser.parse_file(is_source=True)
+        self.assertEquals(parser.save2db(is_source=True), (1, 1))
+        self.assertEquals(
+            sorted(SourceEntity.objects.filter(
+                resource=r).values_list('string', flat=True)),
+            ['KEY1', 'KEY2', 'KEY4', 'KEY6']
+        )
+        self.assertEquals(Translation.objects.get(
+            resource=r, language=l, source_entity__string='KEY2').string,
+            'changed')
+        settings.SOURCE_IMPORT_CHUNK_SIZE = old_chunk_size
+
+    def test_validate_translations(self):
+        """Test validating the translations of an uploaded file."""
+        p = Project.objects.create(slug="pr", name="Pr", source_language=self.language_en)
+        r = Resource.objects.create(
+            slug="core", name="Core", project=p, i18n_type='INI',
+            source_language=self.language_en
+        )
+        parser = JoomlaINIHandler()
+        parser.bind_content(
+            ';1.6\nKEY1="value %s"\nKEY2="value 1"\nKEY3="value3"\n'
+        )
+        parser.bind_resource(r)
+        parser.set_language(self.language_en)
+        parser.parse_file(is_source=True)
+        parser.save2db(is_source=True)
+        self.assertEquals(parser.validation_report, None)
+
+        parser = JoomlaINIHandler()
+        parser.bind_content(
+            ';1.6\nKEY1="valor"\nKEY2="valor"\nKEY3="valor3"\n'
+        )
+        parser.bind_resource(r)
+        parser.set_language(self.language)
+        parser.parse_file(is_source=False)
+        parser.save2db(is_source=False, validate=True)
+        self.assertEquals(
+            sorted(Translation.objects.filter(resource=r,
+                language=self.language).values_list('string', flat=True)),
+            ['valor', 'valor3']
+        )
+        report = parser.validation_report
+        self.assertEquals([e['key'] for e in report], ['KEY1', 'KEY2'])
+        self.assertTrue(report[0]['error'] is not None)
+        self.assertEquals(report[1]['error'], None)
+        self.assertEquals(len(report[1]['warnings']), 1)
+
+    def test_validate_plural_translations(self):
+        """Test that no plural form is saved, if one of them is invalid."""
+        p = Project.objects.create(slug="pr", name="Pr", source_language=self.language_en)
+        r = Resource.objects.create(
+            slug="core", name="Core", project=p, i18n_type='PO',
+            source_language=self.language_en
+        )
+        header = (
+            'msgid ""\nmsgstr ""\n'
+            '"Content-Type: text/plain; charset=UTF-8\\n"\n'
+            '"Plural-Forms: nplurals=2; plural=(n != 1);\\n"\n\n'
+        )
+        parser = POHandler()
+        parser.bind_content(header +
+            'msgid "%d file"\nmsgid_plural "%d files"\n'
+            'msgstr[0] ""\nmsgstr[1] ""\n\n'
+            'msgid "Folder"\nmsgstr ""\n'
+        )
+        parser.bind_resource(r)
+        parser.set_language(self.language_en)
+        parser.parse_file(is_source=True)
+        parser.save2db(is_source=True)
+
+        # The plural form of the first string lacks its %d
+        parser = POHandler()
+        parser.bind_content(header +
+            'msgid "%d file"\nmsgid_plural "%d files"\n'
+            'msgstr[0] "%d arquivo"\nmsgstr[1] "arquivos"\n\n'
+            'msgid "Folder"\nmsgstr "Pasta"\n'
+        )
+        parser.bind_resource(r)
+        parser.set_language(self.language)
+        parser.parse_file(is_source=False)
+        parser.save2db(is_source=False, validate=True)
+        self.assertEquals(
+            list(Translation.objects.filter(resource=r,
+                language=self.language).values_list('string', flat=True)),
+            ['Pasta']
+        )
+
 
 class TestMode(TestCase):
     """Test the mode variable used in compilation."""
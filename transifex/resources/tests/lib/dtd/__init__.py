@@ -7,6 +7,7 @@ from transifex.txcommon.tests.base import BaseTestCase
 from transifex.languages.models import Language
 from transifex.resources.models import *
 from transifex.resources.formats.dtd import DTDHandler, DTDParseError
+from transifex.resources.formats.compilation import Mode
 
 class TestDTDHandler(BaseTestCase):
     """Suite of tests for the .DTD files."""
@@ -144,3 +145,35 @@ class TestDTDHandler(BaseTestCase):
         f.close()
         self.assertEqual(compiled_template, expected_compiled_template)
         r.delete()
+
+    def test_compile_skipped(self):
+        """Test that only the translated strings are compiled in the
+        skipped mode."""
+        handler = DTDHandler(
+            os.path.join(os.path.dirname(__file__), 'aboutRobots.dtd')
+        )
+        r = self.resource
+        handler.set_language(r.source_language)
+        handler.bind_resource(r)
+        handler.parse_file(is_source=True)
+        handler.save2db(is_source=True)
+        handler.bind_file(
+            os.path.join(os.path.dirname(__file__), 'aboutRobots_uk.dtd')
+        )
+        l_uk = Language.objects.get(code='uk')
+        handler.set_language(l_uk)
+        handler.parse_file()
+        handler.save2db()
+
+        compiled = handler.compile(mode=Mode.SKIPPED).decode('UTF-8')
+        lines = [l for l in compiled.split('\n') if l.startswith('<!ENTITY')]
+        self.assertEqual(lines, [
+            u'<!ENTITY robots.pagetitle "Ґорт! Клаату барада ніхто!">',
+            u'<!ENTITY robots.errorTitleText "Привіт людинам!">',
+            u'<!ENTITY robots.errorShortDescText "Ми прийшли до вас з миром!">',
+            u'<!ENTITY robots.optional "">',
+        ])
+        self.assertIn(u"<!--", compiled)
+        self.assertNotIn(u"robots.specialChars", compiled)
+        self.assertTrue(compiled.endswith(u'\n'))
+        r.delete()
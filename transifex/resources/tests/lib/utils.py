@@ -5,7 +5,8 @@ Tests for the utils module.
 """
 
 from django.utils import unittest
-from transifex.resources.formats.utils.string_utils import split_by_newline
+from transifex.resources.formats.utils.string_utils import split_by_newline, \
+        FuzzyIndex, percent_diff
 
 
 class TestSplitNewlines(unittest.TestCase):
@@ -45,3 +46,37 @@ class TestSplitNewlines(unittest.TestCase):
         expected_pos = [2, 4, 6, -1]
         for res, expected in zip(split_by_newline(text), expected_pos):
             self.assertEqual(res[0], expected)
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    """Test the FuzzyIndex class."""
+
+    strings = [
+        'Hello, world!', 'Hello, world', 'Goodbye, world!',
+        'This is a longer sentence with some words in it.',
+        'This is a longer sentence with some word in it.',
+        'a', '',
+    ]
+
+    def test_same_as_brute_force(self):
+        """Test that the index finds the same strings as comparing all
+        pairs.
+        """
+        for max_diff in (0, 10, 30, 100):
+            index = FuzzyIndex(self.strings, max_diff)
+            for text in self.strings + ['Hello world!', 'b', 'irrelevant']:
+                expected = [
+                    i for i, s in enumerate(self.strings)
+                    if percent_diff(text, s) < max_diff
+                ]
+                self.assertTrue(set(expected) <= set(index.candidates(text)))
+                first = expected[0] if expected else None
+                self.assertEqual(index.match(text), first)
+
+    def test_prefilter(self):
+        """Test that dissimilar strings are not compared at all."""
+        index = FuzzyIndex(self.strings, 10)
+        text = 'This is a longer sentence with many words in it.'
+        self.assertEqual(index.candidates(text), [3, 4])
+        self.assertEqual(index.match(text), 3)
+        self.assertEqual(index.comparisons, 1)
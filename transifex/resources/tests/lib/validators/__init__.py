@@ -221,3 +221,41 @@ class TestValidators(TestCase):
         v.rule = 1
         new = "apple"
         v(old, new)
+
+    def test_validator_chains(self):
+
+        class Language(object):
+            nplurals = 2
+
+        sl, tl = Language(), Language()
+        chain = error_validator_chain('PO')
+        self.assertTrue(chain is error_validator_chain('PO'))
+        self.assertFalse(chain is warning_validator_chain('PO'))
+        self.assertEqual(chain.classes, list(create_error_validators('PO')))
+        validators = chain.validators(sl, tl, 5)
+        self.assertTrue(validators is chain.validators(sl, tl, 5))
+        self.assertFalse(validators is chain.validators(sl, tl, 1))
+
+        chain(sl, tl, 5, "%s apples", "%s apples")
+        self.assertRaises(ValidationError, chain, sl, tl, 5,
+            "%s apples", "apples")
+        self.assertEqual(len(warning_validator_chain('PO').messages(
+            sl, tl, 5, "1 (apple)", "apple")), 2)
+
+    def test_validate_many(self):
+
+        class Language(object):
+            nplurals = 2
+
+        sl, tl = Language(), Language()
+        results = validate_many('PO', sl, tl, [
+            (5, "%s apples", "%s apples"),
+            (5, "%s apples", "apples"),
+            (5, "2 apples", "apples"),
+            (5, "apples", ""),
+        ])
+        self.assertEqual(results[0], (None, []))
+        self.assertTrue(results[1][0] is not None)
+        self.assertEqual(results[2][0], None)
+        self.assertEqual(len(results[2][1]), 1)
+        self.assertEqual(results[3], (None, []))
@@ -2,6 +2,7 @@
 from django.db import IntegrityError
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from django.db.models import get_model
 from django.test import TestCase
 from django.utils.hashcompat import md5_constructor
 from hashlib import md5
@@ -168,6 +169,131 @@ class ResourcesModelTests(BaseTestCase):
         self.assertRaises(IntegrityError, s_error.save)
 
 
+    def test_delete_source_entities_by_ids(self):
+        """Test deleting source entities along with their related objects."""
+        Suggestion = get_model('suggestions', 'Suggestion')
+        Suggestion.objects.create(string='A suggestion',
+            source_entity=self.source_entity, language=self.language_ar)
+        se_ids = [self.source_entity.id, self.source_entity_plural.id]
+        deleted = SourceEntity.objects.delete_by_ids(se_ids, batch_size=1)
+        self.assertEqual(deleted, 2)
+        self.assertFalse(SourceEntity.objects.filter(id__in=se_ids).exists())
+        self.assertFalse(Translation.objects.filter(
+            source_entity__id__in=se_ids).exists())
+        self.assertFalse(Suggestion.objects.filter(
+            source_entity__id__in=se_ids).exists())
+        # Other resources are not affected
+        self.assertTrue(SourceEntity.objects.filter(
+            resource=self.resource_private).exists())
+
+    def test_source_strings_filters(self):
+        """Test filtering the source strings by their translations."""
+        se = SourceEntity.objects.create(string='String2',
+            context='Context2', resource=self.resource)
+        source = se.translations.create(string='String2', rule=5,
+            language=self.language_en, resource=self.resource)
+        resources = [self.resource]
+        ids = lambda qs: sorted(qs.values_list('id', flat=True))
+
+        self.assertEqual(ids(Translation.objects.translated_source_strings(
+            resources, self.language_ar)), [self.translation_en.id])
+        self.assertEqual(ids(Translation.objects.untranslated_source_strings(
+            resources, self.language_ar)), [source.id])
+        self.assertEqual(ids(Translation.objects.reviewed_source_strings(
+            resources, self.language_ar)), [])
+        self.assertEqual(ids(Translation.objects.unreviewed_source_strings(
+            resources, self.language_ar)), [self.translation_en.id])
+        self.assertEqual(ids(Translation.objects.user_translated_strings(
+            resources, self.language_ar, [self.user['registered'].id])),
+            [self.translation_en.id])
+        self.assertEqual(ids(Translation.objects.user_translated_strings(
+            resources, self.language_ar, [self.user['maintainer'].id])), [])
+
+        self.translation_ar.reviewed = True
+        self.translation_ar.save()
+        reviewed = Translation.objects.reviewed_source_strings(
+            resources, self.language_ar)
+        self.assertEqual(ids(reviewed), [self.translation_en.id])
+        self.assertEqual(ids(Translation.objects.unreviewed_source_strings(
+            resources, self.language_ar)), [])
+        untranslated = Translation.objects.untranslated_source_strings(
+            resources, self.language_ar)
+        self.assertEqual(ids(untranslated | reviewed),
+            sorted([self.translation_en.id, source.id]))
+
+    def test_set_reviewed(self):
+        """Test setting the reviewed flag of translations in bulk."""
+        user = self.user['maintainer']
+        se_ids = [self.source_entity.id]
+        delta = Translation.objects.set_reviewed(self.resource,
+            self.language_ar, se_ids, True, user)
+        self.assertEqual(delta.reviewed, 1)
+        self.assertTrue(Translation.objects.get(
+            id=self.translation_ar.id).reviewed)
+        history = ReviewHistory.objects.filter(
+            translation_id=self.translation_ar.id)
+        self.assertEqual(history.count(), 1)
+        self.assertEqual(history[0].action, 'R')
+        self.assertEqual(history[0].username, user.username)
+        self.assertEqual(history[0].string, self.translation_ar.string)
+        self.assertEqual(history[0].project_id, self.project.id)
+
+        # Reviewing again does not change the stats
+        delta = Translation.objects.set_reviewed(self.resource,
+            self.language_ar, se_ids, True, user)
+        self.assertEqual(delta.reviewed, 0)
+
+        delta = Translation.objects.set_reviewed(self.resource,
+            self.language_ar, se_ids, False, user)
+        self.assertEqual(delta.reviewed, -1)
+        self.assertFalse(Translation.objects.get(
+            id=self.translation_ar.id).reviewed)
+        self.assertEqual(ReviewHistory.objects.filter(
+            translation_id=self.translation_ar.id, action='U').count(), 1)
+        self.assertEqual(Translation.objects.set_reviewed(self.resource,
+            self.language_ar, [], True, user).reviewed, 0)
+
+    def test_clone_language(self):
+        """Test copying the translations of a language to another one."""
+        se = SourceEntity.objects.create(string='String2',
+            context='Context2', resource=self.resource)
+        se.translations.create(string='Two words', rule=5,
+            language=self.language_en, resource=self.resource)
+        for rule in (1, 5):
+            self.source_entity_plural.translations.create(
+                string='Plural %s' % rule, rule=rule,
+                language=self.language_en, resource=self.resource)
+
+        # The plural rules of Arabic differ, so the plural is not copied and
+        # the string already translated is left intact.
+        delta = Translation.objects.clone_language(self.resource,
+            self.language_en, self.language_ar, self.user['maintainer'])
+        self.assertEqual((delta.added, delta.wordcount), (1, 2))
+        cloned = Translation.objects.get(source_entity=se,
+            language=self.language_ar)
+        self.assertEqual(cloned.string, 'Two words')
+        self.assertEqual(cloned.string_hash, md5('Two words').hexdigest())
+        self.assertEqual(cloned.user, self.user['maintainer'])
+        self.assertFalse(cloned.reviewed)
+        self.assertEqual(Translation.objects.get(
+            id=self.translation_ar.id).string, self.translation_ar.string)
+        self.assertFalse(Translation.objects.filter(
+            source_entity=self.source_entity_plural,
+            language=self.language_ar).exists())
+
+        # The wordcount is that of the source strings
+        delta = Translation.objects.clone_language(self.resource,
+            self.language_ar, self.language)
+        self.assertEqual(delta.added, 2)
+        self.assertEqual(delta.wordcount, 2 + self.translation_en.wordcount)
+        self.assertEqual(Translation.objects.get(
+            source_entity=self.source_entity, language=self.language).string,
+            self.translation_ar.string)
+
+        delta = Translation.objects.clone_language(self.resource,
+            self.language_ar, self.language)
+        self.assertFalse(delta)
+
     def test_wordcounts(self):
         """Test word counts in the model."""
         # Manually get the number of words in the English string, just in case
@@ -221,6 +347,23 @@ class RLStatsModelTests(BaseTestCase):
         self.assertEqual(len([f for f in q.for_user(self.user['maintainer']).by_project_aggregated(self.project)]), 1)
         self.assertEqual(len([f for f in q.for_user(self.user['registered']).by_project_aggregated(self.project_private)]), 0)
 
+    def test_recount_resource(self):
+        """Test that the grouped recount matches the per language one."""
+        self.create_more_entities()
+        self.translation_ar.reviewed = True
+        self.translation_ar.save()
+        rlstats = RLStats.objects.recount_resource(self.resource)
+        self.assertEqual(len(rlstats), 3)
+        for rl in rlstats:
+            stored = RLStats.objects.get(pk=rl.pk)
+            expected = RLStats.objects.get(pk=rl.pk)
+            expected.recount()
+            for field in ('translated', 'untranslated', 'reviewed',
+                    'translated_wordcount', 'translated_perc',
+                    'reviewed_perc'):
+                self.assertEqual(getattr(stored, field),
+                                 getattr(expected, field))
+
 
 class RLStatsModelWordsTests(BaseTestCase):
     """Test the word support of the RLStats model."""
@@ -255,3 +398,138 @@ class RLStatsModelWordsTests(BaseTestCase):
         # untranslated English string; in this case it's just the new string
         self.assertEqual(rls_ar.untranslated_wordcount, self.translation_en2.wordcount)
 
+
+
+class RLStatsDeltaTests(BaseTestCase):
+    """Test the incremental updates of the RLStats model."""
+
+    def setUp(self):
+        super(RLStatsDeltaTests, self).setUp()
+        self.create_more_entities()
+        self.rls_ar = RLStats.objects.get(resource=self.resource,
+            language=self.language_ar)
+        self.rls_ar.update()
+
+    def _assertEqualToRecount(self, rls):
+        """Check that the stored counters match a full recount."""
+        stored = RLStats.objects.get(pk=rls.pk)
+        expected = RLStats.objects.get(pk=rls.pk)
+        expected.recount()
+        for field in ('translated', 'untranslated', 'reviewed',
+                'translated_wordcount', 'translated_perc', 'reviewed_perc'):
+            self.assertEqual(getattr(stored, field), getattr(expected, field))
+            self.assertEqual(getattr(rls, field), getattr(expected, field))
+
+    def test_add_translation(self):
+        """Test applying the delta of a new reviewed translation."""
+        Translation.objects.create(
+            string=u'Arabic string 2', rule=5, reviewed=True,
+            source_entity=self.source_entity2, resource=self.resource,
+            language=self.language_ar, user=self.user['registered']
+        )
+        wordcount = Translation.objects.source_wordcount(
+            self.resource, [self.source_entity2.id]
+        )
+        self.assertEqual(wordcount, self.translation_en2.wordcount)
+        self.rls_ar.apply_delta(
+            StatsDelta(added=1, reviewed=1, wordcount=wordcount),
+            user=self.user['registered']
+        )
+        self._assertEqualToRecount(self.rls_ar)
+        self.assertEqual(self.rls_ar.last_committer, self.user['registered'])
+
+    def test_remove_translation(self):
+        """Test applying the delta of a deleted translation."""
+        wordcount = Translation.objects.source_wordcount(
+            self.resource, [self.source_entity.id]
+        )
+        self.translation_ar.delete()
+        self.rls_ar.apply_delta(StatsDelta(removed=1, wordcount=-wordcount))
+        self._assertEqualToRecount(self.rls_ar)
+        self.assertEqual(self.rls_ar.translated, 0)
+
+    def test_empty_delta(self):
+        """Test that an empty delta leaves the counters intact."""
+        self.assertFalse(StatsDelta())
+        translated = self.rls_ar.translated
+        self.rls_ar.apply_delta(StatsDelta())
+        self.assertEqual(self.rls_ar.translated, translated)
+        self._assertEqualToRecount(self.rls_ar)
+
+
+class TemplateModelTests(BaseTestCase):
+
+    def test_content_storage(self):
+        """Test that the content is stored compressed and read back."""
+        content = u'<message>%s</message>' % u'Ελληνικά' * 100
+        t, created = Template.objects.get_or_create(resource=self.resource)
+        t.content = content
+        t.save()
+        t = Template.objects.get(id=t.id)
+        self.assertEquals(t.legacy_content, None)
+        self.assertTrue(len(t._content_data_raw) < len(content))
+        self.assertEquals(t.content, content.encode('UTF-8'))
+
+    def test_migrate_legacy_content(self):
+        """Test the migration of templates stored in the old column."""
+        from django.core.management import call_command
+        content = SAMPLE_BIG_TEXT + '1' * 32 + '_tr'
+        t, created = Template.objects.get_or_create(resource=self.resource)
+        t.content_data = None
+        t.legacy_content = content
+        t.save()
+        t = Template.objects.get(id=t.id)
+        self.assertEquals(t.content, content)
+
+        call_command('txmigratetemplates', verbosity=0, batch_size=1)
+        t = Template.objects.get(id=t.id)
+        self.assertEquals(t.legacy_content, None)
+        self.assertEquals(t.content_data, content)
+        self.assertEquals(list(t.get_hash_offsets()),
+            [len(SAMPLE_BIG_TEXT), len(content)])
+
+    def test_hash_offsets(self):
+        """Test that the offsets of the hashes are stored with the content."""
+        string_hash = '1' * 32 + '_tr'
+        content = u'<message>Ελληνικά %s</message>' % string_hash
+        t, created = Template.objects.get_or_create(resource=self.resource)
+        t.content = content
+        t.save()
+        t = Template.objects.get(id=t.id)
+        start = content.index(string_hash)
+        self.assertEquals(list(t.get_hash_offsets()),
+            [start, start + len(string_hash)])
+
+        # Templates stored before the offsets get them from the command
+        Template.objects.filter(id=t.id).update(hash_offsets=None)
+        t = Template.objects.get(id=t.id)
+        self.assertEquals(t.get_hash_offsets(), None)
+        from django.core.management import call_command
+        call_command('txmigratetemplates', verbosity=0)
+        t = Template.objects.get(id=t.id)
+        self.assertEquals(list(t.get_hash_offsets()),
+            [start, start + len(string_hash)])
+
+    def test_content_constructor_kwarg(self):
+        """Test that the content can be passed to the constructor."""
+        Template.objects.filter(resource=self.resource).delete()
+        t = Template.objects.create(resource=self.resource,
+            content_data=SAMPLE_BIG_TEXT)
+        t = Template.objects.get(id=t.id)
+        self.assertEquals(t.content_data, SAMPLE_BIG_TEXT)
+
+    def test_content_serialization(self):
+        """Test that the content survives a dump and load."""
+        from django.core import serializers
+        content = u'<message>%s</message>' % u'Ελληνικά'
+        t, created = Template.objects.get_or_create(resource=self.resource)
+        t.content = content
+        t.save()
+        for format in ('json', 'xml'):
+            dump = serializers.serialize(format, Template.objects.filter(
+                id=t.id))
+            Template.objects.filter(id=t.id).delete()
+            for obj in serializers.deserialize(format, dump):
+                obj.save()
+            t = Template.objects.get(id=t.id)
+            self.assertEquals(t.content, content.encode('UTF-8'))
@@ -2,7 +2,8 @@
 from django.conf.urls.defaults import *
 from transifex.resources.urls import RESOURCE_URL_PARTIAL, RESOURCE_LANG_URL_PARTIAL
 from transifex.resources.views import resource_actions, update_translation, \
-    lock_and_get_translation_file, resource_pseudo_translation_actions
+    lock_and_get_translation_file, resource_pseudo_translation_actions, \
+    import_job_status
 
 urlpatterns = patterns('',
     url(RESOURCE_URL_PARTIAL + r'l/(?P<target_lang_code>[\-_@\w\.]+)/actions/$',
@@ -11,6 +12,8 @@ urlpatterns = patterns('',
         update_translation, name='update_translation'),
     url(RESOURCE_URL_PARTIAL + r'add_translation/$',
         update_translation, name='add_translation'),
+    url(RESOURCE_URL_PARTIAL + r'import/(?P<job_id>\d+)/$',
+        import_job_status, name='import_job_status'),
     url(RESOURCE_LANG_URL_PARTIAL+'download/lock/$',
         lock_and_get_translation_file, name='lock_and_download_for_translation'),
     url(RESOURCE_URL_PARTIAL + r'pseudo_translation_actions/$',
@@ -6,7 +6,6 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.dispatch import Signal
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import transaction
 from django.db.models import Count, Q, get_model, F
 from django.http import (HttpResponseRedirect, HttpResponse, Http404,
                          HttpResponseForbidden, HttpResponseBadRequest)
@@ -30,12 +29,14 @@ from transifex.txcommon.decorators import one_perm_required_or_403
 from transifex.txcommon.log import logger
 
 from transifex.resources.forms import ResourceForm, ResourcePseudoTranslationForm
-from transifex.resources.models import Translation, Resource, RLStats
+from transifex.resources.models import Translation, Resource, RLStats, \
+    ImportJob
+from transifex.resources.cache import commit_on_success
 from transifex.resources.handlers import (invalidate_object_templates,
     invalidate_stats_cache)
 from transifex.resources.formats.registry import registry
 from transifex.resources.backends import FormatsBackend, FormatsBackendError, \
-        content_from_uploaded_file
+        content_from_uploaded_file, filename_of_uploaded_file, start_import_job
 from autofetch.forms import URLInfoForm
 from autofetch.models import URLInfo
 from .tasks import send_notices_for_resource_edited
@@ -199,7 +200,7 @@ def resource_edit(request, project_slug, resource_slug):
     }, context_instance=RequestContext(request))
 
 
-@transaction.commit_on_success
+@commit_on_success
 def save_source_file(resource, user, content, method, filename=None):
     """Save new source file.
 
@@ -351,25 +352,13 @@ def clone_language(request, project_slug=None, resource_slug=None,
     source_lang = get_object_or_404(Language, code=source_lang_code)
     target_lang = get_object_or_404(Language, code=target_lang_code)
 
-    # get the strings which will be cloned
-    strings = Translation.objects.filter(
-                resource = resource,
-                language = source_lang)
-
-    # If the language we want to create, has the same plural rules with the
-    # source, we also copy the pluralized translations!
-    if not source_lang.get_pluralrules() == target_lang.get_pluralrules():
-        strings = strings.exclude(source_entity__pluralized = True)
-
-    # clone them in new translation
-    for s in strings:
-        Translation.objects.get_or_create(
-            language=target_lang, string=s.string,
-            source_entity=s.source_entity, rule=s.rule,
-            resource=s.resource
+    try:
+        FormatsBackend(resource, target_lang, request.user).clone_translation(
+            source_lang
         )
+    except FormatsBackendError, e:
+        return HttpResponseBadRequest(unicode(e))
 
-    invalidate_stats_cache(resource, target_lang, user=request.user)
     return HttpResponseRedirect(reverse('translate_resource', args=[project_slug,
                                 resource_slug, target_lang_code]),)
 
@@ -561,13 +550,15 @@ def lock_and_get_translation_file(request, project_slug, resource_slug, lang_cod
 @one_perm_required_or_403(pr_project_private_perm,
     (Project, 'slug__exact', 'project_slug'), anonymous_access=False)
 def update_translation(request, project_slug, resource_slug, lang_code=None):
-    """Ajax view that gets an uploaded translation as a file and saves it.
+    """Ajax view that gets an uploaded translation as a file and imports it.
 
     If the language is not specified, the translation does not exist yet.
     Othewise, this is an update.
 
+    The file is imported by an import job (see ``start_import_job``).
+
     Returns:
-        Either an error message, or nothing for success.
+        Either an error message, or the status of the import job.
     """
     resource = get_object_or_404(
         Resource.objects.select_related('project'),
@@ -592,28 +583,58 @@ def update_translation(request, project_slug, resource_slug, lang_code=None):
             status=403, content_type='text/plain'
         )
 
-    content = content_from_uploaded_file(request.FILES)
-    try:
-        _save_translation(resource, target_language, request.user, content)
-    except FormatsBackendError, e:
-        return HttpResponse(
-            simplejson.dumps({
-                    'msg': unicode(e),
-                    'status': 400,
-            }),
-            status=400, content_type='text/plain'
-        )
+    job = start_import_job(
+        resource, target_language, request.user,
+        content_from_uploaded_file(request.FILES),
+        filename=filename_of_uploaded_file(request.FILES)
+    )
+    return _import_job_response(job)
+
+
+def _import_job_response(job):
+    """Return the response for an import job of an uploaded file.
+
+    Jobs which have not finished yet are accepted with status 202 and the
+    URL to poll for their status.
+    """
+    if job.status == job.STATUS_FAILED:
+        status = 400
+    elif job.status == job.STATUS_DONE:
+        status = 200
+    else:
+        status = 202
     return HttpResponse(
         simplejson.dumps({
-                'msg': "",
-                'status': 200,
+                'msg': job.error or "",
+                'status': status,
+                'job': job.as_dict(),
+                'url': reverse('import_job_status', args=[
+                    job.resource.project.slug, job.resource.slug, job.id
+                ]),
         }),
-        status=200, content_type='text/plain'
+        status=status, content_type='text/plain'
     )
 
 
-@transaction.commit_on_success
-def _save_translation(resource, target_language, user, content):
-    """Save a new translation file for the resource."""
-    fb = FormatsBackend(resource, target_language, user)
-    return fb.import_translation(content)
+@one_perm_required_or_403(pr_project_private_perm,
+    (Project, 'slug__exact', 'project_slug'), anonymous_access=False)
+def import_job_status(request, project_slug, resource_slug, job_id):
+    """Ajax view that returns the status of an import job.
+
+    Only the user who uploaded the file and the maintainers of the project
+    can see the status of a job.
+    """
+    job = get_object_or_404(ImportJob.objects.select_related('resource'),
+        id=job_id, resource__slug=resource_slug,
+        resource__project__slug=project_slug
+    )
+    check = ProjectPermission(request.user)
+    if job.user != request.user and not check.maintain(job.resource.project):
+        return HttpResponse(
+            simplejson.dumps({
+                    'msg': _("You are not allowed to see this import."),
+                    'status': 403,
+            }),
+            status=403, content_type='text/plain'
+        )
+    return _import_job_response(job)
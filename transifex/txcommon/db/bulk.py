@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk loading of model instances to the database.
+
+On PostgreSQL the records are streamed to the database with ``COPY ... FROM
+STDIN``, which is much faster than multi-row INSERT statements for big
+imports. Other databases fall back to ``djangobulk.insert_many``.
+"""
+
+import datetime
+from django.db import connections, router
+from django.db.models import AutoField
+from djangobulk.bulk import insert_many
+
+COPY_ENGINES = ('django.db.backends.postgresql_psycopg2', )
+
+# Characters that must be escaped in the text format of COPY
+_COPY_ESCAPES = (
+    ('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r'),
+)
+
+
+def supports_copy(connection):
+    """Check whether the database of the connection supports COPY."""
+    return connection.settings_dict['ENGINE'] in COPY_ENGINES
+
+
+def _copy_value(value):
+    """Convert a python value to its representation in the COPY text format.
+
+    Returns:
+        A str object.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return value and 't' or 'f'
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        value = value.isoformat()
+    if isinstance(value, unicode):
+        value = value.encode('UTF-8')
+    else:
+        value = str(value)
+    for char, escaped in _COPY_ESCAPES:
+        value = value.replace(char, escaped)
+    return value
+
+
+class CopyStream(object):
+    """A file-like object which generates the COPY data of some records
+    as it is being read, so that the whole payload is never kept in memory.
+    """
+
+    def __init__(self, model, records, connection):
+        self._fields = [
+            f for f in model._meta.local_fields if not isinstance(f, AutoField)
+        ]
+        self._lines = self._generate_lines(records, connection)
+        self._buffer = ''
+
+    @property
+    def columns(self):
+        """The columns the data are for, in order."""
+        return [f.column for f in self._fields]
+
+    def _generate_lines(self, records, connection):
+        for obj in records:
+            # Calculate hashes, wordcounts etc. just like save() does
+            if hasattr(obj, 'presave'):
+                obj.presave()
+            yield '\t'.join([
+                _copy_value(f.get_db_prep_save(
+                    f.pre_save(obj, True), connection=connection
+                )) for f in self._fields
+            ]) + '\n'
+
+    def readline(self, size=-1):
+        try:
+            return self._lines.next()
+        except StopIteration:
+            return ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = self.readline()
+            if not line:
+                break
+            self._buffer += line
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def copy_insert(model, records, connection):
+    """Insert the records with COPY FROM STDIN."""
+    qn = connection.ops.quote_name
+    stream = CopyStream(model, records, connection)
+    sql = "COPY %s (%s) FROM STDIN" % (
+        qn(model._meta.db_table), ', '.join(qn(c) for c in stream.columns)
+    )
+    connection.cursor().copy_expert(sql, stream)
+
+
+def bulk_insert(model, records):
+    """Bulk insert records of ``model`` to the database.
+
+    Uses COPY, if the database supports it, else multi-row INSERTs.
+    """
+    if not records:
+        return
+    connection = connections[router.db_for_write(model) or 'default']
+    if supports_copy(connection):
+        copy_insert(model, records, connection)
+    else:
+        insert_many(model, records)
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-import base64, datetime, re
+import base64, datetime, re, zlib
 from django import forms
 from django.conf import settings
 from django.db.models.signals import post_save
@@ -207,6 +207,110 @@ class CompressedTextField(models.TextField):
                 self.__class__.__name__,', '.join(db_types.keys()))
 
 
+class CompressedBinaryDescriptor(property):
+    """
+    Descriptor for CompressedBinaryField, which uncompresses the value only
+    the first time it is accessed.
+
+    It is a property, so that the model constructor accepts the field by its
+    name, e.g. ``Template(content_data=...)``.
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.cache_name = '_%s_cache' % field.name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return getattr(instance, self.cache_name)
+        except AttributeError:
+            value = self.field.uncompress(getattr(instance, self.field.attname))
+            setattr(instance, self.cache_name, value)
+            return value
+
+    def __set__(self, instance, value):
+        if isinstance(value, unicode):
+            value = value.encode('UTF-8')
+        setattr(instance, self.field.attname, self.field.compress(value))
+        setattr(instance, self.cache_name, value)
+
+
+class CompressedBinaryField(models.Field):
+    """
+    Store a string as raw zlib-compressed bytes in a binary column.
+
+    The compressed data are kept in the ``_<name>_raw`` attribute, just as
+    they are fetched from the db, and are only uncompressed when the field
+    is accessed. Unicode values are stored encoded in UTF-8, so the field
+    always returns a str object. Serializers get the uncompressed value,
+    base64-encoded.
+    """
+
+    def compress(self, value):
+        if value is None:
+            return None
+        return zlib.compress(value)
+
+    def uncompress(self, value):
+        if not value:
+            # None, or the empty default of a new instance
+            return None
+        return zlib.decompress(str(value))
+
+    def get_attname(self):
+        return '_%s_raw' % self.name
+
+    def get_attname_column(self):
+        return self.get_attname(), self.db_column or self.name
+
+    def contribute_to_class(self, cls, name):
+        super(CompressedBinaryField, self).contribute_to_class(cls, name)
+        setattr(cls, self.name, CompressedBinaryDescriptor(self))
+
+    def get_db_prep_value(self, value, connection=None, prepared=False):
+        if value is None:
+            return None
+        # All backends adapt buffers as binary values
+        return buffer(str(value))
+
+    def to_python(self, value):
+        """
+        Decode a value serialized by value_to_string.
+
+        The uncompressed value is returned, which the model constructor
+        compresses again.
+        """
+        if value is None:
+            return None
+        return base64.decodestring(value)
+
+    def clean(self, value, model_instance):
+        # The value of the attname is already compressed; it cannot go
+        # through to_python.
+        self.validate(value, model_instance)
+        self.run_validators(value)
+        return value
+
+    def value_to_string(self, obj):
+        value = getattr(obj, self.name)
+        if value is None:
+            return None
+        return base64.encodestring(value)
+
+    def db_type(self, connection):
+        db_types = {'django.db.backends.mysql':'longblob',
+                    'django.db.backends.sqlite3':'blob',
+                    'django.db.backends.postgres':'bytea',
+                    'django.db.backends.postgresql_psycopg2':'bytea'}
+        try:
+            return db_types[connection.settings_dict['ENGINE']]
+        except KeyError, e:
+            raise Exception, '%s currently works only with: %s' % (
+                self.__class__.__name__,', '.join(db_types.keys()))
+
+
 """
 South Introspection Extending for Custom fields
 Reference: http://south.aeracode.org/docs/customfields.html#extending-introspection
@@ -236,6 +340,17 @@ rules['CompressedTextField'] = [
     ),
 ]
 
+rules['CompressedBinaryField'] = [
+    (
+        [CompressedBinaryField],
+        [],
+        {
+            "blank": ["blank", {"default": True}],
+            "null": ["null", {"default": True}],
+        },
+    ),
+]
+
 rules['ListCharField'] = [
     (
         [ListCharField],
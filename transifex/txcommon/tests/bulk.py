@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from django.db import connection
+from django.utils import unittest
+from transifex.resources.models import SourceEntity
+from transifex.txcommon.db.bulk import CopyStream, _copy_value
+
+
+class TestCopyStream(unittest.TestCase):
+    """Test the generation of data for COPY FROM STDIN."""
+
+    def test_copy_value(self):
+        """Test the conversion of values to the COPY text format."""
+        self.assertEqual(_copy_value(None), '\\N')
+        self.assertEqual(_copy_value(True), 't')
+        self.assertEqual(_copy_value(False), 'f')
+        self.assertEqual(_copy_value(5), '5')
+        self.assertEqual(_copy_value(u'a\tb\nc\\d'), 'a\\tb\\nc\\\\d')
+        self.assertEqual(_copy_value(u'αβγ'), u'αβγ'.encode('UTF-8'))
+
+    def test_stream(self):
+        """Test that records are presaved and streamed one per line."""
+        entities = [
+            SourceEntity(string=u'String %s' % i, context=u'None',
+                resource_id=1, position=1)
+            for i in range(3)
+        ]
+        stream = CopyStream(SourceEntity, entities, connection)
+        self.assertTrue('string_hash' in stream.columns)
+        self.assertFalse('id' in stream.columns)
+        first = stream.read(10)
+        self.assertEqual(len(first), 10)
+        lines = (first + stream.read()).splitlines()
+        self.assertEqual(len(lines), 3)
+        hash_idx = stream.columns.index('string_hash')
+        for se, line in zip(entities, lines):
+            self.assertTrue(se.string_hash)
+            self.assertEqual(line.split('\t')[hash_idx], se.string_hash)
+        self.assertEqual(stream.read(), '')